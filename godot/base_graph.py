@@ -120,8 +120,10 @@ class BaseGraph ( HasTraits ):
     programs = Dict(desc="names and paths of Graphviz executables")
 
     # The Graphviz layout program
-    program = Enum("dot", "circo", "neato", "twopi", "fdp",
-        desc="layout program used by Graphviz")
+    program = Enum("dot", "circo", "neato", "twopi", "fdp", "sfdp",
+        "layered", "force", "stress", "spectral", "multilevel", "auto",
+        desc="layout program used by Graphviz or an in-process engine, or "
+        "chosen by graph size")
 
     # Format for writing to file.
     format = Enum(FORMATS, desc="format used when writing to file")
@@ -208,15 +210,29 @@ class BaseGraph ( HasTraits ):
         """ Returns a string representation of the graph in dot language. It
             will return the graph and all its subelements in string form.
         """
+        return self.to_dot()
+
+
+    def to_dot(self, elements=None, exclude=(), ID=None):
+        """ Returns the graph in dot language.  If a list of 'elements' is
+            given, only those nodes, edges, subgraphs or dot statements are
+            written, in place of all the subelements of the graph.  Graph
+            attributes named in 'exclude' are left out and the graph may be
+            given another 'ID'.
+        """
         s = ""
         padding = self.padding
-        if self.ID:
-            s += "%s {\n" % self.ID
+        ID = self.ID if ID is None else ID
+        if ID:
+            s += "%s {\n" % ID
         else:
             s += "{\n"
 
         # Traits to be included in string output have 'graphviz' metadata.
         for trait_name, trait in self.traits(graphviz=True).iteritems():
+            if trait_name in exclude:
+                continue
+
             # Get the value of the trait for comparison with the default.
             value = getattr(self, trait_name)
 
@@ -234,14 +250,18 @@ class BaseGraph ( HasTraits ):
         def prepend_padding(s):
             return "\n".join( [padding + line for line in s.splitlines()] )
 
-        for node in self.nodes:
-            s += "%s%s\n" % ( padding, str(node) )
-        for edge in self.edges:
-            s += "%s%s\n" % ( padding, str(edge) )
-        for subgraph in self.subgraphs:
-            s += prepend_padding( str( subgraph ) ) + "\n"
-        for cluster in self.clusters:
-            s += prepend_padding( str( cluster ) ) + "\n"
+        if elements is not None:
+            for element in elements:
+                s += prepend_padding( str( element ) ) + "\n"
+        else:
+            for node in self.nodes:
+                s += "%s%s\n" % ( padding, str(node) )
+            for edge in self.edges:
+                s += "%s%s\n" % ( padding, str(edge) )
+            for subgraph in self.subgraphs:
+                s += prepend_padding( str( subgraph ) ) + "\n"
+            for cluster in self.clusters:
+                s += prepend_padding( str( cluster ) ) + "\n"
 
         s += "}"
 
@@ -276,8 +296,16 @@ class BaseGraph ( HasTraits ):
         if progs is None:
             logger.warning("GraphViz's executables not found")
             return {}
-        else:
-            return progs
+
+        # Older versions of find_graphviz do not look for sfdp.
+        if ("sfdp" not in progs) and ("dot" in progs):
+            dirname, basename = os.path.split( progs["dot"] )
+            path = os.path.join( dirname,
+                                 "sfdp" + os.path.splitext(basename)[1] )
+            if os.path.isfile( path ):
+                progs["sfdp"] = path
+
+        return progs
 
 
     def _component_default(self):
@@ -337,7 +365,7 @@ class BaseGraph ( HasTraits ):
         return parser.parse_dot_file(flo)
 
 
-    def create(self, prog=None, format=None):
+    def create(self, prog=None, format=None, dot_data=None, args=()):
         """ Creates and returns a representation of the graph using the
             Graphviz layout program given by 'prog', according to the given
             format.
@@ -345,17 +373,31 @@ class BaseGraph ( HasTraits ):
             Writes the graph to a temporary dot file and processes it with
             the program given by 'prog' (which defaults to 'dot'), reading
             the output and returning it as a string if the operation is
-            successful. On failure None is returned.
+            successful. On failure None is returned.  If 'dot_data' is given
+            it is processed in place of the graph, for example to lay out
+            several graphs with one call.  Any further command line
+            arguments for the program may be given in 'args'.
         """
         prog = self.program if prog is None else prog
         format = self.format if format is None else format
 
+        if prog == "auto":
+            from godot.layout.api import choose_program
+            prog = choose_program( self, in_process=False )[0]
+
+        if prog not in self.programs:
+            logger.error( 'GraphViz\'s executable "%s" not found' % prog )
+            return None
+
         # Make a temporary file ...
         tmp_fd, tmp_name = tempfile.mkstemp()
         os.close( tmp_fd )
         # ... and save the graph to it.
         dot_fd = file( tmp_name, "w+b" )
-        self.save_dot( dot_fd )
+        if dot_data is None:
+            self.save_dot( dot_fd )
+        else:
+            dot_fd.write( dot_data )
         dot_fd.close()
 
         # Get the temporary file directory name.
@@ -365,7 +407,8 @@ class BaseGraph ( HasTraits ):
 
         # Process the file using the layout program, specifying the format.
         p = subprocess.Popen(
-            ( self.programs[ prog ], '-T'+format, tmp_name ),
+            ( self.programs[ prog ], '-T'+format ) + tuple( args ) +
+            ( tmp_name, ),
             cwd=tmp_dir,
             stderr=subprocess.PIPE, stdout=subprocess.PIPE)
 
@@ -589,21 +632,28 @@ class BaseGraph ( HasTraits ):
     def _program_changed(self, new):
         """ Handles the Graphviz layout program selection changing.
         """
-        progs = self.progs
+        from godot.layout.engine import ENGINES
+
+        if (new in ENGINES) or (new == "auto"):
+            return
+
+        progs = self.programs
 
-        if not progs.has_key(prog):
-            logger.warning( 'GraphViz\'s executable "%s" not found' % prog )
+        if not progs.has_key(new):
+            logger.warning( 'GraphViz\'s executable "%s" not found' % new )
 
-        if not os.path.exists( progs[prog] ) or not \
-            os.path.isfile( progs[prog] ):
+        elif not os.path.exists( progs[new] ) or not \
+            os.path.isfile( progs[new] ):
             logger.warning( "GraphViz's executable '%s' is not a "
-                "file or doesn't exist" % progs[prog] )
+                "file or doesn't exist" % progs[new] )
 
 
     def _component_changed(self, new):
         """ Handles the graph canvas changing.
         """
-        self.vp.component = new
+        vp = self.__dict__.get("vp")
+        if vp is not None:
+            vp.component = new
 
 
 #    @on_trait_change("nodes,nodes_items")
@@ -0,0 +1,117 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the arrangement of many standalone nodes and edges with a single
+call to a Graphviz layout program.
+
+Each element is placed in a graph of its own, as when it is arranged alone,
+but all of the graphs are written to one file.  Graphviz lays out every
+graph in its input, so one process is run instead of one per element and
+the output is split at the graph headers and mapped back to the elements.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import re
+
+from godot.graph import Graph
+from godot.node import Node
+from godot.edge import Edge
+from godot.dot_data_parser import GodotDataParser
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Prefix of the IDs of the graphs holding each element.
+GRAPH_PREFIX = "godot_batch_"
+
+# Header of each graph in the output of a layout program.
+GRAPH_HEADER = re.compile(r'^\s*(?:strict\s+)?(?:di)?graph\s+"?%s(\d+)' %
+    GRAPH_PREFIX, re.MULTILINE)
+
+#------------------------------------------------------------------------------
+#  Split the output of a layout program by graph:
+#------------------------------------------------------------------------------
+
+def split_graphs(data):
+    """ Returns a dictionary mapping the index of each batch graph in the
+        output of a layout program to its dot data.
+    """
+    matches = list(GRAPH_HEADER.finditer(data))
+    chunks = {}
+    for i, match in enumerate(matches):
+        if i + 1 < len(matches):
+            end = matches[i + 1].start()
+        else:
+            end = len(data)
+        chunks[int(match.group(1))] = data[match.start():end]
+    return chunks
+
+#------------------------------------------------------------------------------
+#  Arrange elements:
+#------------------------------------------------------------------------------
+
+def arrange_elements(elements, prog="dot", format="xdot"):
+    """ Lays out each of the given standalone nodes and edges as though it
+        were arranged on its own, using a single run of the layout program,
+        and sets the resulting attributes (e.g. pos, width, height and the
+        xdot drawing operations) on the elements.
+    """
+    if not elements:
+        return
+
+    graphs = []
+    for i, element in enumerate(elements):
+        graph = Graph(ID="%s%d" % (GRAPH_PREFIX, i), headless=True)
+        if isinstance(element, Edge):
+            graph.directed = True
+            element.conn = "->"
+            graph.edges.append(element)
+        else:
+            graph.add_node(element)
+        graphs.append(graph)
+
+    dot_data = "\n".join([str(graph) for graph in graphs])
+    data = graphs[0].create(prog, format, dot_data)
+    if not data:
+        return
+
+    parser = GodotDataParser()
+    for i, chunk in split_graphs(data).iteritems():
+        element = elements[i]
+        tokens = parser.dotparser.parseString(chunk.replace("\\\n", ""))[0]
+
+        for statement in tokens[3]:
+            cmd = statement[0]
+            if (cmd == "add_node") and isinstance(element, Node):
+                cmd, nodename, opts = statement
+                if nodename == element.ID:
+                    element.set(**opts)
+            elif (cmd == "add_edge") and isinstance(element, Edge):
+                cmd, src, dest, opts = statement
+                element.set(**opts)
+
+# EOF -------------------------------------------------------------------------
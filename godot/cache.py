@@ -0,0 +1,121 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a bounded, thread-safe cache shared by the font, tile and cluster
+    caches.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from threading import Lock
+
+#------------------------------------------------------------------------------
+#  "LRUCache" class:
+#------------------------------------------------------------------------------
+
+class LRUCache(object):
+    """ A bounded mapping that discards the least recently used items.
+    """
+
+    def __init__(self, maxsize):
+        """ Initialises the cache.
+        """
+        self.maxsize = maxsize
+        self._data = {}
+        # Access counter values keyed by cache key.
+        self._ticks = {}
+        self._tick = 0
+        self._lock = Lock()
+
+
+    def __len__(self):
+        return len(self._data)
+
+
+    def get(self, key, default=None):
+        """ Returns the cached value for key or default.
+        """
+        self._lock.acquire()
+        try:
+            if key in self._data:
+                self._tick += 1
+                self._ticks[key] = self._tick
+                return self._data[key]
+            return default
+        finally:
+            self._lock.release()
+
+
+    def set(self, key, value):
+        """ Caches the value for key, evicting the least recently used quarter
+            of the entries when full.
+        """
+        self._lock.acquire()
+        try:
+            if (key not in self._data) and (len(self._data) >= self.maxsize):
+                ticks = self._ticks
+                stale = sorted(ticks, key=ticks.get)[:max(1, self.maxsize//4)]
+                for k in stale:
+                    del self._data[k]
+                    del ticks[k]
+            self._tick += 1
+            self._data[key] = value
+            self._ticks[key] = self._tick
+        finally:
+            self._lock.release()
+
+
+    def keys(self):
+        """ Returns a list of the cached keys.
+        """
+        self._lock.acquire()
+        try:
+            return self._data.keys()
+        finally:
+            self._lock.release()
+
+
+    def discard(self, key):
+        """ Removes the item for key, if cached.
+        """
+        self._lock.acquire()
+        try:
+            if key in self._data:
+                del self._data[key]
+                del self._ticks[key]
+        finally:
+            self._lock.release()
+
+
+    def clear(self):
+        """ Removes all items from the cache.
+        """
+        self._lock.acquire()
+        try:
+            self._data.clear()
+            self._ticks.clear()
+        finally:
+            self._lock.release()
+
+# EOF -------------------------------------------------------------------------
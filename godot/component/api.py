@@ -26,5 +26,12 @@ from ellipse import Ellipse
 from polygon import Polygon
 from polyline import Polyline
 from text import Text
+from spatial_index import SpatialIndex
+from diagram_canvas import DiagramCanvas
+from display_list import DisplayList
+from font_cache import \
+    get_font, get_text_extent, get_text_width, clear_font_cache
+from lod import LODPolicy
+from tile_cache import TileCache
 
 # EOF -------------------------------------------------------------------------
@@ -22,44 +22,91 @@
 #------------------------------------------------------------------------------
 
 from itertools import izip
+from math import ceil
 
-from enthought.traits.api import Instance, Float, List, Tuple, on_trait_change
+from numpy import \
+    linspace, column_stack, vstack, dot, sqrt, hypot, clip, inf
+
+from enthought.traits.api import \
+    Instance, Array, Float, Dict, on_trait_change
 from enthought.traits.ui.api import View, Item, Group
 from enthought.enable.api import Component
 
 from pen import Pen
-from recipes import cubic
+from lod import get_ctm_scale, zoom_bucket
 
-#def calculate_bezier(p, steps = 30):
-#    """ Calculate a bezier curve from 4 control points and return a
-#    list of the resulting points.
-#
-#    The function uses the forward differencing algorithm described here:
-#    http://www.niksula.cs.hut.fi/~hkankaan/Homepages/bezierfast.html
-#
-#    """
-#
-#    t = 1.0 / steps
-#    temp = t*t
-#
-#    f = p[0]
-#    fd = 3 * (p[1] - p[0]) * t
-#    fdd_per_2 = 3 * (p[0] - 2 * p[1] + p[2]) * temp
-#    fddd_per_2 = 3 * (3 * (p[1] - p[2]) + p[3] - p[0]) * temp * t
-#
-#    fddd = fddd_per_2 + fddd_per_2
-#    fdd = fdd_per_2 + fdd_per_2
-#    fddd_per_6 = fddd_per_2 * (1.0 / 3)
-#
-#    points = []
-#    for x in range(steps):
-#        points.append(f)
-#        f = f + fd + fdd_per_2 + fddd_per_6
-#        fd = fd + fdd + fddd_per_2
-#        fdd = fdd + fddd
-#        fdd_per_2 = fdd_per_2 + fddd_per_2
-#    points.append(f)
-#    return points
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Maximum distance, in pixels, between a flattened curve and the true curve.
+FLATNESS = 0.5
+
+# Limits on the number of line segments per Bezier segment.
+MIN_STEPS, MAX_STEPS = 2, 64
+
+#------------------------------------------------------------------------------
+#  Bezier flattening:
+#------------------------------------------------------------------------------
+
+def bezier_steps(points, scale=1.0):
+    """ Returns the number of line segments per Bezier segment needed to
+        keep the flattened curve within FLATNESS pixels at the given scale.
+
+    The bound follows from the second differences of the control points:
+    the deviation of an n step flattening is at most 3/4 * max|d2| / n^2.
+    """
+    if len(points) < 4:
+        return MIN_STEPS
+    d2 = points[2:] - 2.0 * points[1:-1] + points[:-2]
+    dd = sqrt((d2 * d2).sum(axis=1)).max() * scale
+    steps = int(ceil(sqrt(0.75 * dd / FLATNESS)))
+    return max(MIN_STEPS, min(MAX_STEPS, steps))
+
+
+def flatten_bezier(points, steps):
+    """ Returns the polyline approximating the piecewise cubic Bezier curve
+        with the given control points (an N x 2 array, N = 1 mod 3), using
+        the given number of steps per Bezier segment.
+
+    All segments are evaluated at once from the Bernstein basis, which gives
+    the same points as forward differencing without the accumulated error.
+    """
+    n = (len(points) - 1) // 3
+    if n < 1:
+        return points.copy()
+
+    t = linspace(0.0, 1.0, steps + 1)[1:]
+    mt = 1.0 - t
+    basis = column_stack((mt * mt * mt, 3.0 * mt * mt * t,
+                          3.0 * mt * t * t, t * t * t))
+
+    # Control points of each segment, shape (n, 4, 2).
+    ctrl = column_stack((points[0:3 * n:3], points[1:3 * n:3],
+                         points[2:3 * n:3], points[3:3 * n + 1:3]))
+    ctrl = ctrl.reshape(n, 4, 2)
+
+    # Curve points of each segment, shape (n, steps, 2).
+    curve = dot(basis, ctrl).transpose(1, 0, 2)
+
+    return vstack((points[:1], curve.reshape(n * steps, 2)))
+
+
+def polyline_distance(polyline, x, y):
+    """ Returns the distance from the point (x, y) to the given polyline.
+    """
+    if len(polyline) == 0:
+        return inf
+    if len(polyline) == 1:
+        return hypot(polyline[0, 0] - x, polyline[0, 1] - y)
+
+    a = polyline[:-1]
+    d = polyline[1:] - a
+    ax, ay = x - a[:, 0], y - a[:, 1]
+    length2 = (d * d).sum(axis=1)
+    length2[length2 == 0.0] = 1.0
+    t = clip((ax * d[:, 0] + ay * d[:, 1]) / length2, 0.0, 1.0)
+    return hypot(ax - t * d[:, 0], ay - t * d[:, 1]).min()
 
 
 def nsplit(seq, n=2):
@@ -93,10 +140,15 @@ class BSpline(Component):
     pen = Instance(Pen, desc="Pen instance with which to draw the component")
 
     # Points defining the path of the polygon
-    points = List(
-        Tuple(Float, Float, labels=["x", "y"], cols=2, minlen=4),
-        desc="points defining the path of the curve"
-    )
+    points = Array(dtype=float, shape=(None, 2),
+        desc="points defining the path of the curve")
+
+    # Distance from the curve within which a point is considered to be on it.
+    hit_tolerance = Float(3.0, desc="distance from the curve within which "
+        "points are considered to be on it")
+
+    # Flattened curves keyed by zoom bucket, cleared when the points change.
+    _flattened = Dict
 
     #--------------------------------------------------------------------------
     #  "Component" interface:
@@ -124,7 +176,7 @@ class BSpline(Component):
     def _draw_mainlayer(self, gc, view_bounds=None, mode="default"):
         """ Draws the Bezier component """
 
-        if not self.points: return
+        if len(self.points) == 0: return
         gc.save_state()
         try:
             gc.set_fill_color(self.pen.fill_color_)
@@ -133,15 +185,7 @@ class BSpline(Component):
             gc.set_stroke_color(self.pen.color_)
 
             gc.begin_path()
-            start_x, start_y = self.points[0]
-            gc.move_to(start_x, start_y)
-            for triple in nsplit(self.points[1:], 3):
-                x1, y1 = triple[0]
-                x2, y2 = triple[1]
-                end_x, end_y = triple[2]
-                gc.curve_to(x1, y1, x2, y2, end_x, end_y)
-                # One point overlap
-                gc.move_to(end_x, end_y)
+            gc.lines(self.flattened(get_ctm_scale(gc)))
             gc.stroke_path()
         finally:
             gc.restore_state()
@@ -156,55 +200,47 @@ class BSpline(Component):
     #  CoordinateBox interface
     #--------------------------------------------------------------------------
 
-#    def is_in(self, x, y):
-#        """ Tests if a point is within a certain tolerance of the line """
-#
-#        if not self.points: return False
-#
-#        # First-pass bounding box check
-#        minx, miny = self.position
-#        maxx = minx + self.bounds[0]
-#        maxy = miny + self.bounds[1]
-#        if (minx <= x <= maxx) and (miny <= y <= maxy):
-#            print "IS IN?"
-#            # P(t) = (1-t)^3 P0 + 3t(1-t)^2 P1 + 3(1-t)t^2 P2 + t^3 P3
-#            x0, y0 = self.points[0]
-#            for triple in nsplit(self.points[1:], 3):
-#                x1, y1 = triple[0]
-#                x2, y2 = triple[1]
-#                x3, y3 = triple[2]
-#
-#                a = -x0 + 3*x1 - 3*x2 + x3
-#                b = 3*x0 - 6*x1 + 3*x2
-#                c = -3*x0 + 3*x1
-#                d = x0 - x
-#                t, r2, r3 = cubic(a, b, c, d)
-#
-#                ans = ((1-t)**3)*x0 + 3*t*((1-t)**2)*x1 + 3*(1-t)*(t**2)*x2 + (t**3)*x3
-#
-#                print "ANS:", ans
-#
-#                ay = -y0 + 3*y1 - 3*y2 + y3
-#                by = 3*y0 - 6*y1 + 3*y2
-#                cy = -3*y0 + 3*y1
-#                dy = y0 - y
-#                ry1, ry2, ry3 = cubic(ay, by, cy, dy)
-#
-#                print "Root 1:", t, ry1
-#                print "Root 2:", r2, ry2
-#                print "Root 3:", r3, ry3
-#
-##                x0, y0 = triple[2]
-#            result = True
-#        else:
-#            result = False
-#
-#        return result
+    def is_in(self, x, y):
+        """ Tests if a point is within the hit tolerance of the curve """
+
+        if len(self.points) == 0:
+            return False
+
+        # First-pass bounding box check.
+        tol = self.hit_tolerance
+        minx, miny = self.position
+        maxx = minx + self.bounds[0]
+        maxy = miny + self.bounds[1]
+        if not ((minx - tol <= x <= maxx + tol) and
+                (miny - tol <= y <= maxy + tol)):
+            return False
+
+        return polyline_distance(self.flattened(), x, y) <= tol
 
     #--------------------------------------------------------------------------
     #  "BSpline" interface:
     #--------------------------------------------------------------------------
 
+    def flattened(self, scale=1.0):
+        """ Returns the polyline approximating the curve when drawn at the
+            given scale, cached per zoom bucket.
+        """
+        bucket = zoom_bucket(scale)
+        polyline = self._flattened.get(bucket)
+        if polyline is None:
+            steps = bezier_steps(self.points, 2.0 ** (bucket + 1))
+            polyline = flatten_bezier(self.points, steps)
+            self._flattened[bucket] = polyline
+        return polyline
+
+
+    @on_trait_change("points")
+    def _clear_flattened(self):
+        """ Discards the cached flattenings.
+        """
+        self._flattened = {}
+
+
 #    def _position_changed(self, old, new):
 #        """ Handles the position of the component changing.
 #        """
@@ -217,16 +253,11 @@ class BSpline(Component):
     def _update(self):
         """ Updates the position and bounds of the component.
         """
-        if not self.points:
+        if len(self.points) == 0:
             return
 
-        x_points = [x for x, y in self.points]
-        y_points = [y for x, y in self.points]
-
-        x  = min(x_points)
-        x2 = max(x_points)
-        y  = min(y_points)
-        y2 = max(y_points)
+        x, y = self.points.min(axis=0)
+        x2, y2 = self.points.max(axis=0)
 
         self.position = [x, y]
 
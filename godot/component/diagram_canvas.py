@@ -0,0 +1,383 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a canvas that indexes its components for fast hit-testing.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from enthought.traits.api import \
+    Instance, Bool, Float, Dict, on_trait_change
+from enthought.enable.api import Canvas
+
+from spatial_index import SpatialIndex
+from tile_cache import TileCache
+from ellipse import Ellipse
+from polygon import Polygon
+from bspline import BSpline
+from text import Text
+
+from lod import \
+    LODPolicy, get_ctm_scale, FULL, NO_TEXT, REDUCED, MINIMAL, NODE_ROLE, \
+    ARROW_ROLE
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Traits of the components whose changes alter their appearance in place.
+STYLE_TRAITS = ["pen.+", "points", "filled", "text", "justification"]
+
+#------------------------------------------------------------------------------
+#  "DiagramCanvas" class:
+#------------------------------------------------------------------------------
+
+class DiagramCanvas(Canvas):
+    """ A canvas of diagram components that maintains a spatial index of
+        their bounding boxes.  Mouse events are dispatched through the index
+        rather than by testing every component in turn.
+    """
+
+    #--------------------------------------------------------------------------
+    #  "DiagramCanvas" interface:
+    #--------------------------------------------------------------------------
+
+    # Index of component bounding boxes in stacking order.
+    index = Instance(SpatialIndex, desc="spatial index of the components")
+
+    # Level-of-detail policy applied when the canvas is drawn zoomed out.
+    lod = Instance(LODPolicy, (), desc="level-of-detail policy")
+
+    # Optional cache of raster tiles blitted instead of redrawing the
+    # components, for smooth panning of very large diagrams.
+    tile_cache = Instance(TileCache, desc="cache of raster tiles")
+
+    # Distance outside their bounds at which components may still be hit,
+    # so that thin edges can be picked.
+    hit_tolerance = Float(3.0, desc="distance outside component bounds "
+        "searched when hit-testing")
+
+    # Map of components to the graph element from which they were drawn.
+    _elements = Dict
+
+    # Map of components to their role in drawing their element.
+    _roles = Dict
+
+    # Map of components to the handlers that discard their tiles when they
+    # are restyled.
+    _restyle_handlers = Dict
+
+    # Does the index reflect the current components?
+    _index_valid = Bool(False)
+
+    #--------------------------------------------------------------------------
+    #  "Container" interface:
+    #--------------------------------------------------------------------------
+
+    def add(self, *components):
+        """ Adds components to the canvas.
+        """
+        super(DiagramCanvas, self).add(*components)
+        self._index_valid = False
+        self._invalidate_tiles(components)
+        for component in components:
+            self._watch_style(component)
+
+
+    def remove(self, *components):
+        """ Removes components from the canvas.
+        """
+        super(DiagramCanvas, self).remove(*components)
+        for component in components:
+            self._elements.pop(component, None)
+            self._roles.pop(component, None)
+            self._watch_style(component, remove=True)
+        self._index_valid = False
+        self._invalidate_tiles(components)
+
+
+    def components_at(self, x, y):
+        """ Returns the components underneath the given point (given in the
+            parent coordinate system of the canvas), topmost first.
+        """
+        result = []
+        if self.is_in(x, y):
+            xprime = x - self.position[0]
+            yprime = y - self.position[1]
+            components = self._components
+            index = self._get_index()
+            for i in index.query_point(xprime, yprime, self.hit_tolerance):
+                if components[i].is_in(xprime, yprime):
+                    result.append(components[i])
+        return result
+
+
+    def _draw_container_mainlayer(self, gc, view_bounds=None, mode="default"):
+        """ Draws the components that intersect the view bounds, from the
+            tile cache if there is one.
+        """
+        if (self.tile_cache is not None) and (view_bounds is not None):
+            self.tile_cache.draw(gc, self._draw_components, view_bounds, mode)
+        else:
+            self._draw_components(gc, view_bounds, mode)
+
+    #--------------------------------------------------------------------------
+    #  Public interface:
+    #--------------------------------------------------------------------------
+
+    def add_element(self, element, components, role=""):
+        """ Adds components drawn for the given graph element.  The role
+            (node, edge, arrow or label) determines how the components are
+            simplified when zoomed out.
+        """
+        for component in components:
+            self._elements[component] = element
+            self._roles[component] = role
+        self.add(*components)
+
+
+    def element_components(self, element):
+        """ Returns the components drawn for the given graph element.
+        """
+        return [c for c in self._components if self._elements.get(c) is element]
+
+
+    def invalidate_index(self):
+        """ Marks the index as stale.  Moves and resizes are detected, so
+            this need only be called after other changes to the components.
+        """
+        self._index_valid = False
+
+
+    def hit_test(self, x, y):
+        """ Returns the topmost component under the given point (in canvas
+            coordinates) or None.
+        """
+        components = self._components
+        index = self._get_index()
+        for i in index.query_point(x, y, self.hit_tolerance):
+            if components[i].is_in(x, y):
+                return components[i]
+        return None
+
+
+    def element_at(self, x, y):
+        """ Returns the graph element of the topmost component under the given
+            point or None.
+        """
+        component = self.hit_test(x, y)
+        if component is None:
+            return None
+        # Display lists record the element of each of their primitives.
+        if hasattr(component, "element_at"):
+            return component.element_at(x, y)
+        return self._elements.get(component)
+
+
+    def components_in(self, x1, y1, x2, y2):
+        """ Returns the components lying entirely within a rubber-band
+            rectangle, topmost first.
+        """
+        components = self._components
+        ids = self._get_index().query_rect(x1, y1, x2, y2, contained=True)
+        return [components[i] for i in ids]
+
+
+    def elements_in(self, x1, y1, x2, y2):
+        """ Returns the graph elements with components lying within the given
+            rectangle, topmost first and without duplicates.
+        """
+        elements = []
+        for component in self.components_in(x1, y1, x2, y2):
+            element = self._elements.get(component)
+            if (element is not None) and (element not in elements):
+                elements.append(element)
+        return elements
+
+
+    def elements_intersecting(self, x1, y1, x2, y2):
+        """ Returns the graph elements with components intersecting the given
+            rectangle, topmost first and without duplicates.
+        """
+        components = self._components
+        elements = []
+        for i in self._get_index().query_rect(x1, y1, x2, y2):
+            element = self._elements.get(components[i])
+            if (element is not None) and (element not in elements):
+                elements.append(element)
+        return elements
+
+    #--------------------------------------------------------------------------
+    #  Protected interface:
+    #--------------------------------------------------------------------------
+
+    def _draw_components(self, gc, view_bounds=None, mode="default"):
+        """ Draws the components that intersect the view bounds, simplified
+            according to the level of detail for the current scale.  Runs of
+            consecutive simplified components are drawn as single paths.
+        """
+        level = self.lod.level(get_ctm_scale(gc))
+
+        components = self._components
+        if view_bounds is None:
+            ids = range(len(components))
+        else:
+            x, y, w, h = view_bounds[:4]
+            ids = self._get_index().query_rect(x, y, x + w, y + h)[::-1]
+
+        boxes, chords = [], []
+        for i in ids:
+            component = components[i]
+            if not component.visible:
+                continue
+
+            if hasattr(component, "lod_level"):
+                component.lod_level = level
+                component.lod = self.lod
+            elif level != FULL:
+                if isinstance(component, Text):
+                    continue
+                elif level >= REDUCED:
+                    role = self._roles.get(component)
+                    if role == ARROW_ROLE:
+                        continue
+                    elif isinstance(component, BSpline) and \
+                            len(component.points):
+                        chords.append((component.points[0],
+                                       component.points[-1]))
+                        continue
+                    elif role == NODE_ROLE and \
+                            isinstance(component, (Ellipse, Polygon)):
+                        boxes.append(tuple(component.position) +
+                                     tuple(component.bounds))
+                        continue
+
+            # Draw the simplified components beneath this one first, so that
+            # batching them keeps the stacking order.
+            if boxes or chords:
+                self._draw_simplified(gc, level, boxes, chords)
+                boxes, chords = [], []
+
+            gc.save_state()
+            try:
+                component.draw(gc, view_bounds, mode)
+            finally:
+                gc.restore_state()
+
+        if boxes or chords:
+            self._draw_simplified(gc, level, boxes, chords)
+
+
+    def _invalidate_tiles(self, components):
+        """ Discards the cached tiles covering the given components.
+        """
+        if self.tile_cache is not None:
+            for component in components:
+                x, y = component.position
+                w, h = component.bounds
+                self.tile_cache.invalidate_rect(x, y, x + w, y + h)
+
+
+    def _watch_style(self, component, remove=False):
+        """ Adds or removes a handler that discards the tiles covering the
+            component when its pen or other style traits change, as these
+            only request a redraw without moving the component.
+        """
+        if remove:
+            handler = self._restyle_handlers.pop(component, None)
+        else:
+            handler = self._restyle_handlers.setdefault(component,
+                lambda: self._invalidate_tiles([component]))
+        if handler is None:
+            return
+
+        for name in STYLE_TRAITS:
+            if component.trait(name.split(".")[0]) is not None:
+                component.on_trait_change(handler, name, remove=remove)
+
+
+    @on_trait_change("_components:position,_components:bounds")
+    def _on_component_moved(self, component, name, old, new):
+        """ Handles a component being moved or resized by discarding the
+            tiles it covered and covers.
+        """
+        self._index_valid = False
+        if self.tile_cache is not None:
+            x, y = component.position
+            w, h = component.bounds
+            if name == "position":
+                x0, y0, w0, h0 = old[0], old[1], w, h
+            else:
+                x0, y0, w0, h0 = x, y, old[0], old[1]
+            self.tile_cache.invalidate_rect(x0, y0, x0 + w0, y0 + h0)
+            self.tile_cache.invalidate_rect(x, y, x + w, y + h)
+
+
+    def _draw_simplified(self, gc, level, boxes, chords):
+        """ Draws nodes as boxes or points and edges as straight chords,
+            each as a single path.
+        """
+        gc.save_state()
+        try:
+            gc.set_stroke_color(self.lod.color_)
+            gc.set_fill_color(self.lod.color_)
+            gc.set_line_width(1)
+
+            if chords:
+                gc.begin_path()
+                for (x1, y1), (x2, y2) in chords:
+                    gc.move_to(x1, y1)
+                    gc.line_to(x2, y2)
+                gc.stroke_path()
+
+            if boxes:
+                gc.begin_path()
+                if level == MINIMAL:
+                    size = self.lod.point_size / get_ctm_scale(gc)
+                    for x, y, w, h in boxes:
+                        gc.rect(x + (w - size) / 2, y + (h - size) / 2,
+                                size, size)
+                    gc.fill_path()
+                else:
+                    for x, y, w, h in boxes:
+                        gc.rect(x, y, w, h)
+                    gc.stroke_path()
+        finally:
+            gc.restore_state()
+
+
+    def _get_index(self):
+        """ Returns the spatial index, rebuilding it if stale.
+        """
+        if (self.index is None) or (not self._index_valid):
+            boxes = []
+            for component in self._components:
+                x, y = component.position
+                w, h = component.bounds
+                boxes.append((x, y, x + w, y + h))
+            self.index = SpatialIndex(boxes)
+            self._index_valid = True
+        return self.index
+
+# EOF -------------------------------------------------------------------------
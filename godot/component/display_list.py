@@ -0,0 +1,582 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a component that draws many primitives from flat arrays.
+
+Rather than adding one component per xdot primitive, the primitives are
+flattened into arrays of opcodes and coordinates and grouped by pen.  Each
+group of primitives sharing a stroke colour, fill colour and line width is
+drawn as a single path.  Xdot drawing operations are read straight into the
+arrays, without first being parsed into components.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import re
+
+from colorsys import hsv_to_rgb
+
+from numpy import \
+    array, asarray, empty, concatenate, cumsum, nonzero, vstack, uint8
+
+from enthought.traits.api import Any, List, Int, Instance
+from enthought.enable.api import Component
+from enthought.enable.colors import color_table
+from enthought.kiva import FILL_STROKE
+from enthought.kiva.agg import points_in_polygon
+
+from ellipse import Ellipse
+from polygon import Polygon
+from polyline import Polyline
+from bspline import \
+    BSpline, bezier_steps, flatten_bezier, polyline_distance
+from text import Text
+from spatial_index import SpatialIndex
+from font_cache import get_font, get_text_width
+from lod import \
+    LODPolicy, get_ctm_scale, FULL, NO_TEXT, REDUCED, MINIMAL, NODE_ROLE, \
+    ARROW_ROLE
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Path opcodes.
+LINES, POLYGON, CURVE, CLOSED_CURVE = range(4)
+
+# Control point offset for approximating a quarter ellipse by a cubic Bezier.
+KAPPA = 0.5522847498
+
+# Distance from a line or curve within which it is hit.
+HIT_TOLERANCE = 3.0
+
+# Colour of primitives drawn before any colour is set.
+BLACK = (0.0, 0.0, 0.0, 1.0)
+
+# Path opcodes of the xdot operations followed by a list of points.
+XDOT_OPCODES = {"P": POLYGON, "p": POLYGON, "L": LINES, "B": CURVE,
+                "b": CLOSED_CURVE}
+
+#------------------------------------------------------------------------------
+#  "DisplayList" class:
+#------------------------------------------------------------------------------
+
+class DisplayList(Component):
+    """ Draws the primitives of many xdot components as a few paths.
+    """
+
+    #--------------------------------------------------------------------------
+    #  "DisplayList" interface:
+    #--------------------------------------------------------------------------
+
+    # Opcode of each primitive.
+    ops = Any
+
+    # Index of the first coordinate of each primitive with a trailing end
+    # index, so that primitive i uses coords[offsets[i]:offsets[i+1]].
+    offsets = Any
+
+    # Coordinates of all primitives as an N x 2 array.
+    coords = Any
+
+    # Pen group of each primitive.
+    style_ids = Any
+
+    # Pen groups of the form (stroke colour, fill colour or None, width).
+    styles = List
+
+    # Graph element of each primitive.
+    elements = List
+
+    # Text runs of the form (text, x, y, width, font, colour, element).
+    texts = List
+
+    # Level of detail at which to draw, set by the containing canvas.
+    lod_level = Int(FULL)
+
+    # Colour and point size of simplified nodes, set by the containing canvas.
+    lod = Instance(LODPolicy, ())
+
+    # Mask of the primitives drawn for nodes.
+    _nodes = Any
+
+    # Mask of the primitives drawn for arrowheads.
+    _arrows = Any
+
+    # Primitive bounding boxes as an N x 4 array.
+    _boxes = Any
+
+    # Text run bounding boxes as an N x 4 array.
+    _text_boxes = Any
+
+    # Primitive indices of each pen group.
+    _groups = List
+
+    # Spatial index of the primitive bounding boxes.
+    _index = Any
+
+    #--------------------------------------------------------------------------
+    #  "Component" interface:
+    #--------------------------------------------------------------------------
+
+    # Background colour of the component
+    bgcolor = "transparent"
+
+    #--------------------------------------------------------------------------
+    #  "object" interface:
+    #--------------------------------------------------------------------------
+
+    def __init__(self, items=None, **traits):
+        """ Initialises the display list from an optional sequence of
+            (element, components) pairs or (element, components, role)
+            tuples.
+        """
+        super(DisplayList, self).__init__(**traits)
+        if items is not None:
+            self.build(items)
+
+    #--------------------------------------------------------------------------
+    #  Public interface:
+    #--------------------------------------------------------------------------
+
+    def build(self, items):
+        """ Flattens the components of each (element, components) pair or
+            (element, components, role) tuple.  The components may instead
+            be given as a string of xdot drawing operations, which are read
+            directly without creating a component for each.  Node and
+            arrowhead primitives are simplified when zoomed out if their
+            role is given.
+        """
+        ops, points, style_ids, elements, roles = [], [], [], [], []
+        styles, style_map = [], {}
+        texts = []
+
+        def add(op, pts, stroke, fill, width, element, role):
+            """ Adds a primitive drawn with the given pen. """
+            if len(pts) < 2:
+                return
+            key = (repr(stroke), repr(fill), width)
+            if key not in style_map:
+                style_map[key] = len(styles)
+                styles.append((stroke, fill, width))
+            ops.append(op)
+            points.append(pts)
+            style_ids.append(style_map[key])
+            elements.append(element)
+            roles.append(role)
+
+        for item in items:
+            element, components = item[:2]
+            role = item[2] if len(item) > 2 else None
+
+            if isinstance(components, basestring):
+                for op, pts, stroke, fill, width in \
+                        read_xdot(components, texts, element):
+                    add(op, pts, stroke, fill, width, element, role)
+                continue
+
+            for c in components:
+                if isinstance(c, Text):
+                    width = c.text_w or get_text_width(c.pen.font, c.text)
+                    texts.append((c.text, c.text_x, c.text_y, width,
+                                  str(c.pen.font), c.pen.color_, element))
+                    continue
+
+                pen = c.pen
+                filled = getattr(c, "filled", False)
+                if isinstance(c, Ellipse):
+                    op, pts = CLOSED_CURVE, ellipse_to_bezier(c.x_origin,
+                        c.y_origin, c.e_width, c.e_height)
+                elif isinstance(c, Polygon):
+                    op, pts = POLYGON, asarray(c.points, dtype=float)
+                elif isinstance(c, Polyline):
+                    op, pts = LINES, asarray(c.points, dtype=float)
+                elif isinstance(c, BSpline):
+                    op = CLOSED_CURVE if filled else CURVE
+                    pts = asarray(c.points, dtype=float)
+                else:
+                    continue
+
+                add(op, pts, pen.color_, pen.fill_color_ if filled else None,
+                    pen.line_width, element, role)
+
+        n = len(ops)
+        self.ops = array(ops, dtype=uint8)
+        self.style_ids = array(style_ids, dtype=int)
+        self.offsets = concatenate(([0], cumsum([len(p) for p in points])))
+        self.coords = vstack(points) if points else empty((0, 2))
+        self.styles = styles
+        self.elements = elements
+        self.texts = texts
+
+        boxes = empty((n, 4))
+        for i, p in enumerate(points):
+            boxes[i, :2] = p.min(axis=0)
+            boxes[i, 2:] = p.max(axis=0)
+        self._boxes = boxes
+        self._text_boxes = self._get_text_boxes()
+        self._groups = [nonzero(self.style_ids == i)[0]
+                        for i in range(len(styles))]
+        self._nodes = array([r == NODE_ROLE for r in roles], dtype=bool)
+        self._arrows = array([r == ARROW_ROLE for r in roles], dtype=bool)
+        self._index = None
+
+        self._update_bounds()
+
+
+    def element_at(self, x, y, tolerance=HIT_TOLERANCE):
+        """ Returns the element of the topmost text run or primitive under
+            the given point, or within the tolerance of a line or curve, or
+            None.
+        """
+        if self._boxes is None:
+            return None
+        if self._index is None:
+            self._index = SpatialIndex(vstack((self._boxes,
+                                               self._text_boxes)))
+
+        n = len(self.ops)
+        ops, offsets, coords = self.ops, self.offsets, self.coords
+        for i in self._index.query_point(x, y, tolerance):
+            if i >= n:
+                # Text runs are hit anywhere within their boxes.
+                x1, y1, x2, y2 = self._text_boxes[i - n]
+                if (x1 <= x <= x2) and (y1 <= y <= y2):
+                    return self.texts[i - n][-1]
+                continue
+
+            op = ops[i]
+            pts = coords[offsets[i]:offsets[i + 1]]
+            if (op == CURVE) or (op == CLOSED_CURVE):
+                pts = flatten_bezier(pts, bezier_steps(pts))
+            if (op == POLYGON) or (op == CLOSED_CURVE):
+                if points_in_polygon(array([(x, y)]), pts)[0]:
+                    return self.elements[i]
+                pts = vstack((pts, pts[:1]))
+            if polyline_distance(pts, x, y) <= tolerance:
+                return self.elements[i]
+        return None
+
+    #--------------------------------------------------------------------------
+    #  Draw component on the graphics context:
+    #--------------------------------------------------------------------------
+
+    def _draw_mainlayer(self, gc, view_bounds=None, mode="default"):
+        """ Draws one path per pen group followed by the text runs.  When
+            zoomed out, arrowheads are skipped and nodes drawn as boxes or
+            points.
+        """
+        if self.ops is None:
+            return
+
+        visible = self._visible(view_bounds)
+        ops, offsets, coords = self.ops, self.offsets, self.coords
+
+        simplified = None
+        if self.lod_level >= REDUCED:
+            simplified = self._nodes | self._arrows
+
+        gc.save_state()
+        try:
+            for style_id, (stroke, fill, width) in enumerate(self.styles):
+                group = self._groups[style_id]
+                if visible is not None:
+                    group = group[visible[group]]
+                if simplified is not None:
+                    group = group[~simplified[group]]
+                if not len(group):
+                    continue
+
+                gc.set_stroke_color(stroke)
+                gc.set_line_width(width)
+                if fill is not None:
+                    gc.set_fill_color(fill)
+
+                gc.begin_path()
+                for i in group:
+                    op = ops[i]
+                    pts = coords[offsets[i]:offsets[i + 1]]
+                    if op == LINES or op == POLYGON:
+                        gc.lines(pts)
+                    elif (op == CURVE) and (self.lod_level >= REDUCED):
+                        # Straight chord between the curve ends.
+                        gc.move_to(pts[0, 0], pts[0, 1])
+                        gc.line_to(pts[-1, 0], pts[-1, 1])
+                    else:
+                        gc.move_to(pts[0, 0], pts[0, 1])
+                        for j in range(1, len(pts) - 2, 3):
+                            gc.curve_to(pts[j, 0], pts[j, 1],
+                                        pts[j + 1, 0], pts[j + 1, 1],
+                                        pts[j + 2, 0], pts[j + 2, 1])
+                    if op == POLYGON or op == CLOSED_CURVE:
+                        gc.close_path()
+
+                if fill is not None:
+                    gc.draw_path(FILL_STROKE)
+                else:
+                    gc.stroke_path()
+
+            if simplified is not None:
+                self._draw_nodes(gc, visible)
+
+            if self.texts and (self.lod_level < NO_TEXT):
+                self._draw_texts(gc)
+        finally:
+            gc.restore_state()
+
+    #--------------------------------------------------------------------------
+    #  Protected interface:
+    #--------------------------------------------------------------------------
+
+    def _draw_nodes(self, gc, visible=None):
+        """ Draws the node primitives as boxes or, at the minimal level of
+            detail, as points, in a single path.
+        """
+        mask = self._nodes
+        if visible is not None:
+            mask = mask & visible
+        boxes = self._boxes[mask]
+        if not len(boxes):
+            return
+
+        gc.set_stroke_color(self.lod.color_)
+        gc.set_fill_color(self.lod.color_)
+        gc.set_line_width(1)
+
+        gc.begin_path()
+        if self.lod_level == MINIMAL:
+            size = self.lod.point_size / get_ctm_scale(gc)
+            for x1, y1, x2, y2 in boxes:
+                gc.rect((x1 + x2 - size) / 2, (y1 + y2 - size) / 2,
+                        size, size)
+            gc.fill_path()
+        else:
+            for x1, y1, x2, y2 in boxes:
+                gc.rect(x1, y1, x2 - x1, y2 - y1)
+            gc.stroke_path()
+
+
+    def _draw_texts(self, gc):
+        """ Draws the text runs, setting the font and colour only when they
+            change.
+        """
+        # Show text at the same scale as the graphics context
+        scale = get_ctm_scale(gc)
+
+        current_font = current_color = None
+        for text, x, y, w, font_spec, color, element in self.texts:
+            if font_spec != current_font:
+                font = get_font(font_spec)
+                gc.set_font(font)
+                current_font = font_spec
+            if color != current_color:
+                gc.set_fill_color(color)
+                current_color = color
+
+            tx = ( x - (w / 2) ) * scale
+            ty = ( y - (font.size / 2) ) * scale
+            gc.show_text_at_point(text, tx, ty)
+
+
+    def _get_text_boxes(self):
+        """ Returns the boxes of the text runs as an N x 4 array, the height
+            of each being the size of its font.
+        """
+        boxes = empty((len(self.texts), 4))
+        for i, (text, x, y, w, font_spec, color, element) in \
+                enumerate(self.texts):
+            size = get_font(font_spec).size
+            boxes[i] = (x - w / 2, y - size / 2, x + w / 2, y + size / 2)
+        return boxes
+
+
+    def _visible(self, view_bounds):
+        """ Returns a mask of the primitives intersecting the view bounds or
+            None if all are to be drawn.
+        """
+        if (view_bounds is None) or (self._boxes is None):
+            return None
+        x, y, w, h = view_bounds[:4]
+        b = self._boxes
+        return (b[:, 0] <= x + w) & (b[:, 2] >= x) & \
+            (b[:, 1] <= y + h) & (b[:, 3] >= y)
+
+
+    def _update_bounds(self):
+        """ Sets the position and bounds to enclose all primitives.
+        """
+        boxes = vstack((self._boxes, self._text_boxes))
+        if not len(boxes):
+            return
+
+        x, y = boxes[:, 0].min(), boxes[:, 1].min()
+        x2, y2 = boxes[:, 2].max(), boxes[:, 3].max()
+
+        self.position = [x, y]
+        # If bounds are set to 0, horizontal/vertical lines will not render.
+        self.bounds = [max(x2 - x, 1), max(y2 - y, 1)]
+
+        self.request_redraw()
+
+#------------------------------------------------------------------------------
+#  Read xdot drawing operations:
+#------------------------------------------------------------------------------
+
+# Colours already converted, by xdot value.
+_colors = {}
+
+def xdot_color(value):
+    """ Returns an RGBA tuple for an xdot colour, given as "#RRGGBB[AA]",
+        as "H S V" or "H,S,V" or by name.
+    """
+    color = _colors.get(value)
+    if color is None:
+        if value.startswith("#"):
+            digits = value[1:]
+            color = tuple([int(digits[i:i + 2], 16) / 255.0
+                           for i in range(0, len(digits), 2)])
+            if len(color) == 3:
+                color += (1.0,)
+        elif value[:1].isdigit() or value[:1] == ".":
+            h, s, v = [float(c) for c in value.replace(",", " ").split()[:3]]
+            color = hsv_to_rgb(h, s, v) + (1.0,)
+        else:
+            color = tuple(color_table.get(value.lower(), BLACK))
+        _colors[value] = color
+    return color
+
+
+# Line width set by an xdot style operation.
+LINE_WIDTH = re.compile(r"setlinewidth\(([\d.]+)\)")
+
+def read_xdot(data, texts=None, element=None):
+    """ Returns a list of (opcode, points, stroke, fill, width) tuples for
+        the shapes drawn by a string of xdot drawing operations, appending
+        (text, x, y, width, font, colour, element) tuples for any text to
+        'texts'.  Images are skipped.
+    """
+    data = data.strip().strip('"')
+    end = len(data)
+
+    def token(pos):
+        """ Returns the next whitespace separated token. """
+        i = pos
+        while i < end and data[i].isspace():
+            i += 1
+        j = i
+        while j < end and not data[j].isspace():
+            j += 1
+        return data[i:j], j
+
+    def numbers(pos, n):
+        """ Returns the next n tokens as floats. """
+        values = []
+        for k in range(n):
+            value, pos = token(pos)
+            values.append(float(value))
+        return values, pos
+
+    def string(pos):
+        """ Returns the number of bytes given by the next token following
+            the '-' after it.
+        """
+        n, pos = token(pos)
+        i = data.index("-", pos) + 1
+        return data[i:i + int(n)], i + int(n)
+
+    primitives = []
+    stroke = fill = BLACK
+    line_width = 1
+    font_spec = "Times-Roman 14"
+    pos = 0
+    while True:
+        op, pos = token(pos)
+        if not op:
+            break
+
+        if op in ["E", "e"]:
+            (x0, y0, w, h), pos = numbers(pos, 4)
+            primitives.append((CLOSED_CURVE, ellipse_to_bezier(x0, y0, w, h),
+                stroke, fill if op == "E" else None, line_width))
+
+        elif op in XDOT_OPCODES:
+            (n,), pos = numbers(pos, 1)
+            values, pos = numbers(pos, 2 * int(n))
+            pts = array(values, dtype=float).reshape(int(n), 2)
+            filled = op in ["P", "b"]
+            primitives.append((XDOT_OPCODES[op], pts, stroke,
+                fill if filled else None, line_width))
+
+        elif op == "T":
+            (x, y, j, w), pos = numbers(pos, 4)
+            text, pos = string(pos)
+            if texts is not None:
+                if not w:
+                    w = get_text_width(font_spec, text)
+                texts.append((text, x, y, w, font_spec, stroke, element))
+
+        elif op == "F":
+            (size,), pos = numbers(pos, 1)
+            name, pos = string(pos)
+            font_spec = "%s %d" % (name, int(size))
+
+        elif op == "c":
+            value, pos = string(pos)
+            stroke = xdot_color(value)
+
+        elif op == "C":
+            value, pos = string(pos)
+            fill = xdot_color(value)
+
+        elif op == "S":
+            value, pos = string(pos)
+            match = LINE_WIDTH.match(value)
+            if match is not None:
+                line_width = float(match.group(1))
+
+        elif op == "I":
+            values, pos = numbers(pos, 4)
+            name, pos = string(pos)
+
+    return primitives
+
+#------------------------------------------------------------------------------
+#  Approximate an ellipse by cubic Bezier segments:
+#------------------------------------------------------------------------------
+
+def ellipse_to_bezier(x0, y0, w, h):
+    """ Returns the 13 control points of four cubic Bezier segments
+        approximating the ellipse ((x-x0)/w)^2 + ((y-y0)/h)^2 = 1.
+    """
+    kw, kh = KAPPA * w, KAPPA * h
+    return array([
+        (x0 + w, y0),
+        (x0 + w, y0 + kh), (x0 + kw, y0 + h), (x0, y0 + h),
+        (x0 - kw, y0 + h), (x0 - w, y0 + kh), (x0 - w, y0),
+        (x0 - w, y0 - kh), (x0 - kw, y0 - h), (x0, y0 - h),
+        (x0 + kw, y0 - h), (x0 + w, y0 - kh), (x0 + w, y0)
+    ])
+
+# EOF -------------------------------------------------------------------------
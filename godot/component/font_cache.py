@@ -0,0 +1,121 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines process-wide caches of Kiva fonts and text extents.
+
+Parsing a font specification with str_to_font() is relatively expensive and
+labels are redrawn frequently, so fonts are cached by specification and text
+extents by (specification, text).  Both caches are bounded and discard the
+least recently used entries first.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from enthought.kiva.fonttools.font import str_to_font
+
+from godot.cache import LRUCache
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Maximum number of cached fonts.
+FONT_CACHE_SIZE = 256
+
+# Maximum number of cached text extents.
+EXTENT_CACHE_SIZE = 16384
+
+#------------------------------------------------------------------------------
+#  Caches:
+#------------------------------------------------------------------------------
+
+_fonts = LRUCache(FONT_CACHE_SIZE)
+
+_extents = LRUCache(EXTENT_CACHE_SIZE)
+
+# Graphics context on which text is measured when not being drawn.
+_measure_gc = None
+
+#------------------------------------------------------------------------------
+#  Returns the font for a specification:
+#------------------------------------------------------------------------------
+
+def get_font(spec):
+    """ Returns the Kiva font for a font specification such as "Arial 14".
+    """
+    spec = str(spec)
+    font = _fonts.get(spec)
+    if font is None:
+        font = str_to_font(spec)
+        _fonts.set(spec, font)
+    return font
+
+#------------------------------------------------------------------------------
+#  Returns the extent of some text:
+#------------------------------------------------------------------------------
+
+def get_text_extent(gc, spec, text):
+    """ Returns the extent (x, y, width, height) of the text drawn in the
+        given font.  The text is measured on the graphics context the first
+        time only, leaving its font set to the given font.
+    """
+    spec = str(spec)
+    key = (spec, text)
+    extent = _extents.get(key)
+    if extent is None:
+        gc.set_font(get_font(spec))
+        extent = tuple(gc.get_text_extent(text))
+        _extents.set(key, extent)
+    return extent
+
+#------------------------------------------------------------------------------
+#  Returns the width of some text:
+#------------------------------------------------------------------------------
+
+def get_text_width(spec, text):
+    """ Returns the width of the text drawn in the given font, measuring it
+        on a small image graphics context if its extent is not cached.
+    """
+    global _measure_gc
+
+    extent = _extents.get((str(spec), text))
+    if extent is None:
+        if _measure_gc is None:
+            from enthought.kiva.backend_image import GraphicsContext
+            _measure_gc = GraphicsContext((1, 1))
+        extent = get_text_extent(_measure_gc, spec, text)
+    return extent[2]
+
+#------------------------------------------------------------------------------
+#  Empties the caches:
+#------------------------------------------------------------------------------
+
+def clear_font_cache():
+    """ Removes all cached fonts and text extents.
+    """
+    _fonts.clear()
+    _extents.clear()
+
+# EOF -------------------------------------------------------------------------
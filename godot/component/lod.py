@@ -0,0 +1,121 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines level-of-detail policies for drawing zoomed-out diagrams.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import sqrt, floor, log
+
+from enthought.traits.api import HasTraits, Bool, Float
+from enthought.enable.colors import ColorTrait
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Levels of detail, from full fidelity to nodes drawn as points.
+FULL, NO_TEXT, REDUCED, MINIMAL = range(4)
+
+# Roles of the components drawn for graph elements.
+NODE_ROLE, EDGE_ROLE, ARROW_ROLE, LABEL_ROLE = "node", "edge", "arrow", "label"
+
+# Range of zoom buckets (powers of two) for which scaled drawings are cached.
+MIN_BUCKET, MAX_BUCKET = -8, 8
+
+#------------------------------------------------------------------------------
+#  Returns the scale of a graphics context:
+#------------------------------------------------------------------------------
+
+def get_ctm_scale(gc):
+    """ Returns the scale of the current transformation matrix.
+    """
+    ctm = gc.get_ctm()
+    if hasattr(ctm, "__len__") and len(ctm) == 6:
+        scale = sqrt( (ctm[0] + ctm[1]) * (ctm[0] + ctm[1]) / 2.0 + \
+                      (ctm[2] + ctm[3]) * (ctm[2] + ctm[3]) / 2.0 )
+    elif hasattr(gc, "get_ctm_scale"):
+        scale = gc.get_ctm_scale()
+    else:
+        raise RuntimeError("Unable to get scale from GC.")
+    return scale
+
+#------------------------------------------------------------------------------
+#  Returns the zoom bucket of a scale:
+#------------------------------------------------------------------------------
+
+def zoom_bucket(scale):
+    """ Returns the power of two nearest below the given scale, clamped to
+        the range for which scaled drawings are cached.
+    """
+    if scale <= 0.0:
+        return MIN_BUCKET
+    return max(MIN_BUCKET, min(MAX_BUCKET, int(floor(log(scale, 2)))))
+
+#------------------------------------------------------------------------------
+#  "LODPolicy" class:
+#------------------------------------------------------------------------------
+
+class LODPolicy(HasTraits):
+    """ Maps the scale at which a diagram is drawn to a level of detail.
+    """
+
+    # Simplify drawing when zoomed out?
+    enabled = Bool(True, desc="that drawing is simplified when zoomed out")
+
+    # Below this scale, text is not drawn.
+    text_scale = Float(0.5, desc="scale below which text is not drawn")
+
+    # Below this scale, arrowheads are not drawn, edges are drawn as straight
+    # chords and nodes as boxes.
+    reduced_scale = Float(0.3, desc="scale below which nodes are drawn as "
+        "boxes and edges as chords")
+
+    # Below this scale, nodes are drawn as points.
+    minimal_scale = Float(0.1, desc="scale below which nodes are drawn as "
+        "points")
+
+    # Colour of simplified nodes and edges.
+    color = ColorTrait("black", desc="colour of simplified nodes and edges")
+
+    # Size of nodes drawn as points, in pixels.
+    point_size = Float(2.0, desc="size of nodes drawn as points in pixels")
+
+
+    def level(self, scale):
+        """ Returns the level of detail for the given scale.
+        """
+        if not self.enabled:
+            return FULL
+        elif scale < self.minimal_scale:
+            return MINIMAL
+        elif scale < self.reduced_scale:
+            return REDUCED
+        elif scale < self.text_scale:
+            return NO_TEXT
+        else:
+            return FULL
+
+# EOF -------------------------------------------------------------------------
@@ -42,8 +42,9 @@ class Pen(HasTraits):
     # Fill colour.
     fill_color = Color("black", desc="fill colour")
 
-    # Stroke width in points.
-    line_width = Range(low=1, high=8, value=1, desc="stroke width in points")
+    # Stroke width in points, which may be fractional.
+    line_width = Range(low=0.0, high=8.0, value=1.0,
+        desc="stroke width in points")
 
     # Text font.
     font = Font#("14 point Arial")
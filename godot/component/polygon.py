@@ -29,7 +29,7 @@ References:
 from numpy import array
 
 from enthought.traits.api import \
-    Instance, Float, Bool, List, Trait, Tuple, on_trait_change
+    Instance, Bool, Array, Trait, on_trait_change
 
 from enthought.traits.ui.api import View, Item, Group
 from enthought.enable.api import Component
@@ -53,10 +53,8 @@ class Polygon(Component):
     pen = Instance(Pen, desc="the pen with which to draw the polygon")
 
     # Points defining the vertices of the polygon
-    points = List(
-        Tuple(Float, Float, labels=["x", "y"], cols=2),
-        desc="points defining the vertices of the polygon"
-    )
+    points = Array(dtype=float, shape=(None, 2),
+        desc="points defining the vertices of the polygon")
 
     # Is the polygon filled?
     filled = Bool(False, desc="Should the component be filled")
@@ -122,10 +120,12 @@ class Polygon(Component):
     def is_in(self, point_x, point_y):
         """ Test if a point is within this polygonal region """
 
+        if len(self.points) < 3:
+            return False
+
         point_array = array(((point_x, point_y),))
-        vertices = array(self.points)
         winding = self.inside_rule == "winding"
-        result = points_in_polygon(point_array, vertices, winding)
+        result = points_in_polygon(point_array, self.points, winding)
         return result[0]
 
 
@@ -146,13 +146,9 @@ class Polygon(Component):
 
     @on_trait_change("pen.+,points,filled")
     def _update(self):
-        if not self.points: return
-        x_points = [x for x, y in self.points]
-        y_points = [y for x, y in self.points]
-        x = min(x_points)
-        x2 = max(x_points)
-        y = min(y_points)
-        y2 = max(y_points)
+        if len(self.points) == 0: return
+        x, y = self.points.min(axis=0)
+        x2, y2 = self.points.max(axis=0)
         self.position = [x, y]
         # Don't let bounds be set to 0, otherwise, horizontal and vertical
         # lines will not render because enable skips rendering items with
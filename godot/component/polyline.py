@@ -21,13 +21,10 @@
 #  Imports:
 #------------------------------------------------------------------------------
 
-from enthought.traits.api import \
-    Instance, Float, Bool, List, Trait, Tuple, on_trait_change
+from enthought.traits.api import Instance, Array, on_trait_change
 
 from enthought.traits.ui.api import View, Item, Group
 from enthought.enable.api import Component
-from enthought.kiva import EOF_FILL_STROKE, FILL_STROKE
-from enthought.kiva.agg import points_in_polygon
 
 from pen import Pen
 
@@ -46,10 +43,8 @@ class Polyline(Component):
     pen = Instance(Pen, desc="the pen with which to draw the lines")
 
     # Points defining the line ends.
-    points = List(
-        Tuple(Float, Float, labels=["x", "y"], cols=2, minlen=2),
-        desc="points defining the line ends"
-    )
+    points = Array(dtype=float, shape=(None, 2),
+        desc="points defining the line ends")
 
     #--------------------------------------------------------------------------
     #  "Component" interface:
@@ -115,13 +110,9 @@ class Polyline(Component):
 
     @on_trait_change("pen.+,points")
     def _update(self):
-        if not self.points: return
-        x_points = [x for x, y in self.points]
-        y_points = [y for x, y in self.points]
-        x = min(x_points)
-        x2 = max(x_points)
-        y = min(y_points)
-        y2 = max(y_points)
+        if len(self.points) == 0: return
+        x, y = self.points.min(axis=0)
+        x2, y2 = self.points.max(axis=0)
         self.position = [x, y]
         # Don't let bounds be set to 0, otherwise, horizontal and vertical
         # lines will not render because enable skips rendering items with
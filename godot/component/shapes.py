@@ -0,0 +1,287 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines templates for drawing nodes from their position and size alone,
+and edges from their spline control points.
+
+Each Graphviz polygon shape is reduced to a unit template, the vertices of
+the shape scaled to fit a box of unit width and height centred on the
+origin.  Templates are computed once per set of shape parameters and then
+scaled and translated to the size and position of each node, so nodes can
+be drawn without fetching and parsing their xdot drawing operations.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import pi, sqrt, hypot
+
+from numpy import arange, cos, sin, column_stack, array, asarray
+
+from pen import Pen
+from ellipse import Ellipse
+from polygon import Polygon
+from bspline import BSpline
+from text import Text
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+POINTS_PER_INCH = 72.0
+
+# Shapes drawn as ellipses.
+ELLIPTICAL_SHAPES = ["ellipse", "oval", "circle", "doublecircle", "Mcircle",
+    "egg", "point"]
+
+# Shapes with no outline.
+EMPTY_SHAPES = ["none", "plaintext"]
+
+# Half-width of an arrowhead relative to its length (as Graphviz).
+ARROW_WIDTH = 0.35
+
+# Polygon parameters (sides, orientation, distortion, skew) of the named
+# shapes, as used by Graphviz.  Shapes with decorations are drawn by their
+# outline alone.
+POLYGON_SHAPES = {
+    "box":           (4, 0.0, 0.0, 0.0),
+    "rect":          (4, 0.0, 0.0, 0.0),
+    "rectangle":     (4, 0.0, 0.0, 0.0),
+    "square":        (4, 0.0, 0.0, 0.0),
+    "note":          (4, 0.0, 0.0, 0.0),
+    "tab":           (4, 0.0, 0.0, 0.0),
+    "box3d":         (4, 0.0, 0.0, 0.0),
+    "component":     (4, 0.0, 0.0, 0.0),
+    "Msquare":       (4, 0.0, 0.0, 0.0),
+    "triangle":      (3, 0.0, 0.0, 0.0),
+    "invtriangle":   (3, 180.0, 0.0, 0.0),
+    "diamond":       (4, 45.0, 0.0, 0.0),
+    "Mdiamond":      (4, 45.0, 0.0, 0.0),
+    "trapezium":     (4, 0.0, -0.4, 0.0),
+    "invtrapezium":  (4, 180.0, -0.4, 0.0),
+    "parallelogram": (4, 0.0, 0.0, 0.6),
+    "house":         (5, 0.0, -0.64, 0.0),
+    "invhouse":      (5, 180.0, -0.64, 0.0),
+    "pentagon":      (5, 0.0, 0.0, 0.0),
+    "hexagon":       (6, 0.0, 0.0, 0.0),
+    "septagon":      (7, 0.0, 0.0, 0.0),
+    "octagon":       (8, 0.0, 0.0, 0.0),
+    "doubleoctagon": (8, 0.0, 0.0, 0.0),
+    "tripleoctagon": (8, 0.0, 0.0, 0.0),
+}
+
+#------------------------------------------------------------------------------
+#  Template cache:
+#------------------------------------------------------------------------------
+
+_templates = {}
+
+#------------------------------------------------------------------------------
+#  Returns the unit template of a polygon:
+#------------------------------------------------------------------------------
+
+def polygon_template(sides, orientation=0.0, distortion=0.0, skew=0.0):
+    """ Returns the vertices of a polygon with the given number of sides,
+        orientation (in degrees), distortion and skew, scaled to fit a unit
+        box centred on the origin.  Templates are cached.
+    """
+    sides = max(int(sides), 3)
+    key = (sides, float(orientation), float(distortion), float(skew))
+    template = _templates.get(key)
+    if template is not None:
+        return template
+
+    # Vertices on a circle, with the bottom side horizontal (as Graphviz).
+    sector = 2.0 * pi / sides
+    angles = -pi / 2.0 + sector / 2.0 + arange(sides) * sector
+    x, y = 0.5 * cos(angles), 0.5 * sin(angles)
+
+    # Distortion widens the top relative to the bottom; skew shears.
+    if distortion or skew:
+        skewdist = hypot(abs(distortion) + abs(skew), 1.0)
+        gdistortion = distortion * sqrt(2.0) / cos(sector / 2.0)
+        x = x * (skewdist + y * gdistortion) + y * skew / 2.0
+
+    if orientation:
+        theta = orientation * pi / 180.0
+        x, y = x * cos(theta) - y * sin(theta), x * sin(theta) + y * cos(theta)
+
+    x = (x - (x.max() + x.min()) / 2.0) / (x.max() - x.min())
+    y = (y - (y.max() + y.min()) / 2.0) / (y.max() - y.min())
+
+    template = column_stack((x, y))
+    _templates[key] = template
+    return template
+
+#------------------------------------------------------------------------------
+#  Returns the template of a node shape:
+#------------------------------------------------------------------------------
+
+def shape_template(shape, sides=4, orientation=0.0, distortion=0.0, skew=0.0):
+    """ Returns the unit template of a named shape, or None for shapes
+        drawn as ellipses or not drawn.  The sides, distortion and skew are
+        used by the "polygon" shape; orientation applies to all polygons.
+    """
+    if (shape in ELLIPTICAL_SHAPES) or (shape in EMPTY_SHAPES):
+        return None
+    if shape in POLYGON_SHAPES:
+        sides, base, distortion, skew = POLYGON_SHAPES[shape]
+        orientation = (base + orientation) % 360.0
+    return polygon_template(sides, orientation, distortion, skew)
+
+#------------------------------------------------------------------------------
+#  Returns the components drawing the shape of a node:
+#------------------------------------------------------------------------------
+
+def node_shape_components(node):
+    """ Returns the components drawing the outline of a node from its
+        shape, position and size.
+    """
+    shape = node.shape
+    if shape in EMPTY_SHAPES:
+        return []
+
+    x, y = node.pos
+    width = node.width * POINTS_PER_INCH
+    height = node.height * POINTS_PER_INCH
+    if shape in ("circle", "doublecircle", "Mcircle", "point"):
+        width = height = min(width, height)
+
+    pen = Pen(color=node.color, fill_color=node.fillcolor)
+    filled = ("filled" in node.style) or (shape == "point")
+
+    if shape in ELLIPTICAL_SHAPES:
+        return [Ellipse(pen=pen, x_origin=x, y_origin=y, e_width=width / 2,
+                        e_height=height / 2, filled=filled)]
+
+    template = shape_template(shape, node.sides, node.orientation,
+        node.distortion, node.skew)
+    points = template * array((width, height)) + array((x, y))
+    return [Polygon(pen=pen, points=points, filled=filled)]
+
+#------------------------------------------------------------------------------
+#  Returns the components drawing the label of a node:
+#------------------------------------------------------------------------------
+
+def node_label_components(node):
+    """ Returns the components drawing the label of a node at its position.
+    """
+    text = node.label
+    if text in ("", "\\N"):
+        text = node.ID
+    if (not text) or (node.shape == "point"):
+        return []
+
+    pen = Pen(color=node.fontcolor,
+              font="%s %d" % (font_face(node.fontname), node.fontsize))
+
+    x, y = node.pos
+    return [Text(pen=pen, text_x=x, text_y=y, justification=0, text=text)]
+
+#------------------------------------------------------------------------------
+#  Returns the components drawing an edge spline:
+#------------------------------------------------------------------------------
+
+def edge_spline_components(edge):
+    """ Returns the components drawing the spline of an edge from its
+        control points.
+    """
+    if len(edge.pos) < 4:
+        return []
+    pen = Pen(color=edge.color)
+    return [BSpline(pen=pen, points=asarray(edge.pos, dtype=float))]
+
+#------------------------------------------------------------------------------
+#  Returns the components drawing the arrowheads of an edge:
+#------------------------------------------------------------------------------
+
+def edge_arrow_components(edge):
+    """ Returns the components drawing the arrowheads of an edge, which go
+        from the ends of its spline to the end points given in its pos.
+    """
+    if not edge.pos:
+        return []
+
+    components = []
+    for base, tip, style in [(edge.pos[-1], edge.endp, edge.arrowhead),
+                             (edge.pos[0], edge.startp, edge.arrowtail)]:
+        if (tip is None) or (style == "none"):
+            continue
+        pen = Pen(color=edge.color, fill_color=edge.color)
+        filled = not (style.startswith("o") or ("empty" in style))
+        components.append(Polygon(pen=pen, points=arrowhead(base, tip, style),
+                                  filled=filled))
+    return components
+
+
+def arrowhead(base, tip, style="normal"):
+    """ Returns the vertices of a triangular arrowhead from the base point to
+        the tip point.  Inverted styles point back towards the base.
+    """
+    (x1, y1), (x2, y2) = base, tip
+    if style.startswith("inv"):
+        (x1, y1), (x2, y2) = (x2, y2), (x1, y1)
+    # Perpendicular to the arrow, scaled to half its width.
+    nx, ny = (y1 - y2) * ARROW_WIDTH, (x2 - x1) * ARROW_WIDTH
+    return array([(x1 + nx, y1 + ny), (x2, y2), (x1 - nx, y1 - ny)])
+
+#------------------------------------------------------------------------------
+#  Returns the components drawing the label of an edge:
+#------------------------------------------------------------------------------
+
+def edge_label_components(edge):
+    """ Returns the components drawing the label of an edge at its label
+        position.
+    """
+    if not edge.label:
+        return []
+
+    pen = Pen(color=edge.fontcolor,
+              font="%s %d" % (font_face(edge.fontname), edge.fontsize))
+
+    x, y = edge.lp
+    return [Text(pen=pen, text_x=x, text_y=y, justification=0,
+                 text=edge.label)]
+
+#------------------------------------------------------------------------------
+#  Returns the face name of a font:
+#------------------------------------------------------------------------------
+
+def font_face(font, default="Times-Roman"):
+    """ Returns the face name of a font trait value, which is a string or a
+        Kiva, wx or Qt font depending on the toolkit in use.
+    """
+    if isinstance(font, basestring):
+        face = font
+    elif hasattr(font, "face_name"):
+        face = font.face_name
+    elif hasattr(font, "GetFaceName"):
+        face = font.GetFaceName()
+    elif hasattr(font, "family"):
+        face = font.family()
+    else:
+        face = None
+    return str(face) if face else default
+
+# EOF -------------------------------------------------------------------------
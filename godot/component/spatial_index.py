@@ -0,0 +1,197 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a spatial index of axis-aligned bounding boxes.
+
+The index is a packed R-tree built using the Sort-Tile-Recursive algorithm.
+Each level of the tree is held as an array of bounding boxes so that queries
+descend the tree one level at a time using vectorised comparisons.
+
+References:
+    S. Leutenegger, M. Lopez and J. Edgington, 'STR: A Simple and Efficient
+    Algorithm for R-Tree Packing', ICDE, 1997.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import ceil, sqrt
+
+from numpy import \
+    arange, asarray, empty, lexsort, argsort, column_stack, minimum, \
+    maximum, newaxis
+
+#------------------------------------------------------------------------------
+#  "SpatialIndex" class:
+#------------------------------------------------------------------------------
+
+class SpatialIndex(object):
+    """ Packed R-tree of bounding boxes.  Items are identified by their
+        position in the sequence of boxes from which the index is built and
+        that position also defines their stacking order; items added later
+        are considered to be on top.
+    """
+
+    def __init__(self, boxes=None, node_capacity=16):
+        """ Initialises the index from an optional sequence of boxes of the
+            form (x1, y1, x2, y2).
+        """
+        # Maximum number of children of each tree node.
+        self.node_capacity = node_capacity
+
+        # Bounding boxes for each level of the tree, leaves first.
+        self._levels = []
+
+        # Item identifiers in leaf order.
+        self._order = empty((0,), dtype=int)
+
+        # Item bounding boxes in item order.
+        self._boxes = empty((0, 4))
+
+        if boxes is not None:
+            self.build(boxes)
+
+
+    def __len__(self):
+        """ Returns the number of indexed items.
+        """
+        return len(self._boxes)
+
+    #--------------------------------------------------------------------------
+    #  Public interface:
+    #--------------------------------------------------------------------------
+
+    def build(self, boxes):
+        """ Replaces the contents of the index with the given boxes.
+        """
+        boxes = asarray(boxes, dtype=float).reshape((-1, 4))
+        # Normalise boxes specified with their corners swapped.
+        boxes = column_stack((minimum(boxes[:, 0], boxes[:, 2]),
+                              minimum(boxes[:, 1], boxes[:, 3]),
+                              maximum(boxes[:, 0], boxes[:, 2]),
+                              maximum(boxes[:, 1], boxes[:, 3])))
+        self._boxes = boxes
+
+        n = len(boxes)
+        capacity = self.node_capacity
+        if n == 0:
+            self._levels = []
+            self._order = empty((0,), dtype=int)
+            return
+
+        # Sort-Tile-Recursive packing: sort the centres by x, cut them into
+        # vertical slices and sort each slice by y.
+        cx = boxes[:, 0] + boxes[:, 2]
+        cy = boxes[:, 1] + boxes[:, 3]
+
+        n_leaves = int(ceil(n / float(capacity)))
+        n_slices = int(ceil(sqrt(n_leaves)))
+        slice_size = n_slices * capacity
+
+        order = argsort(cx, kind="mergesort")
+        slices = arange(n) // slice_size
+        order = order[lexsort((cy[order], slices))]
+
+        level = boxes[order]
+        levels = [level]
+        while len(level) > capacity:
+            starts = arange(0, len(level), capacity)
+            level = column_stack((minimum.reduceat(level[:, 0], starts),
+                                  minimum.reduceat(level[:, 1], starts),
+                                  maximum.reduceat(level[:, 2], starts),
+                                  maximum.reduceat(level[:, 3], starts)))
+            levels.append(level)
+
+        self._levels = levels
+        self._order = order
+
+
+    def query_point(self, x, y, tolerance=0.0):
+        """ Returns the identifiers of the items whose boxes contain the
+            point, topmost first.
+        """
+        return self.query_rect(x - tolerance, y - tolerance,
+                               x + tolerance, y + tolerance)
+
+
+    def query_rect(self, x1, y1, x2, y2, contained=False):
+        """ Returns the identifiers of the items whose boxes intersect the
+            rectangle, topmost first.  If 'contained' is True, only items
+            lying entirely within the rectangle are returned.
+        """
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+
+        ids = self._search(x1, y1, x2, y2)
+
+        if contained and len(ids):
+            b = self._boxes[ids]
+            inside = (b[:, 0] >= x1) & (b[:, 1] >= y1) & \
+                (b[:, 2] <= x2) & (b[:, 3] <= y2)
+            ids = ids[inside]
+
+        return ids
+
+
+    def bounds(self, item):
+        """ Returns the box of the given item as (x1, y1, x2, y2).
+        """
+        return tuple(self._boxes[item])
+
+    #--------------------------------------------------------------------------
+    #  Protected interface:
+    #--------------------------------------------------------------------------
+
+    def _search(self, x1, y1, x2, y2):
+        """ Descends the tree, keeping only nodes that intersect the query
+            rectangle at each level.
+        """
+        levels = self._levels
+        if not levels:
+            return empty((0,), dtype=int)
+
+        capacity = self.node_capacity
+        children = arange(capacity)
+
+        depth = len(levels) - 1
+        candidates = arange(len(levels[depth]))
+        while True:
+            b = levels[depth][candidates]
+            hit = (b[:, 0] <= x2) & (b[:, 2] >= x1) & \
+                (b[:, 1] <= y2) & (b[:, 3] >= y1)
+            candidates = candidates[hit]
+
+            if depth == 0 or len(candidates) == 0:
+                break
+
+            depth -= 1
+            candidates = (candidates[:, newaxis] * capacity + children).ravel()
+            candidates = candidates[candidates < len(levels[depth])]
+
+        ids = self._order[candidates]
+        ids.sort()
+
+        return ids[::-1]
+
+# EOF -------------------------------------------------------------------------
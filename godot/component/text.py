@@ -26,8 +26,6 @@ References:
 #  Imports:
 #------------------------------------------------------------------------------
 
-from math import sqrt
-
 from enthought.traits.api import \
     Instance, Float, Int, String, Trait, on_trait_change
 
@@ -35,10 +33,11 @@ from enthought.traits.ui.api import View, Item, Group
 from enthought.enable.api import Component
 #from enthought.kiva import Font as KivaFont
 #from enthought.kiva import MODERN
-from enthought.kiva.fonttools.font import str_to_font
 #from enthought.kiva import Font, MODERN
 
 from pen import Pen
+from font_cache import get_font, get_text_extent, get_text_width
+from lod import get_ctm_scale
 
 #------------------------------------------------------------------------------
 #  "Text" class:
@@ -96,23 +95,21 @@ class Text(Component):
         gc.save_state()
         try:
             # Specify the font
-            font = str_to_font(str(self.pen.font))
+            font = get_font(self.pen.font)
             gc.set_font(font)
 
             gc.set_fill_color(self.pen.color_)
 
-            x = self.text_x - ( self.text_w / 2 )
+            # Measure the text once if the library did not give its width.
+            text_w = self.text_w
+            if not text_w:
+                text_w = get_text_extent(gc, self.pen.font, self.text)[2]
+
+            x = self.text_x - ( text_w / 2 )
             y = self.text_y - ( font.size / 2 )
 
             # Show text at the same scale as the graphics context
-            ctm = gc.get_ctm()
-            if hasattr(ctm, "__len__") and len(ctm) == 6:
-                scale = sqrt( (ctm[0] + ctm[1]) * (ctm[0] + ctm[1]) / 2.0 + \
-                              (ctm[2] + ctm[3]) * (ctm[2] + ctm[3]) / 2.0 )
-            elif hasattr(gc, "get_ctm_scale"):
-                scale = gc.get_ctm_scale()
-            else:
-                raise RuntimeError("Unable to get scale from GC.")
+            scale = get_ctm_scale(gc)
             x *= scale
             y *= scale
             gc.show_text_at_point(self.text, x, y)
@@ -125,10 +122,15 @@ class Text(Component):
         if self.pen is None:
             return
 
-        x = self.text_x - (self.text_w / 2)
-        x2 = x + self.text_w
+        # Measure the text once if the library did not give its width.
+        text_w = self.text_w
+        if not text_w:
+            text_w = get_text_width(self.pen.font, self.text)
+
+        x = self.text_x - (text_w / 2)
+        x2 = x + text_w
 
-        font = str_to_font( str(self.pen.font) )
+        font = get_font( self.pen.font )
 
         y = self.text_y - (font.size / 2)
         y2 = y + font.size
@@ -0,0 +1,153 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a cache of raster tiles used to pan very large diagrams.
+
+The diagram is divided into square tiles of a fixed size in pixels for each
+zoom bucket (power of two) at which it is drawn.  Tiles are rendered once
+with Kiva's image backend and afterwards blitted, so panning costs a handful
+of image draws regardless of the number of primitives.  Tiles are rendered
+at the upper scale of their bucket and scaled down when blitted.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import floor
+
+from enthought.traits.api import HasTraits, Int, Instance
+from enthought.kiva.backend_image import GraphicsContext
+
+from godot.cache import LRUCache
+from lod import get_ctm_scale, zoom_bucket
+
+#------------------------------------------------------------------------------
+#  "TileCache" class:
+#------------------------------------------------------------------------------
+
+class TileCache(HasTraits):
+    """ Caches raster tiles of a diagram keyed by (bucket, column, row).
+    """
+
+    #--------------------------------------------------------------------------
+    #  "TileCache" interface:
+    #--------------------------------------------------------------------------
+
+    # Width and height of the tiles in pixels.
+    tile_size = Int(256, desc="width and height of the tiles in pixels")
+
+    # Maximum number of tiles held before the least recently used are dropped.
+    max_tiles = Int(512, desc="maximum number of cached tiles")
+
+    # Rendered tiles.
+    _tiles = Instance(LRUCache)
+
+    #--------------------------------------------------------------------------
+    #  "object" interface:
+    #--------------------------------------------------------------------------
+
+    def __init__(self, **traits):
+        """ Initialises the cache.
+        """
+        super(TileCache, self).__init__(**traits)
+        self._tiles = LRUCache(self.max_tiles)
+
+    #--------------------------------------------------------------------------
+    #  Public interface:
+    #--------------------------------------------------------------------------
+
+    def draw(self, gc, draw, view_bounds, mode="default"):
+        """ Blits the tiles covering the view bounds onto the graphics
+            context, rendering missing tiles by calling
+            draw(gc, view_bounds, mode) on an image graphics context.
+        """
+        bucket = zoom_bucket(get_ctm_scale(gc))
+        span = self._span(bucket)
+
+        x, y, w, h = view_bounds[:4]
+        ix1, iy1 = int(floor(x / span)), int(floor(y / span))
+        ix2, iy2 = int(floor((x + w) / span)), int(floor((y + h) / span))
+
+        for ix in range(ix1, ix2 + 1):
+            for iy in range(iy1, iy2 + 1):
+                key = (bucket, ix, iy)
+                tile = self._tiles.get(key)
+                if tile is None:
+                    tile = self._render(draw, bucket, ix, iy, mode)
+                    self._tiles.set(key, tile)
+                gc.draw_image(tile, (ix * span, iy * span, span, span))
+
+
+    def invalidate_rect(self, x1, y1, x2, y2):
+        """ Discards the tiles that intersect the given rectangle.
+        """
+        for key in self._tiles.keys():
+            bucket, ix, iy = key
+            span = self._span(bucket)
+            if (ix * span <= x2) and ((ix + 1) * span >= x1) and \
+                    (iy * span <= y2) and ((iy + 1) * span >= y1):
+                self._tiles.discard(key)
+
+
+    def invalidate(self):
+        """ Discards all tiles.
+        """
+        self._tiles.clear()
+
+    #--------------------------------------------------------------------------
+    #  Protected interface:
+    #--------------------------------------------------------------------------
+
+    def _span(self, bucket):
+        """ Returns the width of the tiles of a zoom bucket in diagram units.
+        """
+        return self.tile_size / 2.0 ** (bucket + 1)
+
+
+    def _render(self, draw, bucket, ix, iy, mode):
+        """ Renders a tile onto a transparent image graphics context.
+        """
+        size = self.tile_size
+        span = self._span(bucket)
+        x, y = ix * span, iy * span
+
+        gc = GraphicsContext((size, size), pix_format="rgba32")
+        gc.clear((0.0, 0.0, 0.0, 0.0))
+        gc.scale_ctm(2.0 ** (bucket + 1), 2.0 ** (bucket + 1))
+        gc.translate_ctm(-x, -y)
+        draw(gc, (x, y, span, span), mode)
+
+        return gc
+
+    #--------------------------------------------------------------------------
+    #  Trait change handlers:
+    #--------------------------------------------------------------------------
+
+    def _max_tiles_changed(self, new):
+        """ Handles the maximum number of tiles changing.
+        """
+        if self._tiles is not None:
+            self._tiles.maxsize = new
+
+# EOF -------------------------------------------------------------------------
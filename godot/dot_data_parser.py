@@ -39,6 +39,7 @@ from subgraph import Subgraph
 from cluster import Cluster
 from node import Node
 from edge import Edge
+from plain_parser import parse_spline
 
 #------------------------------------------------------------------------------
 #  "GodotDataParser" class:
@@ -72,16 +73,22 @@ class GodotDataParser(DotDataParser):
         opts = toks[3]
         dummy_edge = Edge("dummy1", "dummy2")
         # Coerce attribute types.
-        for key, value in opts.iteritems():
+        for key, value in opts.items():
             trait = dummy_edge.trait(key)
             if trait is not None:
-                # FIXME: Implement Graphviz spline types.
-                if trait.is_trait_type( List ):
+                if key == "pos":
+                    # pos="e,39,61 39,97 39,89 39,80 39,71"
+                    points, startp, endp = parse_spline( value )
+                    opts[key] = points
+                    if startp is not None:
+                        opts["startp"] = startp
+                    if endp is not None:
+                        opts["endp"] = endp
+
+                elif trait.is_trait_type( List ):
                     p = [] # List of float doublets.
                     for t in value.split( " " ):
                         l = t.split( "," )
-                        if len(l) == 3: # pos="e,39,61 39,97 39,89 39,80 39,71"
-                            l.pop(0)
                         f = [ float(a) for a in l ]
                         p.append( tuple(f) )
                     opts[key] = p
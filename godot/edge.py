@@ -460,6 +460,16 @@ class Edge(HasTraits):
     # ignores any such flag.
     pos = List(Tuple(Float, Float), desc="spline control points")
 
+    # Point touched by the head arrowhead, given by the "e," prefix of pos.
+    # The arrowhead goes from the last control point to this point.
+    endp = Trait(None, None, Tuple(Float, Float),
+        desc="point touched by the head arrowhead")
+
+    # Point touched by the tail arrowhead, given by the "s," prefix of pos.
+    # The arrowhead goes from the first control point to this point.
+    startp = Trait(None, None, Tuple(Float, Float),
+        desc="point touched by the tail arrowhead")
+
     # Edges with the same head and the same <html:a rel="attr">samehead</html:a> value are aimed
     # at the same point on the head.
     # See <html:a rel="note">undirected</html:a>.
@@ -708,25 +718,9 @@ class Edge(HasTraits):
         """ Arrange the components of the node using Graphviz.
         """
         # FIXME: Circular reference avoidance.
-        import godot.dot_data_parser
-        import godot.graph
-
-        graph = godot.graph.Graph( ID="g", directed=True )
-        self.conn = "->"
-        graph.edges.append( self )
-
-        xdot_data = graph.create( format="xdot" )
-#        print "XDOT DATA:", xdot_data
-
-        parser = godot.dot_data_parser.GodotDataParser()
-        ndata = xdot_data.replace('\\\n','')
-        tokens = parser.dotparser.parseString(ndata)[0]
+        from godot.batch import arrange_elements
 
-        for element in tokens[3]:
-            cmd = element[0]
-            if cmd == "add_edge":
-                cmd, src, dest, opts = element
-                self.set( **opts )
+        arrange_elements( [self] )
 
 
 #    @on_trait_change("_draw_,_hdraw_")
@@ -754,9 +748,7 @@ class Edge(HasTraits):
 #                c.position = [ c.x - x1, c.y - y1 ]
 
             elif isinstance(c, (Polygon, BSpline)):
-                print "Points:", c.points
-                c.points = [ (t[0] - x1, t[1] - y1) for t in c.points ]
-                print "Points:", c.points
+                c.points = c.points - (x1, y1)
 
             elif isinstance(c, Text):
 #                font = str_to_font( str(c.pen.font) )
@@ -0,0 +1,252 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines exporters that write parsed xdot components to SVG and PDF.
+
+Once a graph has been laid out its nodes and edges hold positioned drawing
+operations, so other formats can be written from the parsed components
+rather than by running Graphviz again.  SVG is streamed directly; PDF is
+drawn through Kiva's PDF backend, which requires ReportLab.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from xml.sax.saxutils import escape, quoteattr
+
+from godot.component.api import \
+    Ellipse, Polygon, Polyline, BSpline, Text, DisplayList, get_font
+
+from godot.render import graph_items
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Text anchors for the xdot justifications (LEFT, CENTER, RIGHT = -1, 0, 1).
+TEXT_ANCHORS = {-1: "start", 0: "middle", 1: "end"}
+
+#------------------------------------------------------------------------------
+#  Returns the extent of some components:
+#------------------------------------------------------------------------------
+
+def components_extent(components):
+    """ Returns the rectangle (x1, y1, x2, y2) enclosing the components.
+    """
+    if not components:
+        return 0.0, 0.0, 0.0, 0.0
+
+    x1 = min([c.x for c in components])
+    y1 = min([c.y for c in components])
+    x2 = max([c.x + c.width for c in components])
+    y2 = max([c.y + c.height for c in components])
+
+    return x1, y1, x2, y2
+
+#------------------------------------------------------------------------------
+#  Converts a colour to SVG:
+#------------------------------------------------------------------------------
+
+def svg_color(color):
+    """ Returns an SVG colour and opacity for a pen colour, which may be an
+        RGB(A) sequence (0-1 or 0-255) or a toolkit colour object.
+    """
+    if hasattr(color, "Red"):
+        rgba = (color.Red(), color.Green(), color.Blue(), color.Alpha())
+    elif hasattr(color, "red"):
+        rgba = (color.red(), color.green(), color.blue(), color.alpha())
+    else:
+        rgba = tuple(color)
+        if max(rgba) <= 1.0:
+            rgba = tuple([int(round(v * 255)) for v in rgba])
+        if len(rgba) == 3:
+            rgba += (255,)
+
+    r, g, b, a = rgba
+    return "#%02x%02x%02x" % (r, g, b), a / 255.0
+
+#------------------------------------------------------------------------------
+#  "SVGWriter" class:
+#------------------------------------------------------------------------------
+
+class SVGWriter(object):
+    """ Streams components to a file-like object as an SVG document.  The
+        y-axis is flipped, since xdot coordinates increase upwards.
+    """
+
+    def __init__(self, margin=4.0):
+        """ Initialises the writer.
+        """
+        self.margin = margin
+        # Origin of the SVG coordinate system in xdot coordinates.
+        self._x1, self._y2 = 0.0, 0.0
+
+
+    def write(self, components, flo):
+        """ Writes an SVG document drawing the components to 'flo'.
+        """
+        x1, y1, x2, y2 = components_extent(components)
+        m = self.margin
+        self._x1, self._y2 = x1 - m, y2 + m
+        width, height = x2 - x1 + 2 * m, y2 - y1 + 2 * m
+
+        flo.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        flo.write('<svg xmlns="http://www.w3.org/2000/svg" version="1.1" '
+            'width="%.2f" height="%.2f" viewBox="0 0 %.2f %.2f">\n' %
+            (width, height, width, height))
+
+        for component in components:
+            if isinstance(component, Ellipse):
+                self.write_ellipse(component, flo)
+            elif isinstance(component, Polygon):
+                self.write_polygon(component, flo)
+            elif isinstance(component, Polyline):
+                self.write_polyline(component, flo)
+            elif isinstance(component, BSpline):
+                self.write_bspline(component, flo)
+            elif isinstance(component, Text):
+                self.write_text(component, flo)
+
+        flo.write("</svg>\n")
+
+
+    def write_ellipse(self, component, flo):
+        """ Writes an ellipse element.
+        """
+        x, y = self._point(component.x_origin, component.y_origin)
+        flo.write('<ellipse cx="%.2f" cy="%.2f" rx="%.2f" ry="%.2f" %s/>\n' %
+            (x, y, component.e_width, component.e_height,
+             self._style(component.pen, component.filled)))
+
+
+    def write_polygon(self, component, flo):
+        """ Writes a polygon element.
+        """
+        flo.write('<polygon points="%s" %s/>\n' % (
+            self._points(component.points),
+            self._style(component.pen, component.filled)))
+
+
+    def write_polyline(self, component, flo):
+        """ Writes a polyline element.
+        """
+        flo.write('<polyline points="%s" %s/>\n' % (
+            self._points(component.points), self._style(component.pen)))
+
+
+    def write_bspline(self, component, flo):
+        """ Writes a path of cubic Bezier segments.
+        """
+        points = component.points
+        if len(points) == 0:
+            return
+        path = "M%s" % self._points(points[:1])
+        for i in range(1, len(points) - 2, 3):
+            path += " C%s" % self._points(points[i:i + 3])
+        filled = getattr(component, "filled", False)
+        flo.write('<path d="%s" %s/>\n' %
+            (path, self._style(component.pen, filled)))
+
+
+    def write_text(self, component, flo):
+        """ Writes a text element.
+        """
+        font = get_font(component.pen.font)
+        color, opacity = svg_color(component.pen.color_)
+        x, y = self._point(component.text_x, component.text_y)
+        anchor = TEXT_ANCHORS.get(component.justification, "start")
+
+        flo.write('<text x="%.2f" y="%.2f" text-anchor="%s" font-family=%s '
+            'font-size="%.2f" fill="%s" fill-opacity="%.3f">%s</text>\n' %
+            (x, y, anchor, quoteattr(font.face_name or "Times"), font.size,
+             color, opacity, escape(component.text)))
+
+    #--------------------------------------------------------------------------
+    #  Protected interface:
+    #--------------------------------------------------------------------------
+
+    def _point(self, x, y):
+        """ Returns a point in SVG coordinates.
+        """
+        return x - self._x1, self._y2 - y
+
+
+    def _points(self, points):
+        """ Returns a list of points as an SVG coordinate string.
+        """
+        return " ".join(["%.2f,%.2f" % self._point(x, y) for x, y in points])
+
+
+    def _style(self, pen, filled=False):
+        """ Returns the presentation attributes for a pen.
+        """
+        stroke, stroke_opacity = svg_color(pen.color_)
+        style = 'stroke="%s" stroke-width="%g"' % (stroke, pen.line_width)
+        if stroke_opacity < 1.0:
+            style += ' stroke-opacity="%.3f"' % stroke_opacity
+        if filled:
+            fill, fill_opacity = svg_color(pen.fill_color_)
+            style += ' fill="%s"' % fill
+            if fill_opacity < 1.0:
+                style += ' fill-opacity="%.3f"' % fill_opacity
+        else:
+            style += ' fill="none"'
+        return style
+
+#------------------------------------------------------------------------------
+#  Export a graph to SVG:
+#------------------------------------------------------------------------------
+
+def export_svg(graph, flo, margin=4.0):
+    """ Writes the graph as SVG to the file-like object 'flo'.  The graph is
+        laid out first if it has not been.
+    """
+    components = []
+    for element, element_components, role in graph_items(graph):
+        components.extend(element_components)
+    SVGWriter(margin).write(components, flo)
+
+#------------------------------------------------------------------------------
+#  Export a graph to PDF:
+#------------------------------------------------------------------------------
+
+def export_pdf(graph, filename, margin=4.0):
+    """ Writes the graph as a single page PDF document.  The graph is laid
+        out first if it has not been.  Requires ReportLab.
+    """
+    from reportlab.pdfgen.canvas import Canvas
+    from enthought.kiva.backend_pdf import GraphicsContext
+
+    display_list = DisplayList(graph_items(graph, False))
+    x, y = display_list.position
+    w, h = display_list.bounds
+
+    canvas = Canvas(filename, pagesize=(w + 2 * margin, h + 2 * margin))
+    gc = GraphicsContext(canvas)
+    gc.translate_ctm(margin - x, margin - y)
+    display_list.draw(gc)
+    canvas.showPage()
+    canvas.save()
+
+# EOF -------------------------------------------------------------------------
@@ -52,6 +52,11 @@ from common import \
     nojustify_trait, root_trait, showboxes_trait, target_trait, margin_trait
 
 from godot.base_graph import BaseGraph
+from godot.component.api import DiagramCanvas, DisplayList, TileCache
+from godot.component.lod import NODE_ROLE, EDGE_ROLE, ARROW_ROLE, LABEL_ROLE
+from godot.component.shapes import \
+    node_shape_components, node_label_components, edge_spline_components, \
+    edge_arrow_components, edge_label_components
 from godot.node import Node
 from godot.edge import Edge
 from godot.subgraph import Subgraph
@@ -99,6 +104,48 @@ class Graph(BaseGraph):
     # All graphs, subgraphs and clusters.
     all_graphs = Property( List(Instance(BaseGraph)) )
 
+    # Draw each xdot primitive as a separate component or flatten them into
+    # a single display list that batches primitives by pen.
+    render_mode = Enum("components", "display_list",
+        desc="how xdot primitives are added to the canvas")
+
+    # Draw nodes and edges from their xdot drawing operations or from shape
+    # templates scaled to node positions and sizes and from edge splines.
+    draw_source = Enum("xdot", "shapes",
+        desc="how nodes and edges are drawn on the canvas")
+
+    # Never build canvases or viewports, for batch and analysis use.
+    headless = Bool(False, desc="that no canvas is built when the graph "
+        "is arranged")
+
+    # Pan very large graphs by blitting cached raster tiles.
+    use_tiles = Bool(False, desc="that the canvas is drawn from cached "
+        "raster tiles")
+
+    # Internal layouts of clusters keyed by their structural hash.
+    cluster_cache = Any(desc="cached cluster layouts")
+
+    # Re-route the edges of a dragged node and push aside the nodes it
+    # overlaps, without laying out the whole graph again.
+    incremental = Bool(False, desc="that edges are re-routed in-process when "
+        "a node is dragged")
+
+    # Re-arrange from the current node positions with fewer iterations.
+    stable = Bool(False, desc="that arranging starts from the current node "
+        "positions")
+
+    # Keep nodes untouched since the last arrangement where they are when
+    # arranging stably.
+    pin_untouched = Bool(False, desc="that nodes untouched since the last "
+        "arrangement are pinned when arranging stably")
+
+    # IDs of the nodes added, connected or moved since the last arrangement.
+    _touched = Any
+
+    # Layout refining each level of the "multilevel" program.
+    refiner = Enum("force", "stress", desc="layout refining each level of "
+        "a multilevel layout")
+
     #--------------------------------------------------------------------------
     #  Dot trait definitions.
     #--------------------------------------------------------------------------
@@ -862,10 +909,21 @@ class Graph(BaseGraph):
         self.on_trait_change(self._on_edges, "subgraphs*.edges")
         self.on_trait_change(self._on_edges, "subgraphs*.edges_items")
 
+        # Listen for nodes being dragged and re-route their edges.
+        self.on_trait_change(self._on_node_moved, "subgraphs*.nodes.moved")
 
-    def __str__(self):
-        """ Returns a string representation of the graph in dot language. It
-            will return the graph and all its subelements in string form.
+        # Record the nodes touched since the last arrangement.
+        self._touched = set()
+        self.on_trait_change(self._on_touched, "subgraphs*.nodes")
+        self.on_trait_change(self._on_touched, "subgraphs*.nodes_items")
+        self.on_trait_change(self._on_touched, "subgraphs*.edges")
+        self.on_trait_change(self._on_touched, "subgraphs*.edges_items")
+
+
+    def to_dot(self, elements=None, exclude=(), ID=None):
+        """ Returns the graph in dot language, optionally with only the
+            given elements, without the attributes named in 'exclude' and
+            with another ID.
         """
         s = ""
         if self.strict:
@@ -876,7 +934,8 @@ class Graph(BaseGraph):
         else:
             s += "graph"
 
-        return "%s %s" % ( s, super(Graph, self).__str__() )
+        return "%s %s" % ( s, super(Graph, self).to_dot(elements, exclude,
+            ID) )
 
     #--------------------------------------------------------------------------
     #  Public interface:
@@ -885,16 +944,39 @@ class Graph(BaseGraph):
     @on_trait_change("arrange")
     def arrange_all(self):
         """ Sets for the _draw_ and _ldraw_ attributes for each of the graph
-            sub-elements by processing the xdot format of the graph.
+            sub-elements by processing the xdot format of the graph.  Engines
+            run in-process set positions and splines instead.
         """
-        import godot.dot_data_parser
+        from godot.layout.engine import ENGINES, arrange_in_process
+
+        if self.program == "auto":
+            from godot.layout.api import arrange_auto
+            arrange_auto( self )
+            return
+
+        if self.stable:
+            from godot.layout.api import arrange_stable
+            arrange_stable( self, self._touched, self.pin_untouched )
+        elif self.program in ENGINES:
+            arrange_in_process( self )
+        else:
+            xdot_data = self.create( format = "xdot" )
+#            print "GRAPH DOT:\n", str( self )
+#            print "XDOT DATA:\n", xdot_data
 
-        parser = godot.dot_data_parser.GodotDataParser()
+            self.arrange_xdot( xdot_data )
 
-        xdot_data = self.create( format = "xdot" )
-#        print "GRAPH DOT:\n", str( self )
-#        print "XDOT DATA:\n", xdot_data
+        self._touched.clear()
 
+
+    def arrange_xdot(self, xdot_data):
+        """ Sets the attributes of the graph sub-elements from the output of
+            a layout program in xdot format, for example one run in a
+            worker thread.
+        """
+        import godot.dot_data_parser
+
+        parser = godot.dot_data_parser.GodotDataParser()
         parser.dotparser.parseWithTabs()
         ndata = xdot_data.replace( "\\\n", "" )
         tokens = parser.dotparser.parseString( ndata )[0]
@@ -903,39 +985,259 @@ class Graph(BaseGraph):
         self.redraw_canvas()
 
 
+    def arrange_positions(self, format="plain"):
+        """ Sets only the positions and sizes of the nodes, the splines of
+            the edges and the bounding box of the graph, using the "plain"
+            or "json0" output of the layout program rather than xdot.
+        """
+        from plain_parser import parse_plain, parse_json0
+        from godot.layout.engine import NODE_XDOT_ATTRS, EDGE_XDOT_ATTRS
+
+        data = self.create( format = format )
+        if not data:
+            logger.error( "No %s output from %s" % (format, self.program) )
+            return
+
+        if format == "json0":
+            bb, node_layout, edge_layout = parse_json0( data )
+        else:
+            bb, node_layout, edge_layout = parse_plain( data )
+
+        self.bb = bb
+
+        # Drawing operations from an earlier arrangement are stale, so the
+        # elements are drawn from shape templates instead.
+        blank = dict( [(attr, "") for attr in NODE_XDOT_ATTRS] )
+        for ID, (x, y, width, height) in node_layout.iteritems():
+            node = self.get_node( ID )
+            if node is not None:
+                node.set( pos=(x, y), width=width, height=height, **blank )
+
+        # Edges between the same pair of nodes are matched in order.
+        edges = {}
+        for graph in self.all_graphs:
+            for edge in graph.edges:
+                key = ( edge.tail_node.ID, edge.head_node.ID )
+                matches = edges.setdefault( key, [] )
+                if edge not in matches:
+                    matches.append( edge )
+
+        blank = dict( [(attr, "") for attr in EDGE_XDOT_ATTRS] )
+        for tail, head, points in edge_layout:
+            candidates = edges.get( (tail, head) ) or edges.get( (head, tail) )
+            if candidates:
+                candidates.pop(0).set( pos=points, **blank )
+
+        self.redraw_canvas()
+
+
+    def arrange_components(self, processes=None):
+        """ Lays out each weakly connected component of the graph in a
+            separate process and packs the results, as gvpack does.
+        """
+        from godot.layout.api import arrange_components
+
+        arrange_components( self, processes )
+
+
+    def arrange_clusters(self, processes=None):
+        """ Arranges the graph, laying out again only the clusters whose
+            structure has changed since they were last arranged.
+        """
+        from godot.layout.api import arrange_clusters
+
+        arrange_clusters( self, self.cluster_cache, processes )
+
+
+    def remove_overlaps(self):
+        """ Moves nodes apart in-process so that none overlap, keeping the
+            separation given by 'sep', without running Graphviz again.
+        """
+        from godot.layout.api import remove_node_overlaps
+
+        remove_node_overlaps( self )
+
+
     @on_trait_change("redraw")
     def redraw_canvas(self):
         """ Parses the Xdot attributes of all graph components and adds
             the components to a new canvas.
         """
-        from xdot_parser import XdotAttrParser
+        if self.headless:
+            return
 
-        xdot_parser = XdotAttrParser()
         canvas = self._component_default()
 
-        for node in self.nodes:
-            components = xdot_parser.parse_xdot_data( node._draw_ )
-            canvas.add( *components )
+        # Display lists read the drawing operations without parsing them
+        # into components.
+        if self.render_mode == "display_list":
+            canvas.add( DisplayList(self.xdot_components(parse=False)) )
+        else:
+            for element, components, role in self.xdot_components():
+                canvas.add_element( element, components, role )
+
+        self.component = canvas
+        vp = self.__dict__.get("vp")
+        if vp is not None:
+            vp.request_redraw()
 
-            components = xdot_parser.parse_xdot_data( node._ldraw_ )
-            canvas.add( *components )
+
+    def xdot_components(self, parse=True):
+        """ Parses the Xdot attributes of all nodes and edges, returning a
+            list of (element, components, role) tuples.  If 'parse' is False
+            the Xdot attributes are returned unparsed in place of their
+            components.
+        """
+        from xdot_parser import XdotAttrParser
+
+        xdot_parser = XdotAttrParser() if parse else None
+
+        items = []
+        for node in self.nodes:
+            items.extend( self._node_items(node, xdot_parser) )
 
         for edge in self.edges:
-            components = xdot_parser.parse_xdot_data( edge._draw_ )
-            canvas.add( *components )
-            components = xdot_parser.parse_xdot_data( edge._ldraw_ )
-            canvas.add( *components )
-            components = xdot_parser.parse_xdot_data( edge._hdraw_ )
-            canvas.add( *components )
-            components = xdot_parser.parse_xdot_data( edge._tdraw_ )
-            canvas.add( *components )
-            components = xdot_parser.parse_xdot_data( edge._hldraw_ )
-            canvas.add( *components )
-            components = xdot_parser.parse_xdot_data( edge._tldraw_ )
-            canvas.add( *components )
+            items.extend( self._edge_items(edge, xdot_parser) )
+
+        return items
+
+
+    def redraw_node(self, node):
+        """ Replaces the components drawn for a node, for example after it
+            has been moved, without redrawing the rest of the canvas.
+        """
+        if self.headless:
+            return
+        if self.render_mode == "display_list":
+            self.redraw_canvas()
+            return
+
+        from xdot_parser import XdotAttrParser
+
+        canvas = self.component
+        old = canvas.element_components( node )
+        if old:
+            canvas.remove( *old )
+        for element, components, role in \
+                self._node_items( node, XdotAttrParser() ):
+            canvas.add_element( element, components, role )
+        canvas.request_redraw()
 
-        self.component = canvas
-        self.vp.request_redraw()
+
+    def redraw_edge(self, edge):
+        """ Replaces the components drawn for an edge, for example after it
+            has been re-routed, without redrawing the rest of the canvas.
+        """
+        if self.headless:
+            return
+        if self.render_mode == "display_list":
+            self.redraw_canvas()
+            return
+
+        from xdot_parser import XdotAttrParser
+
+        canvas = self.component
+        old = canvas.element_components( edge )
+        if old:
+            canvas.remove( *old )
+        for element, components, role in \
+                self._edge_items( edge, XdotAttrParser() ):
+            canvas.add_element( element, components, role )
+        canvas.request_redraw()
+
+
+    def _node_items(self, node, xdot_parser):
+        """ Returns the (element, components, role) tuples of a node, with
+            the unparsed Xdot attributes as components if no parser is
+            given.
+        """
+        # Nodes laid out in-process have no drawing operations.
+        if (self.draw_source == "shapes") or \
+                (node.pos != (0.0, 0.0) and not node._draw_):
+            return [ (node, node_shape_components(node), NODE_ROLE),
+                     (node, node_label_components(node), LABEL_ROLE) ]
+
+        items = []
+        for attr, role in [("_draw_", NODE_ROLE), ("_ldraw_", LABEL_ROLE)]:
+            components = getattr(node, attr)
+            if xdot_parser is not None:
+                components = xdot_parser.parse_xdot_data( components )
+            items.append( (node, components, role) )
+        return items
+
+
+    def _edge_items(self, edge, xdot_parser):
+        """ Returns the (element, components, role) tuples of an edge, with
+            the unparsed Xdot attributes as components if no parser is
+            given.
+        """
+        # Edges re-routed in-process have no drawing operations.
+        if (self.draw_source == "shapes") or \
+                (edge.pos and not edge._draw_):
+            return [ (edge, edge_spline_components(edge), EDGE_ROLE),
+                     (edge, edge_arrow_components(edge), ARROW_ROLE),
+                     (edge, edge_label_components(edge), LABEL_ROLE) ]
+
+        items = []
+        for attr, role in [("_draw_", EDGE_ROLE), ("_ldraw_", LABEL_ROLE),
+                           ("_hdraw_", ARROW_ROLE), ("_tdraw_", ARROW_ROLE),
+                           ("_hldraw_", LABEL_ROLE), ("_tldraw_", LABEL_ROLE)]:
+            components = getattr(edge, attr)
+            if xdot_parser is not None:
+                components = xdot_parser.parse_xdot_data( components )
+            items.append( (edge, components, role) )
+        return items
+
+
+    def save_image(self, filename, format=None, scale=1.0, max_size=None):
+        """ Writes an image of the graph drawn by Godot, rather than by the
+            Graphviz renderer, without requiring a display.
+        """
+        from godot.render import render_to_file
+
+        render_to_file(self, filename, format, scale, max_size)
+
+
+    def save_svg(self, flo, prog=None):
+        """ Writes the graph as SVG.  If the graph has been laid out by the
+            given program it is written from the parsed drawing operations
+            without running Graphviz again.
+        """
+        if (prog is None) or (prog == self.program):
+            from godot.export import export_svg
+            export_svg(self, flo)
+        else:
+            flo.write( self.create(prog, "svg") )
+
+
+    def save_pdf(self, filename, prog=None):
+        """ Writes the graph as PDF.  If the graph has been laid out by the
+            given program it is drawn from the parsed drawing operations
+            without running Graphviz again.
+        """
+        if (prog is None) or (prog == self.program):
+            from godot.export import export_pdf
+            export_pdf(self, filename)
+        else:
+            fd = open(filename, "wb")
+            try:
+                fd.write( self.create(prog, "pdf") )
+            finally:
+                fd.close()
+
+
+    def hit_test(self, x, y):
+        """ Returns the graph element drawn topmost at the given canvas
+            coordinates or None.
+        """
+        return self.component.element_at(x, y)
+
+
+    def hit_test_rect(self, x1, y1, x2, y2):
+        """ Returns the graph elements drawn entirely within the given
+            rectangle of canvas coordinates.
+        """
+        return self.component.elements_in(x1, y1, x2, y2)
 
 
     def get_node(self, ID):
@@ -995,9 +1297,23 @@ class Graph(BaseGraph):
 
     def _component_default(self):
         """ Trait initialiser.  Overrides the base class to use a Canvas
-            for the root Graph.
+            for the root Graph that indexes its components for hit-testing.
         """
-        return Canvas( draw_axes=True, bgcolor="lightsteelblue")
+        if self.use_tiles:
+            tile_cache = TileCache()
+        else:
+            tile_cache = None
+        return DiagramCanvas( draw_axes=True, bgcolor="lightsteelblue",
+                              tile_cache=tile_cache )
+
+
+    def _cluster_cache_default(self):
+        """ Trait initialiser.
+        """
+        from godot.cache import LRUCache
+        from godot.layout.api import CLUSTER_CACHE_SIZE
+
+        return LRUCache( CLUSTER_CACHE_SIZE )
 
 
     def _epsilon_default(self):
@@ -1092,6 +1408,30 @@ class Graph(BaseGraph):
             each_edge._nodes = all_nodes
 
 
+    def _on_touched(self, object, name, old, new):
+        """ Records the nodes added, or connected by added edges, since the
+            last arrangement.
+        """
+        if name.endswith( "_items" ):
+            new = new.added
+
+        for element in new:
+            if name.startswith( "nodes" ):
+                self._touched.add( element.ID )
+            else:
+                self._touched.add( element.tail_node.ID )
+                self._touched.add( element.head_node.ID )
+
+
+    def _on_node_moved(self, node, name, old, new):
+        """ Handles a node being dragged by re-routing its edges.
+        """
+        self._touched.add( node.ID )
+        if self.incremental:
+            from godot.layout.api import relayout_node
+            relayout_node( self, node, *new )
+
+
 #    def _bgcolor_changed(self, new):
 #        """ Handles the canvas background colour.
 #        """
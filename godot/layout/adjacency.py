@@ -0,0 +1,156 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the adjacency structure of a graph and its division into weakly
+connected components.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from numpy import \
+    asarray, concatenate, argsort, bincount, cumsum, repeat, arange, ones, \
+    unique
+
+#------------------------------------------------------------------------------
+#  Graph elements:
+#------------------------------------------------------------------------------
+
+def graph_nodes(graph):
+    """ Returns the nodes of the graph and all its subgraphs, without
+        duplicates, in the order in which they are first found.
+    """
+    nodes = []
+    seen = set()
+    for subgraph in graph.all_graphs:
+        for node in subgraph.nodes:
+            if node.ID not in seen:
+                seen.add(node.ID)
+                nodes.append(node)
+    return nodes
+
+
+def graph_edges(graph):
+    """ Returns the edges of the graph and all its subgraphs.
+    """
+    return [edge for subgraph in graph.all_graphs for edge in subgraph.edges]
+
+#------------------------------------------------------------------------------
+#  Adjacency:
+#------------------------------------------------------------------------------
+
+def adjacency(graph):
+    """ Returns a dictionary mapping the ID of each node to the set of IDs of
+        the nodes joined to it by an edge in either direction.
+    """
+    neighbours = {}
+    for node in graph_nodes(graph):
+        neighbours[node.ID] = set()
+
+    for edge in graph_edges(graph):
+        tail, head = edge.tail_node.ID, edge.head_node.ID
+        neighbours.setdefault(tail, set()).add(head)
+        neighbours.setdefault(head, set()).add(tail)
+
+    return neighbours
+
+#------------------------------------------------------------------------------
+#  Compressed sparse rows:
+#------------------------------------------------------------------------------
+
+def csr_adjacency(n, edges):
+    """ Returns the undirected adjacency of n vertices joined by an array of
+        (tail, head) edges in compressed sparse row form, as the arrays
+        (indptr, indices): the neighbours of vertex i are
+        indices[indptr[i]:indptr[i + 1]].
+    """
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    src = concatenate([edges[:, 0], edges[:, 1]])
+    dst = concatenate([edges[:, 1], edges[:, 0]])
+    order = argsort(src, kind="mergesort")
+    indptr = concatenate([[0], cumsum(bincount(src, minlength=n))])
+    return indptr, dst[order]
+
+
+def neighbours_of(indptr, indices, vertices):
+    """ Returns the neighbours of each of the given vertices, concatenated,
+        and the number belonging to each vertex.
+    """
+    starts = indptr[vertices]
+    counts = indptr[asarray(vertices) + 1] - starts
+    total = counts.sum()
+    within = arange(total) - repeat(cumsum(counts) - counts, counts)
+    return indices[repeat(starts, counts) + within], counts
+
+
+def bfs_distances(indptr, indices, source):
+    """ Returns the number of edges on the shortest path from the source to
+        each vertex, or -1 where there is no path.
+    """
+    n = len(indptr) - 1
+    dist = -ones(n, dtype=int)
+    dist[source] = 0
+    frontier = asarray([source])
+    d = 0
+    while len(frontier):
+        d += 1
+        reached, counts = neighbours_of(indptr, indices, frontier)
+        frontier = unique(reached[dist[reached] < 0])
+        dist[frontier] = d
+    return dist
+
+#------------------------------------------------------------------------------
+#  Weakly connected components:
+#------------------------------------------------------------------------------
+
+def connected_components(graph):
+    """ Returns a list of (nodes, edges) tuples, one for each weakly
+        connected component of the graph, in the order in which the nodes
+        are found.
+    """
+    neighbours = adjacency(graph)
+
+    index = {}
+    components = []
+    for node in graph_nodes(graph):
+        if node.ID in index:
+            continue
+        i = len(components)
+        components.append(([], []))
+        index[node.ID] = i
+        stack = [node.ID]
+        while stack:
+            for ID in neighbours[stack.pop()]:
+                if ID not in index:
+                    index[ID] = i
+                    stack.append(ID)
+
+    for node in graph_nodes(graph):
+        components[index[node.ID]][0].append(node)
+
+    for edge in graph_edges(graph):
+        components[index[edge.tail_node.ID]][1].append(edge)
+
+    return components
+
+# EOF -------------------------------------------------------------------------
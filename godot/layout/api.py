@@ -0,0 +1,43 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+from adjacency import \
+    graph_nodes, graph_edges, adjacency, connected_components, \
+    csr_adjacency, bfs_distances
+from pack import pack_boxes, translate_xdot, translate_attrs
+from parallel import arrange_components, batch_components, component_dot
+from clusters import arrange_clusters, structure_key, CLUSTER_CACHE_SIZE
+from layered import layered_layout
+from force import force_layout, repulsive_forces
+from stress import stress_layout, pivot_distances, pivot_mds
+from spectral import spectral_layout
+from multilevel import multilevel_layout, coarsen, REFINERS
+from engine import \
+    ENGINES, register_engine, arrange_in_process, run_engine, apply_layout, \
+    bezier_points, edge_spline, spline_midpoint, set_edge_spline
+from local import relayout_node, route_polyline, push_apart
+from overlap import remove_overlaps, remove_node_overlaps, overlapping_pairs
+from stable import arrange_stable, STABLE_ITERATIONS
+from auto import \
+    select_program, choose_program, arrange_auto, tuned_parameters
+
+# EOF -------------------------------------------------------------------------
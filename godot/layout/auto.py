@@ -0,0 +1,152 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the automatic choice of layout program by graph size.
+
+Small directed graphs are laid out in layers by dot and other small graphs
+by neato, or fdp if they have clusters.  Larger graphs are given to the
+multilevel sfdp or the in-process engines, with fewer iterations and a
+looser tolerance the larger they are, since dot can take hours on them.
+The spectral engine places only graphs too large for sfdp where sfdp is not
+available.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import logging
+
+from math import sqrt
+
+from godot.layout.clusters import cluster_nodes, cluster_edges
+from godot.layout.engine import ENGINES
+
+#------------------------------------------------------------------------------
+#  Logging:
+#------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Largest directed graphs laid out in layers.
+DOT_NODES = 500
+DOT_EDGES = 2000
+
+# Largest graphs laid out by stress majorization with all pairs of nodes.
+NEATO_NODES = 1000
+
+# Largest graphs laid out by the in-process multilevel engine.  Larger
+# graphs are given to sfdp, or placed by the spectral engine without it.
+MULTILEVEL_NODES = 200000
+
+# Iteration limit and tolerance for graphs of up to NEATO_NODES nodes.
+MAXITER = 200
+EPSILON = 1e-4
+
+# Least iteration limit and tolerance for larger graphs.
+MIN_MAXITER = 20
+LARGE_EPSILON = 1e-3
+
+#------------------------------------------------------------------------------
+#  Program selection:
+#------------------------------------------------------------------------------
+
+def select_program(n, m, clustered=False, directed=False, available=None,
+                   in_process=True):
+    """ Returns the fastest suitable layout program for a graph of n nodes
+        and m edges.  Graphviz programs are chosen only if their names are
+        in 'available', or if it is None, and in-process engines only if
+        'in_process' is True.
+    """
+    if directed and (n <= DOT_NODES) and (m <= DOT_EDGES):
+        candidates = ["dot", "layered"]
+    elif n <= NEATO_NODES:
+        candidates = ["fdp" if clustered else "neato", "stress"]
+    elif n <= MULTILEVEL_NODES:
+        candidates = ["sfdp", "multilevel", "neato"]
+    else:
+        candidates = ["sfdp", "spectral", "neato"]
+
+    for program in candidates:
+        if program in ENGINES:
+            if in_process:
+                return program
+        elif (available is None) or (program in available):
+            return program
+    return "dot"
+
+
+def tuned_parameters(n):
+    """ Returns the iteration limit and tolerance for a graph of n nodes.
+        Larger graphs run fewer, cheaper iterations to a looser tolerance.
+    """
+    if n <= NEATO_NODES:
+        return MAXITER, EPSILON
+    maxiter = int(MAXITER * sqrt(float(NEATO_NODES) / n))
+    return max(MIN_MAXITER, maxiter), LARGE_EPSILON
+
+
+def choose_program(graph, in_process=True):
+    """ Returns the layout program, iteration limit and tolerance chosen for
+        the graph from its size, clusters and directedness, and logs the
+        decision.
+    """
+    # Subgraphs and clusters are walked directly, since only top level
+    # graphs list all their subgraphs and are directed.
+    nodes = cluster_nodes(graph)
+    edges = cluster_edges(graph)
+    n = len(set([node.ID for node in nodes]))
+    m = len(edges)
+    clustered = bool(graph.clusters)
+    directed = getattr(graph, "directed", False)
+
+    program = select_program(n, m, clustered, directed, graph.programs,
+                             in_process)
+    maxiter, epsilon = tuned_parameters(n)
+
+    logger.info("Chose %s for a %s graph of %d nodes and %d edges%s "
+                "(maxiter=%d, epsilon=%g)" % (program,
+                "directed" if directed else "undirected", n, m,
+                " with clusters" if clustered else "", maxiter, epsilon))
+    return program, maxiter, epsilon
+
+
+def arrange_auto(graph):
+    """ Arranges the graph with the program and parameters chosen for it.
+        The graph's program, iteration limit and tolerance are restored
+        afterwards, so that the choice is made again next time.
+    """
+    program, maxiter, epsilon = choose_program(graph)
+
+    saved = graph.program, graph.maxiter, graph.epsilon
+    try:
+        graph.trait_setq(program=program, maxiter=maxiter, epsilon=epsilon)
+        graph.arrange_all()
+    finally:
+        graph.trait_setq(program=saved[0], maxiter=saved[1],
+                         epsilon=saved[2])
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,144 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Benchmarks the in-process force-directed layout against neato on
+synthetic graphs.
+
+Run as a script to print a table of layout times, in seconds:
+
+    python -m godot.layout.benchmark [size ...]
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import sys
+import time
+
+from numpy import arange, column_stack, concatenate, sqrt
+from numpy.random import RandomState
+
+from dot2tex.dotparsing import find_graphviz
+
+from godot.layout.force import force_layout
+from godot.layout.parallel import run_program
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Numbers of nodes in the benchmark graphs.
+SIZES = [1000, 5000, 20000]
+
+# Natural edge length, in points.
+EDGE_LENGTH = 21.6
+
+#------------------------------------------------------------------------------
+#  Synthetic graphs:
+#------------------------------------------------------------------------------
+
+def random_graph(n, degree=3.0, seed=1):
+    """ Returns the edges of a connected random graph of n nodes with the
+        given mean degree: a random tree with random edges added.
+    """
+    rs = RandomState(seed)
+    tree = column_stack([arange(1, n),
+                         (rs.uniform(size=n - 1) * arange(1, n)).astype(int)])
+    extra = int(max(n * degree / 2.0 - (n - 1), 0))
+    return concatenate([tree, rs.randint(0, n, (extra, 2))])
+
+
+def grid_graph(n):
+    """ Returns the edges of a square grid of about n nodes.
+    """
+    side = int(sqrt(n))
+    index = arange(side * side).reshape(side, side)
+    across = column_stack([index[:, :-1].ravel(), index[:, 1:].ravel()])
+    down = column_stack([index[:-1, :].ravel(), index[1:, :].ravel()])
+    return side * side, concatenate([across, down])
+
+
+def dot_data(edges):
+    """ Returns an undirected graph of point nodes in dot language.
+    """
+    lines = ["graph G {", "node [shape=point];"]
+    lines.extend(["%d -- %d;" % (u, v) for u, v in edges])
+    lines.append("}")
+    return "\n".join(lines)
+
+#------------------------------------------------------------------------------
+#  Timing:
+#------------------------------------------------------------------------------
+
+def time_force(n, edges, maxiter=200):
+    """ Returns the time taken by the in-process force-directed layout.
+    """
+    t = time.time()
+    force_layout(edges, n, EDGE_LENGTH, maxiter=maxiter)
+    return time.time() - t
+
+
+def time_program(executable, edges):
+    """ Returns the time taken by a Graphviz program, or None on failure.
+    """
+    t = time.time()
+    status, output, errors = run_program((executable, "plain",
+                                          dot_data(edges)))
+    if status != 0:
+        return None
+    return time.time() - t
+
+
+def benchmark(sizes=SIZES, programs=["neato"], out=sys.stdout):
+    """ Writes a table of layout times for random and grid graphs of each
+        size with the force-directed engine and each Graphviz program found.
+    """
+    found = find_graphviz() or {}
+    programs = [p for p in programs if p in found]
+
+    out.write("%-8s %8s %10s" % ("graph", "nodes", "force"))
+    for prog in programs:
+        out.write(" %10s" % prog)
+    out.write("\n")
+
+    for size in sizes:
+        for name, (n, edges) in [("random", (size, random_graph(size))),
+                                 ("grid", grid_graph(size))]:
+            out.write("%-8s %8d %10.2f" % (name, n, time_force(n, edges)))
+            for prog in programs:
+                elapsed = time_program(found[prog], edges)
+                if elapsed is None:
+                    out.write(" %10s" % "failed")
+                else:
+                    out.write(" %10.2f" % elapsed)
+            out.write("\n")
+            out.flush()
+
+#------------------------------------------------------------------------------
+#  Stand-alone call:
+#------------------------------------------------------------------------------
+
+if __name__ == "__main__":
+    benchmark([int(a) for a in sys.argv[1:]] or SIZES)
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,301 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the arrangement of a graph with memoised cluster layouts.
+
+The internal layout of each top level cluster is cached, keyed by a hash of
+its structure that leaves out the attributes set by the layout program.  On
+re-arrangement unchanged clusters are placed in the outer graph as fixed
+size nodes and only the outer graph and the changed clusters are laid out.
+The cached geometry is then moved into place.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import logging
+
+try:
+    from hashlib import md5
+except ImportError:
+    from md5 import md5
+
+from godot.dot_data_parser import GodotDataParser
+from godot.cache import LRUCache
+from godot.layout.adjacency import graph_nodes, graph_edges
+from godot.layout.pack import translate_attrs
+from godot.layout.parallel import \
+    run_programs, component_dot, read_layout, parse_bb
+
+#------------------------------------------------------------------------------
+#  Logging:
+#------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Maximum number of cached cluster layouts.
+CLUSTER_CACHE_SIZE = 1024
+
+# Prefix of the IDs of the nodes standing in for clusters in the outer graph.
+SUPER_PREFIX = "godot_super_"
+
+# Attributes set by the layout program, left out of the structural hash.
+OUTPUT_ATTRS = ["pos", "bb", "lp", "xlp", "head_lp", "tail_lp", "startp",
+    "endp"]
+
+#------------------------------------------------------------------------------
+#  Structural hash:
+#------------------------------------------------------------------------------
+
+def _attr_text(element):
+    """ Returns the non-default Graphviz attributes of an element, other
+        than those set by the layout program, as a string.
+    """
+    attrs = []
+    for trait_name, trait in element.traits(graphviz=True).iteritems():
+        if trait_name in OUTPUT_ATTRS:
+            continue
+        value = getattr(element, trait_name)
+        if value != trait.default:
+            attrs.append("%s=%r" % (trait_name, value))
+    attrs.sort()
+    return ",".join(attrs)
+
+
+def _graph_text(graph):
+    """ Returns the structure of a subgraph or cluster as a string.
+    """
+    lines = ["%s[%s]" % (graph.ID, _attr_text(graph))]
+    lines.extend(sorted(["%s[%s]" % (node.ID, _attr_text(node))
+                         for node in graph.nodes]))
+    lines.extend(sorted(["%s%s%s[%s]" % (edge.tail_node.ID, edge.conn,
+                         edge.head_node.ID, _attr_text(edge))
+                         for edge in graph.edges]))
+    for subgraph in graph.subgraphs + graph.clusters:
+        lines.append("{%s}" % _graph_text(subgraph))
+    return "\n".join(lines)
+
+
+def structure_key(graph, cluster, edges=()):
+    """ Returns a hash of the structure of a cluster, the attributes of the
+        graph containing it and any of the graph's edges internal to it.
+    """
+    text = "\n".join([_attr_text(graph), _graph_text(cluster)] +
+        sorted(["%s%s%s[%s]" % (edge.tail_node.ID, edge.conn,
+                edge.head_node.ID, _attr_text(edge)) for edge in edges]))
+    return md5(text).hexdigest()
+
+#------------------------------------------------------------------------------
+#  Cluster membership:
+#------------------------------------------------------------------------------
+
+def cluster_nodes(cluster):
+    """ Returns the nodes of a cluster and its subgraphs and clusters.
+    """
+    nodes = list(cluster.nodes)
+    for subgraph in cluster.subgraphs + cluster.clusters:
+        nodes.extend(cluster_nodes(subgraph))
+    return nodes
+
+
+def cluster_edges(cluster):
+    """ Returns the edges of a cluster and its subgraphs and clusters.
+    """
+    edges = list(cluster.edges)
+    for subgraph in cluster.subgraphs + cluster.clusters:
+        edges.extend(cluster_edges(subgraph))
+    return edges
+
+#------------------------------------------------------------------------------
+#  Cluster layout:
+#------------------------------------------------------------------------------
+
+def read_cluster(parser, data, cluster):
+    """ Returns the (width, height) of a cluster laid out alone and the
+        attributes of its nodes and edges relative to its lower-left corner.
+    """
+    graphs = {}
+    bb, node_layout, edge_layout = read_layout(parser, data, graphs)
+    if cluster.ID in graphs:
+        bb = parse_bb(graphs[cluster.ID].get("bb"))
+
+    x1, y1, x2, y2 = bb
+    for opts in node_layout.values():
+        translate_attrs(opts, -x1, -y1)
+    for tail, head, opts in edge_layout:
+        translate_attrs(opts, -x1, -y1)
+
+    return (x2 - x1, y2 - y1), node_layout, edge_layout
+
+
+def super_node(cluster, size):
+    """ Returns dot data for a fixed size node standing in for a cluster.
+    """
+    width, height = size
+    return '%s%s [shape=box, fixedsize=true, label="", width=%s, ' \
+        'height=%s];' % (SUPER_PREFIX, cluster.ID, width / 72.0,
+        height / 72.0)
+
+#------------------------------------------------------------------------------
+#  Set layout attributes:
+#------------------------------------------------------------------------------
+
+def _set_edges(edges, edge_layout, dx, dy, node_ids=None):
+    """ Sets the attributes of the edges, matching edges between the same
+        pair of nodes in order.  Node IDs are first mapped by 'node_ids'.
+    """
+    if node_ids is None:
+        node_ids = {}
+
+    matches = {}
+    for edge in edges:
+        tail, head = edge.tail_node.ID, edge.head_node.ID
+        key = (node_ids.get(tail, tail), node_ids.get(head, head))
+        matches.setdefault(key, []).append(edge)
+
+    for tail, head, opts in edge_layout:
+        candidates = matches.get((tail, head)) or matches.get((head, tail))
+        if candidates:
+            candidates.pop(0).set(**translate_attrs(dict(opts), dx, dy))
+
+#------------------------------------------------------------------------------
+#  Arrange clusters:
+#------------------------------------------------------------------------------
+
+def arrange_clusters(graph, cache, processes=None, prog=None):
+    """ Arranges the graph, laying out only the top level clusters whose
+        structure has changed since they were cached and the outer graph
+        in which each cluster is a fixed size node.
+    """
+    prog = graph.program if prog is None else prog
+
+    if (prog not in graph.programs) or not graph.clusters:
+        graph.arrange_all()
+        return
+
+    # Map the ID of each node in a cluster to the cluster's index.
+    membership = {}
+    for i, cluster in enumerate(graph.clusters):
+        for node in cluster_nodes(cluster):
+            membership.setdefault(node.ID, i)
+
+    # Divide the edges of the graph into those internal to each cluster and
+    # those of the outer graph.
+    internal = [[] for cluster in graph.clusters]
+    outer_edges = []
+    for edge in graph_edges(graph):
+        i = membership.get(edge.tail_node.ID)
+        if (i is not None) and (i == membership.get(edge.head_node.ID)):
+            internal[i].append(edge)
+        else:
+            outer_edges.append(edge)
+
+    # Lay out the changed clusters in parallel.
+    layouts = {}
+    changed = []
+    for i, cluster in enumerate(graph.clusters):
+        layout = cache.get(structure_key(graph, cluster, internal[i]))
+        if layout is None:
+            changed.append(i)
+        else:
+            layouts[i] = layout
+
+    executable = graph.programs[prog]
+    jobs = [(executable, "xdot",
+             component_dot(graph, [graph.clusters[i]], internal[i]))
+            for i in changed]
+
+    parser = GodotDataParser()
+    parser.dotparser.parseWithTabs()
+
+    for i, (status, data, stderr_output) in \
+        zip(changed, run_programs(jobs, processes)):
+        if (status != 0) or not data:
+            logger.error("Program terminated with status: %d. stderr "
+                "follows: %s" % (status, stderr_output))
+            return
+        layouts[i] = read_cluster(parser, data, graph.clusters[i])
+
+    logger.debug("Laid out %d of %d clusters." % (len(changed),
+        len(graph.clusters)))
+
+    # Lay out the outer graph with a fixed size node for each cluster.
+    node_ids = {}
+    for ID, i in membership.iteritems():
+        node_ids[ID] = SUPER_PREFIX + graph.clusters[i].ID
+
+    outer_nodes = [node for node in graph_nodes(graph)
+                   if node.ID not in membership]
+    extra = [super_node(cluster, layouts[i][0])
+             for i, cluster in enumerate(graph.clusters)]
+    for edge in outer_edges:
+        # Keep the attributes of the edge, dropping any ports.
+        tail, head = edge.tail_node.ID, edge.head_node.ID
+        attrstr = str(edge)[len("%s%s %s %s%s" % (tail, edge.tailport,
+            edge.conn, head, edge.headport)):]
+        extra.append("%s %s %s%s" % (node_ids.get(tail, tail), edge.conn,
+            node_ids.get(head, head), attrstr))
+    outer = component_dot(graph, outer_nodes, extra)
+
+    status, data, stderr_output = run_programs([(executable, "xdot",
+        outer)])[0]
+    if (status != 0) or not data:
+        logger.error("Program terminated with status: %d. stderr follows: "
+            "%s" % (status, stderr_output))
+        return
+    bb, node_layout, edge_layout = read_layout(parser, data)
+
+    # Set the attributes of the outer graph.
+    for node in outer_nodes:
+        opts = node_layout.get(node.ID)
+        if opts is not None:
+            node.set(**opts)
+    _set_edges(outer_edges, edge_layout, 0.0, 0.0, node_ids)
+
+    # Move the geometry of each cluster into place and cache it.
+    for i, cluster in enumerate(graph.clusters):
+        (width, height), cluster_node_layout, cluster_edge_layout = layouts[i]
+        opts = node_layout.get(SUPER_PREFIX + cluster.ID)
+        if opts is None:
+            continue
+        dx = opts["pos"][0] - width / 2.0
+        dy = opts["pos"][1] - height / 2.0
+
+        for node in cluster_nodes(cluster):
+            opts = cluster_node_layout.get(node.ID)
+            if opts is not None:
+                node.set(**translate_attrs(dict(opts), dx, dy))
+
+        _set_edges(cluster_edges(cluster) + internal[i], cluster_edge_layout,
+            dx, dy)
+
+        cache.set(structure_key(graph, cluster, internal[i]), layouts[i])
+
+    graph.bb = bb
+    graph.redraw_canvas()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,353 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the registry of layout engines run in-process, without a
+Graphviz program, and the setting of their results on a graph.
+
+An engine is a function taking the graph, an array of (tail, head) node
+indices for the edges, an array of node (width, height) sizes in points and
+an array of the current node positions.  It returns an array of new node
+positions and a list giving a polyline for each edge, or None for a
+straight line.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import logging
+
+from numpy import array, asarray, empty, vstack, sqrt, hypot
+
+from godot.layout.adjacency import graph_nodes, graph_edges
+from godot.layout.clusters import cluster_nodes, cluster_edges
+from godot.layout.layered import layered_layout
+from godot.layout.force import force_layout
+from godot.layout.stress import stress_layout
+from godot.layout.spectral import spectral_layout
+from godot.layout.multilevel import multilevel_layout
+from godot.layout.overlap import remove_overlaps
+
+#------------------------------------------------------------------------------
+#  Logging:
+#------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+POINTS_PER_INCH = 72.0
+
+# Length of the arrowhead at the end of a directed edge, in points.
+ARROW_LENGTH = 10.0
+
+# Distance a self loop extends to the right of its node, in points.
+LOOP_SIZE = 18.0
+
+# Drawing operations of nodes, made stale by laying them out in-process.
+NODE_XDOT_ATTRS = ["_draw_", "_ldraw_"]
+
+# Drawing operations of edges, made stale by routing them in-process.
+EDGE_XDOT_ATTRS = ["_draw_", "_ldraw_", "_hdraw_", "_tdraw_", "_hldraw_",
+                   "_tldraw_"]
+
+#------------------------------------------------------------------------------
+#  Engines:
+#------------------------------------------------------------------------------
+
+def layered_engine(graph, edges, sizes, positions, fixed):
+    """ Lays out the graph in layers, as dot does.
+    """
+    return layered_layout(edges, sizes,
+        nodesep=graph.nodesep * POINTS_PER_INCH,
+        ranksep=graph.ranksep * POINTS_PER_INCH, rankdir=graph.rankdir)
+
+
+def force_engine(graph, edges, sizes, positions, fixed):
+    """ Lays out the graph with spring-electrical forces, warm starting from
+        the current node positions and keeping pinned nodes in place.  The
+        natural edge length is K plus the mean node size, so that nodes are
+        spaced by their extents.
+    """
+    k = graph.K * POINTS_PER_INCH
+    if len(sizes):
+        k += sizes.mean()
+    positions = force_layout(edges, len(sizes), k, positions,
+        maxiter=graph.maxiter, epsilon=graph.epsilon, start=graph.start,
+        fixed=fixed)
+    return positions, None
+
+
+def stress_engine(graph, edges, sizes, positions, fixed):
+    """ Lays out the graph by stress majorization, as neato's "major" mode
+        does, with edges an inch long, warm starting from the current node
+        positions and keeping pinned nodes in place.
+    """
+    positions = stress_layout(edges, len(sizes), POINTS_PER_INCH, positions,
+        maxiter=graph.maxiter, epsilon=graph.epsilon, fixed=fixed)
+    return positions, None
+
+
+def spectral_engine(graph, edges, sizes, positions, fixed):
+    """ Places the nodes by the eigenvectors of the graph, for a quick
+        preview of a very large graph.
+    """
+    return spectral_layout(edges, len(sizes), POINTS_PER_INCH), None
+
+
+def multilevel_engine(graph, edges, sizes, positions, fixed):
+    """ Lays out a coarsened graph and refines the positions on each finer
+        level with the force-directed or stress layout given by the graph's
+        refiner.
+    """
+    k = POINTS_PER_INCH
+    if len(sizes):
+        k += sizes.mean()
+    positions = multilevel_layout(edges, len(sizes), k,
+        refiner=graph.refiner, maxiter=graph.maxiter)
+    return positions, None
+
+
+# Layout engines by program name.
+ENGINES = {"layered": layered_engine, "force": force_engine,
+           "stress": stress_engine, "spectral": spectral_engine,
+           "multilevel": multilevel_engine}
+
+
+def register_engine(name, engine):
+    """ Makes a layout engine available as an in-process program.  The
+        engine is called with the graph, the (tail, head) node indices of
+        the edges, the node sizes and positions and a mask of the pinned
+        nodes, and returns the node positions and the edge polylines or
+        None.
+    """
+    ENGINES[name] = engine
+
+#------------------------------------------------------------------------------
+#  Splines:
+#------------------------------------------------------------------------------
+
+def bezier_points(points):
+    """ Returns the control points of a piecewise cubic Bezier curve that
+        passes through each of the given points, with Catmull-Rom tangents.
+    """
+    p = asarray(points, dtype=float)
+    n = len(p)
+    padded = vstack([p[:1], p, p[-1:]])
+
+    out = empty((3 * (n - 1) + 1, 2))
+    out[0] = p[0]
+    out[1::3] = p[:-1] + (padded[2:-1] - padded[:-3]) / 6.0
+    out[2::3] = p[1:] - (padded[3:] - padded[1:-2]) / 6.0
+    out[3::3] = p[1:]
+    return out
+
+
+def clip_to_node(center, size, toward):
+    """ Returns the point where the line from the centre of an elliptical
+        node of the given size towards a point crosses its boundary.
+    """
+    (x, y), (w, h) = center, size
+    dx, dy = toward[0] - x, toward[1] - y
+    if (w <= 0) or (h <= 0):
+        return (x, y)
+    r = sqrt((2.0 * dx / w) ** 2 + (2.0 * dy / h) ** 2)
+    if r <= 1.0:
+        return (x, y)
+    return (x + dx / r, y + dy / r)
+
+
+def loop_points(center, size):
+    """ Returns the control points of a self loop on the right of a node.
+    """
+    (x, y), (w, h) = center, size
+    x1 = x + w / 2.0
+    return [(x1, y + h / 6.0), (x1 + LOOP_SIZE, y + h / 2.0),
+            (x1 + LOOP_SIZE, y - h / 2.0), (x1, y - h / 6.0)]
+
+
+def edge_spline(graph, edge, tail_pos, tail_size, head_pos, head_size,
+                polyline=None):
+    """ Returns the Bezier control points of an edge through the points of
+        the polyline, or straight between the nodes, clipped to the node
+        boundaries, and the end point of its arrowhead or None.
+    """
+    if polyline is None:
+        polyline = [tail_pos, head_pos]
+    points = [tuple(p) for p in polyline]
+    points[0] = clip_to_node(tail_pos, tail_size, points[1])
+    points[-1] = clip_to_node(head_pos, head_size, points[-2])
+
+    # Leave room for the arrowhead of a directed edge.
+    endp = None
+    if graph.directed and (edge.arrowhead != "none"):
+        (x1, y1), (x2, y2) = points[-2], points[-1]
+        length = hypot(x2 - x1, y2 - y1)
+        if length > ARROW_LENGTH:
+            f = ARROW_LENGTH / length
+            endp = points[-1]
+            points[-1] = (x2 - (x2 - x1) * f, y2 - (y2 - y1) * f)
+
+    return bezier_points(points), endp
+
+
+def spline_midpoint(points):
+    """ Returns the point halfway through the parameter range of a piecewise
+        cubic Bezier curve, which lies on the curve unlike its middle control
+        point may.
+    """
+    p = asarray(points, dtype=float)
+    n = (len(p) - 1) // 3
+    if n < 1:
+        return tuple(p[len(p) // 2])
+
+    k, t = divmod(n / 2.0, 1.0)
+    p0, p1, p2, p3 = p[3 * int(k):3 * int(k) + 4]
+    mt = 1.0 - t
+    x, y = mt ** 3 * p0 + 3.0 * mt * mt * t * p1 + 3.0 * mt * t * t * p2 + \
+        t ** 3 * p3
+    return (float(x), float(y))
+
+
+def set_edge_spline(edge, points, endp=None, quiet=False):
+    """ Sets the Bezier control points and arrowhead end point of an edge,
+        places its label on the middle of the curve and discards its xdot
+        drawing operations so that it is drawn from the spline.  Trait
+        change notifications are not fired if 'quiet' is True.
+    """
+    points = [(float(x), float(y)) for x, y in points]
+    traits = dict([(attr, "") for attr in EDGE_XDOT_ATTRS])
+    if edge.label and points:
+        traits["lp"] = spline_midpoint(points)
+
+    if quiet:
+        edge.trait_setq(pos=points, endp=endp, startp=None, **traits)
+    else:
+        edge.set(pos=points, endp=endp, startp=None, **traits)
+
+#------------------------------------------------------------------------------
+#  Arrange in-process:
+#------------------------------------------------------------------------------
+
+def layout_arrays(graph):
+    """ Returns the nodes and edges of the graph and its clusters, the
+        edges as an array of (tail, head) node indices, and arrays of the
+        node sizes in points and of the node positions.
+    """
+    # Clusters are not kept together, but their contents are laid out.
+    nodes = graph_nodes(graph)
+    edge_list = graph_edges(graph)
+    for cluster in graph.clusters:
+        nodes.extend(cluster_nodes(cluster))
+        edge_list.extend(cluster_edges(cluster))
+
+    index = {}
+    for node in nodes:
+        index.setdefault(node.ID, len(index))
+    nodes = dict([(index[node.ID], node) for node in reversed(nodes)])
+    nodes = [nodes[i] for i in range(len(index))]
+
+    edges = array([(index[e.tail_node.ID], index[e.head_node.ID])
+                   for e in edge_list], dtype=int).reshape(-1, 2)
+    sizes = array([(n.width, n.height) for n in nodes],
+                  dtype=float).reshape(-1, 2) * POINTS_PER_INCH
+    positions = array([n.pos for n in nodes], dtype=float).reshape(-1, 2)
+
+    return nodes, edge_list, edges, sizes, positions
+
+
+def run_engine(graph, name=None):
+    """ Lays out the graph with an in-process engine without changing it,
+        so that it may be run in a worker thread.  Returns the arguments
+        for apply_layout().
+    """
+    name = graph.program if name is None else name
+    nodes, edge_list, edges, sizes, positions = layout_arrays(graph)
+    fixed = array([node.pin for node in nodes], dtype=bool)
+    positions, polylines = ENGINES[name](graph, edges, sizes, positions,
+                                         fixed)
+    # Engines that route edges lay out without overlaps.  Otherwise they
+    # are kept only if the graph asks for them to be.
+    if (graph.overlap != "True") and (polylines is None):
+        positions = remove_overlaps(positions, sizes, float(graph.sep))
+    return nodes, edge_list, edges, sizes, positions, polylines
+
+
+def arrange_in_process(graph, name=None):
+    """ Lays out the graph with an in-process engine and sets the node
+        positions, edge splines and bounding box.  The graph is then drawn
+        from shape templates, since no xdot drawing operations are made.
+    """
+    apply_layout(graph, *run_engine(graph, name))
+
+
+def apply_layout(graph, nodes, edge_list, edges, sizes, positions,
+                 polylines=None):
+    """ Sets the positions of the nodes, the splines of the edges and the
+        bounding box of the graph, moving the layout to the origin unless
+        any nodes are pinned.
+    """
+    positions = asarray(positions, dtype=float).reshape(-1, 2)
+    if polylines is None:
+        polylines = [None] * len(edge_list)
+
+    splines = []
+    for (u, v), polyline, edge in zip(edges, polylines, edge_list):
+        if u == v:
+            splines.append((loop_points(positions[u], sizes[u]), None))
+        else:
+            splines.append(edge_spline(graph, edge, positions[u], sizes[u],
+                positions[v], sizes[v], polyline))
+
+    # Move the layout so that its bounding box starts at the origin.
+    if len(positions):
+        corners = [positions - sizes / 2.0, positions + sizes / 2.0] + \
+            [asarray(points) for points, endp in splines]
+        all_points = vstack(corners)
+        lo, hi = all_points.min(axis=0), all_points.max(axis=0)
+    else:
+        lo = hi = array([0.0, 0.0])
+
+    # Pinned nodes stay where they are, so the layout is moved only if
+    # there are none.
+    if [node for node in nodes if node.pin]:
+        dx = dy = 0.0
+    else:
+        dx, dy = -lo
+
+    # Elements without drawing operations are drawn from shape templates.
+    blank = dict([(attr, "") for attr in NODE_XDOT_ATTRS])
+    for node, (x, y) in zip(nodes, positions):
+        node.set(pos=(x + dx, y + dy), **blank)
+
+    for edge, (points, endp) in zip(edge_list, splines):
+        points = [(x + dx, y + dy) for x, y in points]
+        if endp is not None:
+            endp = (endp[0] + dx, endp[1] + dy)
+        set_edge_spline(edge, points, endp)
+
+    graph.bb = (lo[0] + dx, lo[1] + dy, hi[0] + dx, hi[1] + dy)
+    graph.redraw_canvas()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,258 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a spring-electrical (force-directed) layout with a Barnes-Hut
+approximation of the repulsive forces.
+
+The quadtree is held as a dense grid of cell masses and centres of mass for
+each level.  A node feels the cells that are children of its parent's
+neighbours but are not its own neighbours as single bodies, and the nodes
+in its neighbouring cells at the deepest level directly, so all the nodes
+are handled together by NumPy at each level.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import log, ceil, pi
+
+from numpy import \
+    asarray, zeros, arange, floor, bincount, argsort, searchsorted, repeat, \
+    cumsum, sqrt, maximum, cos, sin, column_stack, where, ones
+from numpy.random import RandomState
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Average number of nodes in each cell of the deepest quadtree level.
+LEAF_SIZE = 4
+
+# Deepest quadtree level.
+MAX_DEPTH = 10
+
+# Repulsive force constant, relative to the attractive force.  With a value
+# of one, two joined nodes come to rest k apart.
+REPULSION = 1.0
+
+# Factor by which the step length is changed.
+COOLING = 0.9
+
+# Number of iterations reducing the energy before the step is increased.
+PROGRESS_STEPS = 5
+
+#------------------------------------------------------------------------------
+#  Repulsive forces:
+#------------------------------------------------------------------------------
+
+def _cells(scaled, size):
+    """ Returns the cell coordinates and flat cell index of each node in a
+        grid of size by size cells over the unit square.
+    """
+    cell = floor(scaled * size).astype(int)
+    return cell, cell[:, 0] * size + cell[:, 1]
+
+
+def direct_repulsion(positions, scaled, size, strength):
+    """ Returns the repulsive force on each node from the nodes in its own
+        and neighbouring cells of the deepest level.
+    """
+    n = len(positions)
+    cell, flat = _cells(scaled, size)
+    order = argsort(flat)
+    start = searchsorted(flat[order], arange(size * size))
+    count = bincount(flat, minlength=size * size)
+
+    forces = zeros((n, 2))
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            cx, cy = cell[:, 0] + ox, cell[:, 1] + oy
+            valid = (cx >= 0) & (cx < size) & (cy >= 0) & (cy < size)
+            i = arange(n)[valid]
+            neighbour = (cx * size + cy)[valid]
+
+            # All pairs of a node and a node in the neighbouring cell.
+            m = count[neighbour]
+            total = m.sum()
+            if total == 0:
+                continue
+            first = repeat(start[neighbour], m)
+            within = arange(total) - repeat(cumsum(m) - m, m)
+            i = repeat(i, m)
+            j = order[first + within]
+            keep = i != j
+            i, j = i[keep], j[keep]
+
+            d = positions[i] - positions[j]
+            dist2 = maximum((d * d).sum(axis=1), 1e-2)
+            f = d * (strength / dist2)[:, None]
+            forces[:, 0] += bincount(i, weights=f[:, 0], minlength=n)
+            forces[:, 1] += bincount(i, weights=f[:, 1], minlength=n)
+    return forces
+
+
+def repulsive_forces(positions, strength, leaf_size=LEAF_SIZE):
+    """ Returns the approximate repulsive force on each node, of magnitude
+        strength / distance from each other node.
+    """
+    positions = asarray(positions, dtype=float)
+    n = len(positions)
+    lo = positions.min(axis=0)
+    span = (positions.max(axis=0) - lo).max()
+    if span <= 0.0:
+        span = 1.0
+    # Scale to [0, 1) so that the nodes fall within the grids.
+    scaled = (positions - lo) / (span * (1.0 + 1e-9))
+
+    depth = int(ceil(log(max(float(n) / leaf_size, 1.0), 4)))
+    depth = min(max(depth, 1), MAX_DEPTH)
+
+    forces = zeros((n, 2))
+    for level in range(2, depth + 1):
+        size = 2 ** level
+        cell, flat = _cells(scaled, size)
+        mass = bincount(flat, minlength=size * size).astype(float)
+        weight = maximum(mass, 1.0)
+        cx = bincount(flat, weights=positions[:, 0],
+                      minlength=size * size) / weight
+        cy = bincount(flat, weights=positions[:, 1],
+                      minlength=size * size) / weight
+
+        # Children of the parent's neighbours that are not neighbours.
+        parent = cell // 2
+        for ox in range(-2, 4):
+            for oy in range(-2, 4):
+                x = 2 * parent[:, 0] + ox
+                y = 2 * parent[:, 1] + oy
+                far = (abs(x - cell[:, 0]) > 1) | (abs(y - cell[:, 1]) > 1)
+                valid = far & (x >= 0) & (x < size) & (y >= 0) & (y < size)
+                index = where(valid, x * size + y, 0)
+                m = where(valid, mass[index], 0.0)
+
+                dx = positions[:, 0] - cx[index]
+                dy = positions[:, 1] - cy[index]
+                dist2 = maximum(dx * dx + dy * dy, 1e-2)
+                f = strength * m / dist2
+                forces[:, 0] += f * dx
+                forces[:, 1] += f * dy
+
+    forces += direct_repulsion(positions, scaled, 2 ** depth, strength)
+    return forces
+
+#------------------------------------------------------------------------------
+#  Initial positions:
+#------------------------------------------------------------------------------
+
+def initial_positions(n, k, positions=None, start="regular", seed=1):
+    """ Returns starting positions for n nodes, keeping any given positions
+        that are not at the origin.  Other nodes are placed evenly on a
+        sunflower spiral for the "regular" start or at random otherwise,
+        with a fixed seed unless start is "random".
+    """
+    radius = k * sqrt(n)
+    if start == "regular":
+        # Successive nodes are a golden angle apart at equal area spacing.
+        angle = pi * (3.0 - sqrt(5.0)) * arange(n)
+        r = radius * sqrt((arange(n) + 0.5) / max(n, 1))
+        initial = column_stack([r * cos(angle), r * sin(angle)])
+    else:
+        if start == "random":
+            seed = None
+        initial = RandomState(seed).uniform(-radius, radius, (n, 2))
+
+    if positions is not None:
+        positions = asarray(positions, dtype=float).reshape(-1, 2)
+        placed = (positions != 0.0).any(axis=1)
+        initial[placed] = positions[placed]
+    return initial
+
+#------------------------------------------------------------------------------
+#  Force-directed layout:
+#------------------------------------------------------------------------------
+
+def force_layout(edges, n, k=21.6, positions=None, maxiter=200,
+                 epsilon=1e-4, start="regular", seed=1, fixed=None):
+    """ Returns positions of n nodes that balance the attraction along the
+        (tail, head) edges, of magnitude distance**2 / k, with the
+        repulsion between all pairs of nodes, of magnitude k**2 / distance.
+        The step length is adapted as the energy falls.  Iteration stops
+        after maxiter steps or when the nodes move by less than epsilon
+        times the size of the layout.  Nodes in the optional fixed mask
+        keep their given positions.
+    """
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    pos = initial_positions(n, k, positions, start, seed)
+    if n < 2:
+        return pos
+
+    mobile = ones(n)
+    if fixed is not None:
+        fixed = asarray(fixed, dtype=bool)
+        pos[fixed] = asarray(positions, dtype=float)[fixed]
+        mobile[fixed] = 0.0
+
+    # Separate coincident nodes.
+    pos += RandomState(seed).uniform(-1e-3, 1e-3, pos.shape) * k * \
+        mobile[:, None]
+
+    tails, heads = edges[:, 0], edges[:, 1]
+    strength = REPULSION * k * k
+    step = k
+    energy = None
+    progress = 0
+    for i in range(maxiter):
+        forces = repulsive_forces(pos, strength)
+
+        d = pos[heads] - pos[tails]
+        dist = sqrt((d * d).sum(axis=1))
+        f = d * (dist / k)[:, None]
+        for axis in (0, 1):
+            forces[:, axis] += bincount(tails, weights=f[:, axis],
+                                        minlength=n)
+            forces[:, axis] -= bincount(heads, weights=f[:, axis],
+                                        minlength=n)
+
+        norm = sqrt((forces * forces).sum(axis=1))
+        move = forces * (step * mobile / maximum(norm, 1e-9))[:, None]
+        pos += move
+
+        # Adaptive cooling: lengthen the step after steady progress and
+        # shorten it when the energy rises.
+        previous, energy = energy, (norm * norm).sum()
+        if (previous is None) or (energy < previous):
+            progress += 1
+            if progress >= PROGRESS_STEPS:
+                progress = 0
+                step /= COOLING
+        else:
+            progress = 0
+            step *= COOLING
+
+        size = (pos.max(axis=0) - pos.min(axis=0)).max()
+        if step < epsilon * size:
+            break
+
+    return pos
+
+# EOF -------------------------------------------------------------------------
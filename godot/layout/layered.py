@@ -0,0 +1,330 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a layered (Sugiyama) layout of directed graphs.
+
+The layout is found in four phases: cycle removal by reversing the back
+edges of a depth first search, layer assignment by longest path, crossing
+reduction by barycentric sweeps over the layers (with long edges split by
+dummy vertices) and coordinate assignment by averaging the positions of
+neighbours subject to the minimum separation within each layer.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from bisect import bisect_right, insort
+
+from numpy import \
+    array, asarray, zeros, ones, arange, argsort, lexsort, bincount, \
+    maximum, minimum, cumsum, concatenate, where
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Number of down and up sweeps of the crossing reduction.
+ORDER_ITERATIONS = 8
+
+# Number of passes of the coordinate assignment.
+POSITION_ITERATIONS = 8
+
+#------------------------------------------------------------------------------
+#  Cycle removal:
+#------------------------------------------------------------------------------
+
+def back_edges(n, edges):
+    """ Returns a boolean array marking the edges that close a cycle in a
+        depth first search of the n vertices, reversing which makes the
+        graph acyclic.
+    """
+    out = [[] for i in range(n)]
+    for k, (u, v) in enumerate(edges):
+        out[u].append((v, k))
+
+    reverse = zeros(len(edges), dtype=bool)
+    # 0: unvisited, 1: on the stack, 2: finished.
+    state = zeros(n, dtype=int)
+    for root in range(n):
+        if state[root]:
+            continue
+        state[root] = 1
+        stack = [(root, 0)]
+        while stack:
+            u, i = stack[-1]
+            if i < len(out[u]):
+                stack[-1] = (u, i + 1)
+                v, k = out[u][i]
+                if state[v] == 1:
+                    reverse[k] = True
+                elif state[v] == 0:
+                    state[v] = 1
+                    stack.append((v, 0))
+            else:
+                state[u] = 2
+                stack.pop()
+    return reverse
+
+#------------------------------------------------------------------------------
+#  Layer assignment:
+#------------------------------------------------------------------------------
+
+def longest_path_layers(n, edges):
+    """ Returns the layer of each of the n vertices of an acyclic graph,
+        each edge spanning at least one layer.  Sources are then moved down
+        to just above their nearest successor.
+    """
+    layer = zeros(n, dtype=int)
+    if len(edges) == 0:
+        return layer
+
+    tails, heads = edges[:, 0], edges[:, 1]
+    indegree = bincount(heads, minlength=n)
+    out = [[] for i in range(n)]
+    for u, v in edges:
+        out[u].append(v)
+
+    queue = list(where(indegree == 0)[0])
+    remaining = indegree.copy()
+    while queue:
+        u = queue.pop()
+        for v in out[u]:
+            layer[v] = max(layer[v], layer[u] + 1)
+            remaining[v] -= 1
+            if remaining[v] == 0:
+                queue.append(v)
+
+    for u in where((indegree == 0) & (bincount(tails, minlength=n) > 0))[0]:
+        layer[u] = min([layer[v] for v in out[u]]) - 1
+
+    return layer - layer.min()
+
+#------------------------------------------------------------------------------
+#  Dummy vertices:
+#------------------------------------------------------------------------------
+
+def split_long_edges(n, edges, layer):
+    """ Splits edges spanning more than one layer with dummy vertices.
+        Returns the total number of vertices, their layers, the chain of
+        vertices along each edge and the edges between adjacent layers.
+    """
+    layers = list(layer)
+    chains = []
+    short = []
+    for u, v in edges:
+        chain = [u]
+        for l in range(layer[u] + 1, layer[v]):
+            chain.append(len(layers))
+            layers.append(l)
+        chain.append(v)
+        chains.append(chain)
+        short.extend(zip(chain[:-1], chain[1:]))
+
+    return len(layers), array(layers, dtype=int), chains, \
+        array(short, dtype=int).reshape(-1, 2)
+
+#------------------------------------------------------------------------------
+#  Crossing reduction:
+#------------------------------------------------------------------------------
+
+def count_crossings(upper, lower):
+    """ Returns the number of crossings between edges joining the given
+        positions in two adjacent layers.
+    """
+    count = 0
+    seen = []
+    for b in lower[lexsort((lower, upper))]:
+        count += len(seen) - bisect_right(seen, b)
+        insort(seen, b)
+    return count
+
+
+def order_layers(m, layer, short, iterations=ORDER_ITERATIONS):
+    """ Returns the position of each of the m vertices within its layer,
+        reducing edge crossings by sorting the layers by the barycentre of
+        their neighbours in the layer above and then in the layer below.
+    """
+    n_layers = layer.max() + 1
+    members = [where(layer == l)[0] for l in range(n_layers)]
+
+    # Edges between layer l - 1 and layer l, as (upper, lower) vertices.
+    between = [None] + [short[layer[short[:, 1]] == l]
+                        for l in range(1, n_layers)]
+
+    position = zeros(m, dtype=float)
+    for vertices in members:
+        position[vertices] = arange(len(vertices))
+
+    def crossings():
+        return sum([count_crossings(position[e[:, 0]], position[e[:, 1]])
+                    for e in between[1:]])
+
+    best, best_position = crossings(), position.copy()
+    for i in range(iterations):
+        # Sweep down, ordering each layer by the one above, then up.
+        if i % 2 == 0:
+            sweep = [(l, between[l], 0, 1) for l in range(1, n_layers)]
+        else:
+            sweep = [(l, between[l + 1], 1, 0)
+                     for l in range(n_layers - 2, -1, -1)]
+
+        for l, e, fixed, free in sweep:
+            vertices = members[l]
+            total = bincount(e[:, free], weights=position[e[:, fixed]],
+                             minlength=m)[vertices]
+            count = bincount(e[:, free], minlength=m)[vertices]
+            # Vertices without neighbours keep their position.
+            bary = where(count > 0, total / maximum(count, 1),
+                         position[vertices])
+            order = lexsort((position[vertices], bary))
+            position[vertices[order]] = arange(len(vertices))
+
+        c = crossings()
+        if c < best:
+            best, best_position = c, position.copy()
+        if best == 0:
+            break
+
+    return best_position.astype(int)
+
+#------------------------------------------------------------------------------
+#  Coordinate assignment:
+#------------------------------------------------------------------------------
+
+def separate(desired, gaps):
+    """ Returns the coordinates nearest the desired ones, in order, such
+        that each is at least its gap beyond the previous one.  The
+        solutions pushing right and pushing left are averaged.
+    """
+    offsets = cumsum(gaps)
+    shifted = desired - offsets
+    right = maximum.accumulate(shifted)
+    left = minimum.accumulate(shifted[::-1])[::-1]
+    return (right + left) / 2.0 + offsets
+
+
+def assign_coordinates(m, layer, position, short, widths, nodesep,
+                       iterations=POSITION_ITERATIONS):
+    """ Returns the x coordinate of each of the m vertices, moving each
+        towards the mean of its neighbours while keeping the vertices of
+        each layer in order and separated.
+    """
+    n_layers = layer.max() + 1
+    rows = []
+    for l in range(n_layers):
+        vertices = where(layer == l)[0]
+        vertices = vertices[argsort(position[vertices])]
+        w = widths[vertices]
+        gaps = concatenate([[0.0], (w[:-1] + w[1:]) / 2.0 + nodesep])
+        rows.append((vertices, gaps))
+
+    x = zeros(m, dtype=float)
+    for vertices, gaps in rows:
+        x[vertices] = cumsum(gaps) - gaps.sum() / 2.0
+
+    if len(short) == 0:
+        return x
+
+    both = concatenate([short, short[:, ::-1]])
+    count = bincount(both[:, 0], minlength=m)
+    for i in range(iterations):
+        total = bincount(both[:, 0], weights=x[both[:, 1]], minlength=m)
+        desired = where(count > 0, total / maximum(count, 1), x)
+        if i % 2 == 0:
+            sweep = rows
+        else:
+            sweep = rows[::-1]
+        for vertices, gaps in sweep:
+            x[vertices] = separate(desired[vertices], gaps)
+
+    return x
+
+#------------------------------------------------------------------------------
+#  Layered layout:
+#------------------------------------------------------------------------------
+
+def layered_layout(edges, sizes, nodesep=18.0, ranksep=36.0, rankdir="TB",
+                   iterations=ORDER_ITERATIONS):
+    """ Returns the positions of vertices of the given (width, height)
+        sizes, in points, and the polyline along each (tail, head) edge,
+        laid out in layers with the edges pointing down the rank direction.
+    """
+    sizes = asarray(sizes, dtype=float).reshape(-1, 2)
+    n = len(sizes)
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    if n == 0:
+        return zeros((0, 2)), []
+
+    # Lay out from top to bottom, swapping the sizes for rank directions
+    # that run across.
+    if rankdir in ["LR", "RL"]:
+        sizes = sizes[:, ::-1]
+
+    loops = edges[:, 0] == edges[:, 1]
+    dag = edges[~loops]
+    reverse = back_edges(n, dag)
+    dag = where(reverse[:, None], dag[:, ::-1], dag)
+
+    layer = longest_path_layers(n, dag)
+    m, layers, chains, short = split_long_edges(n, dag, layer)
+
+    position = order_layers(m, layers, short, iterations)
+
+    widths = zeros(m)
+    widths[:n] = sizes[:, 0]
+    x = assign_coordinates(m, layers, position, short, widths, nodesep)
+
+    # Ranks run down from zero, each separated from the next by ranksep.
+    n_layers = layers.max() + 1
+    heights = zeros(n_layers)
+    for l in range(n_layers):
+        members = where(layer == l)[0]
+        if len(members):
+            heights[l] = sizes[members, 1].max()
+    steps = concatenate([[0.0], (heights[:-1] + heights[1:]) / 2.0 + ranksep])
+    y = -cumsum(steps)[layers]
+
+    if rankdir == "LR":
+        points = array([-y, -x]).T
+    elif rankdir == "RL":
+        points = array([y, -x]).T
+    elif rankdir == "BT":
+        points = array([x, -y]).T
+    else:
+        points = array([x, y]).T
+
+    polylines = []
+    dag_index = iter(range(len(dag)))
+    for is_loop in loops:
+        if is_loop:
+            polylines.append(None)
+            continue
+        k = dag_index.next()
+        chain = chains[k]
+        if reverse[k]:
+            chain = chain[::-1]
+        polylines.append(points[chain])
+
+    return points[:n], polylines
+
+# EOF -------------------------------------------------------------------------
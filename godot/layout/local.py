@@ -0,0 +1,264 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the local re-layout of a graph after a node has been moved.
+
+Only the edges of the moved node are re-routed, straight or around the nodes
+in their way, and only the neighbours the node now overlaps are pushed aside,
+so that dragging a node stays interactive however large the graph.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from numpy import \
+    array, asarray, zeros, ones, where, minimum, maximum, argmin, sign, \
+    abs as np_abs, triu, newaxis
+
+from godot.layout.adjacency import graph_nodes, graph_edges
+from godot.layout.clusters import cluster_nodes, cluster_edges
+from godot.layout.engine import \
+    POINTS_PER_INCH, NODE_XDOT_ATTRS, edge_spline, loop_points, \
+    set_edge_spline
+from godot.layout.pack import translate_xdot
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Clearance, in points, kept between a re-routed edge and other nodes.
+ROUTE_MARGIN = 4.0
+
+# Maximum number of bends added to route an edge around nodes.
+MAX_DETOURS = 4
+
+# Rounds of pushing apart overlapping neighbours.
+OVERLAP_ITERATIONS = 10
+
+#------------------------------------------------------------------------------
+#  Geometry:
+#------------------------------------------------------------------------------
+
+def node_box(node, margin=0.0):
+    """ Returns the (x1, y1, x2, y2) bounding box of a node, in points,
+        grown by the margin on each side.
+    """
+    x, y = node.pos
+    w = node.width * POINTS_PER_INCH / 2.0 + margin
+    h = node.height * POINTS_PER_INCH / 2.0 + margin
+    return (x - w, y - h, x + w, y + h)
+
+
+def segment_hits(p, q, boxes):
+    """ Returns which of the (x1, y1, x2, y2) boxes the segment from p to q
+        crosses and the fraction along the segment at which it enters each.
+    """
+    p = asarray(p, dtype=float)
+    d = asarray(q, dtype=float) - p
+    boxes = asarray(boxes, dtype=float).reshape(-1, 4)
+
+    t0, t1 = zeros(len(boxes)), ones(len(boxes))
+    for axis in (0, 1):
+        lo, hi = boxes[:, axis], boxes[:, axis + 2]
+        if d[axis] == 0:
+            outside = (p[axis] < lo) | (p[axis] > hi)
+            t1 = where(outside, -1.0, t1)
+        else:
+            ta, tb = (lo - p[axis]) / d[axis], (hi - p[axis]) / d[axis]
+            t0 = maximum(t0, minimum(ta, tb))
+            t1 = minimum(t1, maximum(ta, tb))
+
+    return t0 <= t1, t0
+
+
+def route_polyline(start, end, boxes, margin=ROUTE_MARGIN):
+    """ Returns the points of a path from start to end that bends around the
+        boxes in its way, passing each on the side nearer the path.
+    """
+    boxes = asarray(boxes, dtype=float).reshape(-1, 4)
+    points = [tuple(start), tuple(end)]
+
+    for i in range(MAX_DETOURS):
+        for j in range(len(points) - 1):
+            hit, t = segment_hits(points[j], points[j + 1], boxes)
+            if hit.any():
+                break
+        else:
+            break
+
+        blocking = where(hit)[0]
+        k = blocking[argmin(t[blocking])]
+        x1, y1, x2, y2 = boxes[k]
+        centre = array([(x1 + x2) / 2.0, (y1 + y2) / 2.0])
+        half = array([(x2 - x1) / 2.0, (y2 - y1) / 2.0])
+
+        # Step aside from the box centre, normal to the blocked segment.
+        p, q = array(points[j]), array(points[j + 1])
+        d = q - p
+        normal = array([-d[1], d[0]]) / max((d * d).sum() ** 0.5, 1e-9)
+        side = sign(((centre - p) * normal).sum()) or 1.0
+        extent = (np_abs(normal) * half).sum() + margin
+        points.insert(j + 1, tuple(centre - side * normal * extent))
+
+    return points
+
+
+def push_apart(fixed, positions, sizes, sep=0.0):
+    """ Returns the positions of the boxes of the given sizes moved so that
+        none overlap each other or the first, which is not moved.  Each pair
+        is separated along the axis in which it overlaps least.
+    """
+    positions = asarray(positions, dtype=float).copy()
+    sizes = asarray(sizes, dtype=float) + 2.0 * sep
+    mobile = ones(len(positions))
+    mobile[fixed] = 0.0
+
+    for i in range(OVERLAP_ITERATIONS):
+        delta = positions[newaxis, :, :] - positions[:, newaxis, :]
+        overlap = (sizes[newaxis, :, :] + sizes[:, newaxis, :]) / 2.0 - \
+            np_abs(delta)
+        overlapping = triu((overlap > 0).all(axis=2), 1)
+        if not overlapping.any():
+            break
+
+        # Earlier pairs may already have separated later ones.
+        for a, b in zip(*where(overlapping)):
+            d = positions[b] - positions[a]
+            o = (sizes[a] + sizes[b]) / 2.0 - np_abs(d)
+            share = mobile[a] + mobile[b]
+            if (o <= 0).any() or (share == 0):
+                continue
+            axis = argmin(o)
+            direction = sign(d[axis]) or 1.0
+            step = o[axis] * direction / share
+            positions[a, axis] -= step * mobile[a]
+            positions[b, axis] += step * mobile[b]
+
+    return positions
+
+#------------------------------------------------------------------------------
+#  Local re-layout:
+#------------------------------------------------------------------------------
+
+def nodes_near(graph, box):
+    """ Returns the nodes whose boxes intersect the given box, found through
+        the spatial index of the canvas where the graph has one.
+    """
+    from godot.node import Node
+
+    canvas = graph.__dict__.get("component")
+    if (not graph.headless) and (graph.render_mode != "display_list") and \
+            hasattr(canvas, "elements_intersecting"):
+        return [e for e in canvas.elements_intersecting(*box)
+                if isinstance(e, Node)]
+
+    x1, y1, x2, y2 = box
+    nodes = graph_nodes(graph)
+    for cluster in graph.clusters:
+        nodes.extend(cluster_nodes(cluster))
+    near = []
+    for node in nodes:
+        bx1, by1, bx2, by2 = node_box(node)
+        if (bx1 <= x2) and (bx2 >= x1) and (by1 <= y2) and (by2 >= y1):
+            near.append(node)
+    return near
+
+
+def shift_drawing(graph, node, dx, dy):
+    """ Moves the drawing operations of a node drawn from xdot.
+    """
+    if graph.draw_source == "xdot":
+        for attr in NODE_XDOT_ATTRS:
+            data = getattr(node, attr)
+            if data:
+                setattr(node, attr, translate_xdot(data, dx, dy))
+
+
+def route_edge(graph, edge):
+    """ Sets the spline of an edge between the current positions of its
+        nodes, bending around the nodes in its way.  Its drawing operations
+        are discarded so that it is drawn from the spline.
+    """
+    tail, head = edge.tail_node, edge.head_node
+    tail_size = (tail.width * POINTS_PER_INCH, tail.height * POINTS_PER_INCH)
+    head_size = (head.width * POINTS_PER_INCH, head.height * POINTS_PER_INCH)
+
+    if tail.ID == head.ID:
+        points, endp = loop_points(tail.pos, tail_size), None
+    else:
+        (x1, y1), (x2, y2) = tail.pos, head.pos
+        m = ROUTE_MARGIN
+        obstacles = [node_box(n, m) for n in nodes_near(graph,
+                     (min(x1, x2) - m, min(y1, y2) - m,
+                      max(x1, x2) + m, max(y1, y2) + m))
+                     if n.ID not in (tail.ID, head.ID)]
+        polyline = route_polyline(tail.pos, head.pos, obstacles)
+        points, endp = edge_spline(graph, edge, tail.pos, tail_size,
+                                   head.pos, head_size, polyline)
+
+    set_edge_spline(edge, points, endp)
+
+
+def relayout_node(graph, node, dx=0.0, dy=0.0):
+    """ Updates the graph after a node has been moved by (dx, dy): neighbours
+        that the node now overlaps are pushed aside, the edges of the moved
+        nodes are re-routed and only these elements are redrawn.
+    """
+    if (dx == 0) and (dy == 0):
+        return
+    shift_drawing(graph, node, dx, dy)
+
+    sep = float(graph.sep)
+    neighbours = [n for n in nodes_near(graph, node_box(node, sep))
+                  if n.ID != node.ID]
+
+    moved = [node]
+    if neighbours:
+        group = [node] + neighbours
+        positions = array([n.pos for n in group], dtype=float)
+        sizes = array([(n.width, n.height) for n in group],
+                      dtype=float) * POINTS_PER_INCH
+        pushed = push_apart(0, positions, sizes, sep)
+        for n, old, new in zip(group[1:], positions[1:], pushed[1:]):
+            if (old != new).any():
+                shift_drawing(graph, n, *(new - old))
+                n.pos = tuple(new)
+                moved.append(n)
+
+    # Redraw the nodes first, so that edges are routed around their new
+    # positions in the index.
+    for n in moved:
+        graph.redraw_node(n)
+
+    ids = set([n.ID for n in moved])
+    edges = graph_edges(graph)
+    for cluster in graph.clusters:
+        edges.extend(cluster_edges(cluster))
+    edges = [e for e in edges
+             if (e.tail_node.ID in ids) or (e.head_node.ID in ids)]
+
+    for edge in edges:
+        route_edge(graph, edge)
+        graph.redraw_edge(edge)
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,160 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a multilevel layout for very large graphs.
+
+The graph is coarsened repeatedly by collapsing matched pairs of adjacent
+nodes, the coarsest graph is laid out and the positions are then prolonged
+to each finer level in turn, where they are refined by a few iterations of
+a force-directed or stress majorization layout.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import sqrt
+
+from numpy import \
+    asarray, arange, ones, concatenate, lexsort, where, minimum, maximum, \
+    unique, bincount, column_stack
+from numpy.random import RandomState
+
+from godot.layout.force import force_layout
+from godot.layout.stress import stress_layout
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Size below which a graph is not coarsened further.
+COARSEST = 64
+
+# Coarsening stops when a level keeps more than this fraction of the nodes.
+STAGNATION = 0.9
+
+# Rounds of matching for each level.
+MATCHING_ROUNDS = 4
+
+# Iterations of refinement at each level finer than the coarsest.
+REFINE_ITERATIONS = 30
+
+# Refining layouts by name, each taking the edges, the number of nodes, the
+# edge length, the initial positions and a maximum number of iterations.
+REFINERS = {"force": force_layout, "stress": stress_layout}
+
+#------------------------------------------------------------------------------
+#  Coarsening:
+#------------------------------------------------------------------------------
+
+def match_nodes(n, edges, mass, rs):
+    """ Returns the partner of each node in a matching of adjacent nodes, or
+        -1.  In each round every unmatched node proposes to its unmatched
+        neighbour of least mass and mutual proposals are accepted.
+    """
+    src = concatenate([edges[:, 0], edges[:, 1]])
+    dst = concatenate([edges[:, 1], edges[:, 0]])
+    partner = -ones(n, dtype=int)
+
+    for i in range(MATCHING_ROUNDS):
+        free = (partner[src] < 0) & (partner[dst] < 0)
+        s, d = src[free], dst[free]
+        if len(s) == 0:
+            break
+        order = lexsort((rs.uniform(size=len(s)), mass[d], s))
+        s, d = s[order], d[order]
+        first = concatenate([[True], s[1:] != s[:-1]])
+
+        proposal = -ones(n, dtype=int)
+        proposal[s[first]] = d[first]
+        proposing = where(proposal >= 0)[0]
+        mutual = proposing[proposal[proposal[proposing]] == proposing]
+        partner[mutual] = proposal[mutual]
+
+    return partner
+
+
+def coarsen(n, edges, mass, rs):
+    """ Returns the coarse node of each node, the number of coarse nodes,
+        the coarse edges without loops or duplicates and the mass of each
+        coarse node.
+    """
+    partner = match_nodes(n, edges, mass, rs)
+    representative = where(partner >= 0, minimum(arange(n), partner),
+                           arange(n))
+    representatives, parent = unique(representative, return_inverse=True)
+    m = len(representatives)
+
+    u, v = parent[edges[:, 0]], parent[edges[:, 1]]
+    keep = u != v
+    u, v = minimum(u[keep], v[keep]), maximum(u[keep], v[keep])
+    key = unique(u.astype("int64") * m + v)
+    coarse_edges = column_stack([key // m, key % m]).astype(int)
+
+    return parent, m, coarse_edges, bincount(parent, weights=mass,
+                                             minlength=m)
+
+#------------------------------------------------------------------------------
+#  Multilevel layout:
+#------------------------------------------------------------------------------
+
+def multilevel_layout(edges, n, length=72.0, refiner="force", maxiter=200,
+                      refine_iterations=REFINE_ITERATIONS, seed=1):
+    """ Returns positions of n nodes joined by (tail, head) edges of about
+        the given length, laying out the coarsest of a hierarchy of
+        coarsened graphs and refining the positions at each finer level
+        with the named refining layout.
+    """
+    refine = REFINERS[refiner]
+    rs = RandomState(seed)
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    # Each level is (number of nodes, edges, coarse node of each node).
+    levels = [(n, edges, None)]
+    mass = ones(n)
+    while levels[-1][0] > COARSEST:
+        fine_n, fine_edges, parent = levels[-1]
+        parent, m, coarse_edges, mass = coarsen(fine_n, fine_edges, mass, rs)
+        if m > STAGNATION * fine_n:
+            break
+        levels[-1] = (fine_n, fine_edges, parent)
+        levels.append((m, coarse_edges, None))
+
+    # A coarse node stands for many nodes, so its edges are longer.
+    def level_length(m):
+        return length * sqrt(float(n) / max(m, 1))
+
+    m, coarse_edges, parent = levels[-1]
+    positions = refine(coarse_edges, m, level_length(m), None,
+                       maxiter=maxiter)
+
+    for fine_n, fine_edges, parent in reversed(levels[:-1]):
+        fine_length = level_length(fine_n)
+        positions = positions[parent] + \
+            rs.uniform(-0.1, 0.1, (fine_n, 2)) * fine_length
+        positions = refine(fine_edges, fine_n, fine_length, positions,
+                           maxiter=refine_iterations)
+
+    return positions
+
+# EOF -------------------------------------------------------------------------
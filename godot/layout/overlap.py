@@ -0,0 +1,186 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the removal of overlaps between node boxes.
+
+Overlapping pairs are found by sweeping a line across the boxes sorted by
+their left sides.  Each pair is given a separation constraint along the axis
+in which it overlaps least, and the constraints of each axis are satisfied
+by scanning the boxes in order, until no boxes overlap.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from numpy import \
+    asarray, arange, argsort, lexsort, searchsorted, repeat, cumsum, \
+    minimum, maximum, column_stack, vstack, concatenate, empty, argmin, \
+    where, abs as np_abs
+
+from godot.layout.pack import translate_xdot
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Maximum number of sweeps separating overlapping boxes.
+OVERLAP_ITERATIONS = 20
+
+# Overlap, in points, below which boxes are considered apart.
+TOLERANCE = 1e-6
+
+#------------------------------------------------------------------------------
+#  Overlap removal:
+#------------------------------------------------------------------------------
+
+def overlapping_pairs(boxes):
+    """ Returns the indices (i, j) of the pairs of (x1, y1, x2, y2) boxes that
+        overlap.  Sweeping in order of left sides, each box is paired with the
+        boxes that start before it ends, which are then tested in y.
+    """
+    boxes = asarray(boxes, dtype=float).reshape(-1, 4)
+    n = len(boxes)
+    order = argsort(boxes[:, 0], kind="mergesort")
+    b = boxes[order]
+
+    # Boxes after each one in sweep order that start before it ends.
+    end = searchsorted(b[:, 0], b[:, 2], side="left")
+    counts = maximum(end - arange(n) - 1, 0)
+    i = repeat(arange(n), counts)
+    j = i + 1 + arange(counts.sum()) - repeat(cumsum(counts) - counts, counts)
+
+    keep = (b[j, 1] < b[i, 3]) & (b[i, 1] < b[j, 3]) & (b[j, 0] < b[i, 2])
+    return order[i[keep]], order[j[keep]]
+
+
+def unique_rows(rows):
+    """ Returns the distinct rows of an integer array, sorted.
+    """
+    if len(rows) == 0:
+        return rows
+    rows = rows[lexsort(rows.T[::-1])]
+    keep = concatenate([[True], (rows[1:] != rows[:-1]).any(axis=1)])
+    return rows[keep]
+
+
+def separate_axis(x, left, right, gaps):
+    """ Returns the coordinates moved so that x[right] - x[left] >= gaps for
+        each constraint, averaging a pass that pushes right and one that
+        pushes left so that the layout does not drift.  Constraints must go
+        from lower to higher coordinates, ties broken by index.
+    """
+    rank = argsort(lexsort((arange(len(x)), x)))
+    triples = zip(left.tolist(), right.tolist(), gaps.tolist())
+
+    pushed_right = x.tolist()
+    for a, b, gap in [triples[k] for k in argsort(rank[left],
+                                                  kind="mergesort")]:
+        if pushed_right[b] < pushed_right[a] + gap:
+            pushed_right[b] = pushed_right[a] + gap
+
+    pushed_left = x.tolist()
+    for a, b, gap in [triples[k] for k in argsort(-rank[right],
+                                                  kind="mergesort")]:
+        if pushed_left[a] > pushed_left[b] - gap:
+            pushed_left[a] = pushed_left[b] - gap
+
+    return (asarray(pushed_right) + asarray(pushed_left)) / 2.0
+
+
+def remove_overlaps(positions, sizes, sep=0.0, maxiter=OVERLAP_ITERATIONS):
+    """ Returns the centres of boxes of the given sizes moved so that no two
+        overlap, with a margin of sep around each.  Each overlapping pair is
+        separated along the axis in which it overlaps least and the
+        constraints for each axis are then solved together.
+    """
+    positions = asarray(positions, dtype=float).reshape(-1, 2).copy()
+    half = asarray(sizes, dtype=float).reshape(-1, 2) / 2.0 + sep
+    n = len(positions)
+
+    # Separated pairs stay separated, so that a pair is not pushed back
+    # together while other pairs are separated.
+    constraints = empty((0, 3), dtype=int)
+
+    for iteration in range(maxiter):
+        i, j = overlapping_pairs(column_stack([positions - half,
+                                               positions + half]))
+        overlap = half[i] + half[j] - np_abs(positions[j] - positions[i])
+        apart = overlap.min(axis=1) > TOLERANCE
+        if not apart.any():
+            break
+        pairs = column_stack([minimum(i, j), maximum(i, j),
+                              argmin(overlap, axis=1)])[apart]
+        constraints = unique_rows(vstack([constraints, pairs]))
+
+        for axis in (0, 1):
+            a, b = constraints[constraints[:, 2] == axis][:, :2].T
+            x = positions[:, axis]
+            # Order each pair by coordinate, ties by index.
+            swap = (x[a] > x[b]) | ((x[a] == x[b]) & (a > b))
+            left, right = where(swap, b, a), where(swap, a, b)
+            gaps = half[left, axis] + half[right, axis]
+            positions[:, axis] = separate_axis(x, left, right, gaps)
+
+    return positions
+
+
+def remove_node_overlaps(graph):
+    """ Moves the nodes of the graph so that none overlap, keeping 'sep'
+        points clear around each, and straightens the edges of the moved
+        nodes.  The nodes and edges are updated quietly and the canvas is
+        redrawn once.
+    """
+    # Imported here, since the engines remove overlaps with this module.
+    from godot.layout.engine import \
+        NODE_XDOT_ATTRS, layout_arrays, edge_spline, loop_points, \
+        set_edge_spline
+
+    nodes, edge_list, edges, sizes, positions = layout_arrays(graph)
+    new = remove_overlaps(positions, sizes, float(graph.sep))
+    moved = (new != positions).any(axis=1)
+    if not moved.any():
+        return
+
+    for k in where(moved)[0]:
+        node = nodes[k]
+        dx, dy = new[k] - positions[k]
+        if graph.draw_source == "xdot":
+            for attr in NODE_XDOT_ATTRS:
+                data = getattr(node, attr)
+                if data:
+                    node.trait_setq(**{attr: translate_xdot(data, dx, dy)})
+        node.trait_setq(pos=(float(new[k][0]), float(new[k][1])))
+
+    for (u, v), edge in zip(edges, edge_list):
+        if not (moved[u] or moved[v]):
+            continue
+        if u == v:
+            points, endp = loop_points(new[u], sizes[u]), None
+        else:
+            points, endp = edge_spline(graph, edge, new[u], sizes[u],
+                                       new[v], sizes[v])
+        set_edge_spline(edge, points, endp, quiet=True)
+
+    graph.redraw_canvas()
+
+# EOF -------------------------------------------------------------------------
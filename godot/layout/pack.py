@@ -0,0 +1,181 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the packing of separately arranged components into one layout,
+in the manner of gvpack, and the translation of their attributes.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import sqrt
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Default margin, in points, around each packed component.
+PACK_MARGIN = 8.0
+
+# Attributes holding a single point.
+POINT_ATTRS = ["pos", "lp", "xlp", "head_lp", "tail_lp", "startp", "endp"]
+
+# Xdot operations followed by a list of points.
+POINTS_OPS = ["P", "p", "L", "B", "b"]
+
+#------------------------------------------------------------------------------
+#  Pack boxes:
+#------------------------------------------------------------------------------
+
+def pack_boxes(sizes, margin=PACK_MARGIN):
+    """ Arranges boxes of the given (width, height) sizes in rows, tallest
+        first, so that the result is roughly square.  Returns the lower-left
+        corner of each box and the (width, height) of the whole.
+    """
+    if not sizes:
+        return [], (0.0, 0.0)
+
+    area = sum([(w + margin) * (h + margin) for w, h in sizes])
+    row_width = max(sqrt(area), max([w for w, h in sizes]))
+
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+
+    rows = [[]]
+    x = 0.0
+    for i in order:
+        w, h = sizes[i]
+        if rows[-1] and (x + w > row_width):
+            rows.append([])
+            x = 0.0
+        rows[-1].append((i, x))
+        x += w + margin
+
+    heights = [max([sizes[i][1] for i, x in row]) for row in rows]
+    height = sum(heights) + margin * (len(rows) - 1)
+    width = max([x + sizes[i][0] for row in rows for i, x in row[-1:]])
+
+    corners = [None] * len(sizes)
+    top = height
+    for row, row_height in zip(rows, heights):
+        for i, x in row:
+            corners[i] = (x, top - sizes[i][1])
+        top -= row_height + margin
+
+    return corners, (width, height)
+
+#------------------------------------------------------------------------------
+#  Translate attributes:
+#------------------------------------------------------------------------------
+
+def _number(value):
+    """ Formats a coordinate as Graphviz does, without trailing zeros.
+    """
+    return ("%.2f" % value).rstrip("0").rstrip(".")
+
+
+def translate_xdot(data, dx, dy):
+    """ Returns the xdot drawing operations with all coordinates moved by
+        (dx, dy).  Text, font, style, colour and image operands are copied
+        unchanged, using their byte counts.
+    """
+    out = []
+    pos, end = 0, len(data)
+
+    def token():
+        """ Returns the next whitespace separated token. """
+        i = pos
+        while i < end and data[i].isspace():
+            i += 1
+        j = i
+        while j < end and not data[j].isspace():
+            j += 1
+        return data[i:j], j
+
+    def string(n):
+        """ Returns the n bytes following the next '-'. """
+        i = data.index("-", pos) + 1
+        return data[i:i + n], i + n
+
+    while True:
+        op, pos = token()
+        if not op:
+            break
+        out.append(op)
+
+        if op in POINTS_OPS:
+            n, pos = token()
+            out.append(n)
+            for i in range(int(n)):
+                x, pos = token()
+                y, pos = token()
+                out.extend([_number(float(x) + dx), _number(float(y) + dy)])
+
+        elif op in ["E", "e", "T", "I"]:
+            x, pos = token()
+            y, pos = token()
+            out.extend([_number(float(x) + dx), _number(float(y) + dy)])
+            for i in range(2):
+                value, pos = token()
+                out.append(value)
+            if op != "E" and op != "e":
+                n, pos = token()
+                text, pos = string(int(n))
+                out.extend([n, "-" + text])
+
+        elif op == "F":
+            size, pos = token()
+            n, pos = token()
+            text, pos = string(int(n))
+            out.extend([size, n, "-" + text])
+
+        elif op in ["c", "C", "S"]:
+            n, pos = token()
+            text, pos = string(int(n))
+            out.extend([n, "-" + text])
+
+        elif op == "t":
+            flags, pos = token()
+            out.append(flags)
+
+    return " ".join(out)
+
+
+def translate_attrs(opts, dx, dy):
+    """ Moves the positions, splines and drawing operations in the given
+        dictionary of parsed node or edge attributes by (dx, dy).
+    """
+    for key, value in opts.items():
+        if key.endswith("draw_"):
+            opts[key] = translate_xdot(value, dx, dy)
+
+        elif key in POINT_ATTRS:
+            if isinstance(value, basestring):
+                value = tuple([float(c) for c in value.split(",")[:2]])
+            if isinstance(value, list):
+                opts[key] = [(x + dx, y + dy) for x, y in value]
+            else:
+                opts[key] = (value[0] + dx, value[1] + dy)
+
+    return opts
+
+# EOF -------------------------------------------------------------------------
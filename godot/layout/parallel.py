@@ -0,0 +1,239 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines the arrangement of a graph by laying out each of its weakly
+connected components in a separate process and packing the results.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import logging
+import subprocess
+
+from multiprocessing import Pool, cpu_count
+
+from dot2tex.dotparsing import \
+    ADD_NODE, ADD_EDGE, ADD_SUBGRAPH, SET_GRAPH_ATTR, SET_DEF_GRAPH_ATTR
+
+from godot.batch import GRAPH_PREFIX, split_graphs
+from godot.dot_data_parser import GodotDataParser
+from godot.layout.adjacency import connected_components
+from godot.layout.pack import pack_boxes, translate_attrs, PACK_MARGIN
+
+#------------------------------------------------------------------------------
+#  Logging:
+#------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Graph attributes set by the layout and not passed on to each component.
+LAYOUT_ATTRS = ["bb", "_draw_", "_ldraw_"]
+
+#------------------------------------------------------------------------------
+#  Run a layout program:
+#------------------------------------------------------------------------------
+
+def run_program(job):
+    """ Processes dot data with a layout program, given as a tuple of the
+        executable, the output format and the data, and returns the exit
+        status, output and error output.  Defined at module level so that it
+        may be sent to a process pool.
+    """
+    executable, format, dot_data = job
+    p = subprocess.Popen((executable, "-T" + format), stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout_output, stderr_output = p.communicate(dot_data)
+    return p.returncode, stdout_output, stderr_output
+
+
+def run_programs(jobs, processes=None):
+    """ Runs each of the jobs with a pool of worker processes, one per CPU
+        unless the number of processes is given.
+    """
+    if (processes == 1) or (len(jobs) < 2):
+        return [run_program(job) for job in jobs]
+
+    pool = Pool(processes)
+    try:
+        return pool.map(run_program, jobs)
+    finally:
+        pool.close()
+        pool.join()
+
+#------------------------------------------------------------------------------
+#  Component dot data:
+#------------------------------------------------------------------------------
+
+def component_dot(graph, nodes, edges, ID=None):
+    """ Returns dot data for a graph with the attributes of the given graph
+        and only the given nodes and edges, which may be any elements or
+        statements in dot language.
+    """
+    return graph.to_dot(list(nodes) + list(edges), LAYOUT_ATTRS, ID)
+
+
+def batch_components(components, jobs):
+    """ Returns the indices of the components divided into at most the
+        given number of batches of similar size, largest components first.
+    """
+    order = sorted(range(len(components)), key=lambda i:
+        -(len(components[i][0]) + len(components[i][1])))
+    batches = [[] for i in range(min(jobs, len(components)))]
+    loads = [0] * len(batches)
+    for i in order:
+        k = loads.index(min(loads))
+        batches[k].append(i)
+        loads[k] += len(components[i][0]) + len(components[i][1])
+    return [batch for batch in batches if batch]
+
+#------------------------------------------------------------------------------
+#  Read a component layout:
+#------------------------------------------------------------------------------
+
+def parse_bb(value):
+    """ Returns a bounding box attribute as a tuple of floats.
+    """
+    if not value:
+        return (0.0, 0.0, 0.0, 0.0)
+    return tuple([float(c) for c in value.split(",")])
+
+
+def read_statements(statements, nodes, edges, graphs, name=None):
+    """ Collects the node and edge attributes from parsed dot statements,
+        recursing into subgraphs.  The attributes of each graph are stored
+        in 'graphs' by name, with None for the top graph.
+    """
+    for statement in statements:
+        cmd = statement[0]
+        if cmd in [SET_GRAPH_ATTR, SET_DEF_GRAPH_ATTR]:
+            graphs.setdefault(name, {}).update(statement[1])
+        elif cmd == ADD_NODE:
+            cmd, nodename, opts = statement
+            nodes[nodename] = opts
+        elif cmd == ADD_EDGE:
+            cmd, src, dest, opts = statement
+            if isinstance(src, tuple):
+                src = src[0]
+            if isinstance(dest, tuple):
+                dest = dest[0]
+            edges.append((src, dest, opts))
+        elif cmd == ADD_SUBGRAPH:
+            cmd, subgraph_name, elements = statement
+            read_statements(elements, nodes, edges, graphs, subgraph_name)
+
+
+def read_layout(parser, data, graphs=None):
+    """ Returns the bounding box, a dictionary of node attributes by ID and
+        a list of (tail ID, head ID, attributes) tuples for the edges from
+        the output of a layout program.  If a dictionary is given for
+        'graphs' the attributes of each subgraph are stored in it by name.
+    """
+    tokens = parser.dotparser.parseString(data.replace("\\\n", ""))[0]
+
+    if graphs is None:
+        graphs = {}
+    nodes = {}
+    edges = []
+    read_statements(tokens[3], nodes, edges, graphs)
+
+    return parse_bb(graphs.get(None, {}).get("bb")), nodes, edges
+
+#------------------------------------------------------------------------------
+#  Arrange components:
+#------------------------------------------------------------------------------
+
+def arrange_components(graph, processes=None, prog=None, margin=PACK_MARGIN):
+    """ Lays out each weakly connected component of the graph in parallel,
+        packs the results into a single layout and sets the positions and
+        xdot drawing operations of the nodes and edges.  The components are
+        written as separate graphs to one input per process, so that each
+        run of the layout program arranges many of them.  Graphs with
+        subgraphs or clusters, or a single component, and in-process
+        engines are arranged as a whole.
+    """
+    prog = graph.program if prog is None else prog
+
+    components = connected_components(graph)
+    if (prog not in graph.programs) or (len(components) < 2) or \
+        graph.subgraphs or graph.clusters:
+        graph.arrange_all()
+        return
+
+    executable = graph.programs[prog]
+    batches = batch_components(components, processes or cpu_count())
+    jobs = []
+    for batch in batches:
+        dot_data = "\n".join([component_dot(graph, components[i][0],
+            components[i][1], "%s%d" % (GRAPH_PREFIX, i)) for i in batch])
+        jobs.append((executable, "xdot", dot_data))
+    results = run_programs(jobs, processes)
+
+    parser = GodotDataParser()
+    parser.dotparser.parseWithTabs()
+
+    chunks = {}
+    for status, data, stderr_output in results:
+        if (status != 0) or not data:
+            logger.error("Program terminated with status: %d. stderr "
+                "follows: %s" % (status, stderr_output))
+            return
+        chunks.update(split_graphs(data))
+
+    if len(chunks) != len(components):
+        logger.error("Layouts of %d of %d components were read." %
+            (len(chunks), len(components)))
+        return
+    layouts = [read_layout(parser, chunks[i]) for i in range(len(components))]
+
+    sizes = [(x2 - x1, y2 - y1) for (x1, y1, x2, y2), n, e in layouts]
+    corners, (width, height) = pack_boxes(sizes, margin)
+
+    for (nodes, edges), layout, corner in zip(components, layouts, corners):
+        (x1, y1, x2, y2), node_layout, edge_layout = layout
+        dx, dy = corner[0] - x1, corner[1] - y1
+
+        for node in nodes:
+            opts = node_layout.get(node.ID)
+            if opts is not None:
+                node.set(**translate_attrs(opts, dx, dy))
+
+        # Edges between the same pair of nodes are matched in order.
+        matches = {}
+        for edge in edges:
+            key = (edge.tail_node.ID, edge.head_node.ID)
+            matches.setdefault(key, []).append(edge)
+
+        for tail, head, opts in edge_layout:
+            candidates = matches.get((tail, head)) or matches.get((head, tail))
+            if candidates:
+                candidates.pop(0).set(**translate_attrs(opts, dx, dy))
+
+    graph.bb = (0.0, 0.0, width, height)
+    graph.redraw_canvas()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,105 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a spectral layout for quick previews of very large graphs.
+
+Nodes are placed by the second and third eigenvectors of the random walk
+matrix of the graph, found together by power iteration with sparse
+products, following Koren's degree normalised eigenvectors.  Each iteration
+costs time in proportion to the number of edges.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from numpy import \
+    asarray, concatenate, column_stack, bincount, maximum, sqrt, dot, argmax
+from numpy.linalg import qr
+from numpy.random import RandomState
+
+from godot.layout.adjacency import csr_adjacency, bfs_distances
+
+#------------------------------------------------------------------------------
+#  Spectral layout:
+#------------------------------------------------------------------------------
+
+def spectral_layout(edges, n, length=72.0, maxiter=100, epsilon=1e-9,
+                    seed=1):
+    """ Returns positions of n nodes given by the degree normalised
+        eigenvectors of the graph of (tail, head) edges, scaled so that the
+        mean edge has the given length.
+    """
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    if (n < 3) or (len(edges) == 0):
+        return RandomState(seed).uniform(-length, length, (n, 2))
+
+    src = concatenate([edges[:, 0], edges[:, 1]])
+    dst = concatenate([edges[:, 1], edges[:, 0]])
+    degree = maximum(bincount(src, minlength=n), 1).astype(float)
+
+    weight = sqrt(degree)
+
+    def orthonormalise(x):
+        """ Makes the columns of x orthogonal to the constant vector and to
+            each other, and of unit length, in the inner product weighted
+            by degree.
+        """
+        x = x - dot(degree, x) / degree.sum()
+        q, r = qr(x * weight[:, None])
+        return q / weight[:, None]
+
+    # Start from the distances to a peripheral node, which are smooth over
+    # the graph so that fewer iterations are needed, and from noise, which
+    # breaks any symmetry shared by the graph and that node.
+    indptr, indices = csr_adjacency(n, edges)
+    rs = RandomState(seed)
+    pivot = rs.randint(n)
+    for k in range(2):
+        dist = bfs_distances(indptr, indices, pivot).astype(float)
+        dist[dist < 0] = dist.max() + 1.0
+        pivot = argmax(dist)
+    starts = column_stack([dist, rs.uniform(-1.0, 1.0, n) * dist.max()])
+
+    x = orthonormalise(starts)
+    for i in range(maxiter):
+        # Average each node with the mean of its neighbours.
+        y = 0.5 * x
+        for k in (0, 1):
+            y[:, k] += 0.5 * bincount(src, weights=x[dst, k], minlength=n) / \
+                degree
+        y = orthonormalise(y)
+        # Stop when the subspace spanned no longer turns.
+        overlap = dot((y * degree[:, None]).T, x)
+        x = y
+        if 2.0 - (overlap ** 2).sum() < epsilon:
+            break
+
+    positions = x
+    d = positions[edges[:, 0]] - positions[edges[:, 1]]
+    mean = sqrt((d * d).sum(axis=1)).mean()
+    if mean > 0.0:
+        positions *= length / mean
+    return positions
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,135 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines stable re-arrangement of a graph from its current layout.
+
+After small edits the layout is run again from the current node positions,
+with fewer iterations, so that it converges quickly and the picture changes
+little.  Nodes untouched by the edits may be pinned in place.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import logging
+
+from godot.layout.adjacency import graph_nodes, graph_edges
+from godot.layout.clusters import cluster_nodes, cluster_edges
+from godot.layout.engine import ENGINES, EDGE_XDOT_ATTRS, arrange_in_process
+from godot.layout.pack import POINT_ATTRS, translate_attrs
+
+#------------------------------------------------------------------------------
+#  Logging:
+#------------------------------------------------------------------------------
+
+logger = logging.getLogger(__name__)
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Fraction of the usual iterations run when starting from a previous layout.
+STABLE_ITERATIONS = 0.25
+
+# Graphviz programs that start from the input positions of nodes.
+WARM_PROGRAMS = ["neato", "fdp", "sfdp"]
+
+#------------------------------------------------------------------------------
+#  Translation:
+#------------------------------------------------------------------------------
+
+def translate_layout(graph, nodes, dx, dy):
+    """ Moves the positions, splines and drawing operations of the given
+        nodes and of the edges of the graph, and its bounding box, by (dx, dy).
+    """
+    edges = graph_edges(graph)
+    for cluster in graph.clusters:
+        edges.extend(cluster_edges(cluster))
+
+    seen = set()
+    for element in nodes + edges:
+        if id(element) in seen:
+            continue
+        seen.add(id(element))
+
+        opts = {}
+        for name in POINT_ATTRS + EDGE_XDOT_ATTRS:
+            value = getattr(element, name, None)
+            if value:
+                opts[name] = value
+        element.set(**translate_attrs(opts, dx, dy))
+
+    x1, y1, x2, y2 = graph.bb
+    graph.bb = (x1 + dx, y1 + dy, x2 + dx, y2 + dy)
+
+#------------------------------------------------------------------------------
+#  Stable arrangement:
+#------------------------------------------------------------------------------
+
+def arrange_stable(graph, touched=(), pin_untouched=False):
+    """ Arranges the graph starting from the current node positions with a
+        reduced iteration limit.  If 'pin_untouched' is True, placed nodes
+        whose IDs are not in 'touched' are kept where they are.
+    """
+    nodes = graph_nodes(graph)
+    for cluster in graph.clusters:
+        nodes.extend(cluster_nodes(cluster))
+
+    pinned = []
+    if pin_untouched:
+        pinned = [n for n in nodes if (not n.pin) and (n.ID not in touched)
+                  and (n.pos != (0.0, 0.0))]
+
+    maxiter = graph.maxiter
+    prog = graph.program
+    try:
+        for node in pinned:
+            node.trait_setq(pin=True)
+        graph.trait_setq(maxiter=max(1, int(maxiter * STABLE_ITERATIONS)))
+
+        if prog in ENGINES:
+            arrange_in_process(graph)
+        elif prog in WARM_PROGRAMS:
+            # Positions are given in points, as they were output, rather
+            # than in inches.
+            positions = [node.pos for node in pinned]
+            graph.arrange_xdot(graph.create(format="xdot", args=["-s"]))
+
+            # Graphviz moves the layout to the origin, so move it back to
+            # where the pinned nodes were.
+            if pinned:
+                x, y = pinned[0].pos
+                dx, dy = positions[0][0] - x, positions[0][1] - y
+                if dx or dy:
+                    translate_layout(graph, nodes, dx, dy)
+                    graph.redraw_canvas()
+        else:
+            logger.info("%s does not start from the current positions, "
+                        "arranging from scratch" % prog)
+            graph.arrange_xdot(graph.create(format="xdot"))
+    finally:
+        for node in pinned:
+            node.trait_setq(pin=False)
+        graph.trait_setq(maxiter=maxiter)
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,215 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a stress majorization layout, as neato's mode="major", on sparse
+shortest path distances.
+
+Rather than all pairs of nodes, the stress is taken over the edges and the
+distances from each node to a set of pivot nodes, found by breadth first
+search, so memory grows with the number of nodes times the number of
+pivots.  The pivot distances also give an initial layout by pivot
+multidimensional scaling.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from numpy import \
+    asarray, zeros, empty, arange, concatenate, repeat, tile, where, sqrt, \
+    maximum, minimum, bincount, dot, argmax, isnan
+from numpy.linalg import eigh
+from numpy.random import RandomState
+
+from godot.layout.adjacency import csr_adjacency, bfs_distances, neighbours_of
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Number of pivot nodes.
+PIVOTS = 50
+
+#------------------------------------------------------------------------------
+#  Pivot distances:
+#------------------------------------------------------------------------------
+
+def pivot_distances(indptr, indices, pivots=PIVOTS, seed=1):
+    """ Returns the indices of pivot nodes, chosen in turn as far as
+        possible from those already chosen, and an array of the shortest
+        path distance from every node to each pivot.  Nodes that cannot be
+        reached are put one beyond the furthest that can.
+    """
+    n = len(indptr) - 1
+    pivots = min(pivots, n)
+    chosen = empty(pivots, dtype=int)
+    distances = empty((n, pivots), dtype=float)
+
+    nearest = zeros(n)
+    chosen[0] = RandomState(seed).randint(n)
+    for p in range(pivots):
+        dist = bfs_distances(indptr, indices, chosen[p]).astype(float)
+        dist[dist < 0] = dist.max() + 1.0
+        distances[:, p] = dist
+        if p == 0:
+            nearest = dist
+        else:
+            nearest = minimum(nearest, dist)
+        if p + 1 < pivots:
+            chosen[p + 1] = argmax(nearest)
+
+    return chosen, distances
+
+
+def pivot_mds(distances):
+    """ Returns two dimensional positions whose distances are proportional
+        to the given node to pivot distances, by pivot multidimensional
+        scaling.  The positions are not in the units of the distances and
+        must be scaled by the caller.
+    """
+    squared = distances ** 2
+    centred = squared - squared.mean(axis=0) - \
+        squared.mean(axis=1)[:, None] + squared.mean()
+    centred *= -0.5
+
+    values, vectors = eigh(dot(centred.T, centred))
+    # The eigenvalues are in ascending order.
+    return dot(centred, vectors[:, -2:][:, ::-1])
+
+#------------------------------------------------------------------------------
+#  Warm start:
+#------------------------------------------------------------------------------
+
+def warm_start(positions, indptr, indices, scale, seed=1):
+    """ Returns the given positions with nodes left at the origin placed
+        near the mean of their placed neighbours, or at random.
+    """
+    positions = asarray(positions, dtype=float).copy()
+    placed = (positions != 0.0).any(axis=1)
+    rs = RandomState(seed)
+
+    for i in range(3):
+        unplaced = where(~placed)[0]
+        if len(unplaced) == 0:
+            break
+        reached, counts = neighbours_of(indptr, indices, unplaced)
+        owner = repeat(arange(len(unplaced)), counts)
+        known = placed[reached]
+        count = bincount(owner[known], minlength=len(unplaced))
+        for axis in (0, 1):
+            total = bincount(owner[known], minlength=len(unplaced),
+                             weights=positions[reached[known], axis])
+            positions[unplaced, axis] = where(count > 0,
+                total / maximum(count, 1), 0.0)
+        positions[unplaced] += rs.uniform(-0.1, 0.1, (len(unplaced), 2)) * \
+            scale
+        placed[unplaced[count > 0]] = True
+
+    unplaced = where(~placed)[0]
+    if len(unplaced):
+        extent = abs(positions[placed]).max() if placed.any() else scale
+        positions[unplaced] = rs.uniform(-extent, extent, (len(unplaced), 2))
+    return positions
+
+#------------------------------------------------------------------------------
+#  Stress majorization:
+#------------------------------------------------------------------------------
+
+def stress(positions, i, j, d, w):
+    """ Returns the weighted stress of the terms joining nodes i and j at
+        ideal distances d.
+    """
+    diff = positions[i] - positions[j]
+    return (w * (sqrt((diff * diff).sum(axis=1)) - d) ** 2).sum()
+
+
+def stress_layout(edges, n, length=72.0, positions=None, maxiter=200,
+                  epsilon=1e-4, pivots=PIVOTS, seed=1, fixed=None, mds=True):
+    """ Returns positions of n nodes minimising the stress of the (tail,
+        head) edges and of the distances to pivot nodes, where each edge
+        has the given ideal length.  The layout starts from any positions
+        given away from the origin, or else from pivot multidimensional
+        scaling if 'mds' is True and at random if not.  Iteration stops
+        after maxiter steps or when the stress falls by less than the
+        fraction epsilon.  Nodes in the optional fixed mask keep their
+        given positions.
+    """
+    edges = asarray(edges, dtype=int).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    if n < 2:
+        return zeros((n, 2))
+
+    indptr, indices = csr_adjacency(n, edges)
+    chosen, distances = pivot_distances(indptr, indices, pivots, seed)
+
+    if (positions is not None) and (asarray(positions) != 0.0).any():
+        x = warm_start(positions, indptr, indices, length, seed)
+    elif mds:
+        x = pivot_mds(distances)
+        # Scale the layout so that the mean edge has the ideal length.
+        if len(edges):
+            diff = x[edges[:, 0]] - x[edges[:, 1]]
+            mean = sqrt((diff * diff).sum(axis=1)).mean()
+        else:
+            mean = 0.0
+        if mean > 0.0:
+            x *= length / mean
+        x += RandomState(seed).uniform(-1e-3, 1e-3, x.shape) * length
+    else:
+        x = RandomState(seed).uniform(-1.0, 1.0, (n, 2)) * length * sqrt(n)
+
+    # Terms for each edge, both ways, and from each node to each pivot,
+    # weighted by the inverse square of their ideal distance.
+    pivot_i = repeat(arange(n), len(chosen))
+    pivot_j = tile(chosen, n)
+    pivot_d = distances.ravel()
+    keep = pivot_d > 0
+    i = concatenate([edges[:, 0], edges[:, 1], pivot_i[keep]])
+    j = concatenate([edges[:, 1], edges[:, 0], pivot_j[keep]])
+    d = concatenate([zeros(2 * len(edges)) + 1.0, pivot_d[keep]]) * length
+    w = d ** -2
+
+    weight = bincount(i, weights=w, minlength=n)
+    if fixed is not None:
+        fixed = asarray(fixed, dtype=bool)
+        x[fixed] = asarray(positions, dtype=float)[fixed]
+        weight[fixed] = 0.0
+    previous = stress(x, i, j, d, w)
+    for iteration in range(maxiter):
+        # Move each node to the weighted mean of where each of its terms
+        # would place it.
+        diff = x[i] - x[j]
+        dist = maximum(sqrt((diff * diff).sum(axis=1)), 1e-9)
+        target = x[j] + diff * (d / dist)[:, None]
+        for axis in (0, 1):
+            total = bincount(i, weights=w * target[:, axis], minlength=n)
+            x[:, axis] = where(weight > 0, total / maximum(weight, 1e-300),
+                               x[:, axis])
+
+        current = stress(x, i, j, d, w)
+        if previous - current < epsilon * previous:
+            break
+        previous = current
+
+    return x
+
+# EOF -------------------------------------------------------------------------
@@ -36,6 +36,10 @@ from enthought.enable.component_editor import ComponentEditor
 
 from godot.node import Node as GodotNode
 from godot.edge import Edge as GodotEdge
+from godot.batch import arrange_elements
+from godot.layout.auto import select_program
+from godot.xdot_parser import XdotAttrParser
+from godot.util import move_to_origin
 
 from godot.tool.element_tool import ElementTool
 from godot.tool.context_menu_tool import ContextMenuTool
@@ -182,7 +186,7 @@ class Mapping(HasTraits):
     links = List(Instance(LinkMapping))
 
     # Graphviz layout program
-    program = Enum("dot", "circo", "fdp", "neato", "twopi")
+    program = Enum("dot", "circo", "fdp", "neato", "twopi", "sfdp", "auto")
 
     # XDot code parser
 #    parser = Instance(XDotParser, XDotParser())
@@ -240,7 +244,8 @@ class Mapping(HasTraits):
                     new.on_trait_change(self.map_element, ct+"_items")
 
         logger.debug("Retrieving xdot data and forming pydot graph!")
-        xdot = graph_from_dot_data(dot.create(self.program, "xdot"))
+        program = self._layout_program(len(dot.get_node_list()))
+        xdot = graph_from_dot_data(dot.create(program, "xdot"))
         parser = XDotParser()
 
         for node in xdot.get_node_list():
@@ -279,6 +284,17 @@ class Mapping(HasTraits):
         del parser
 
 
+    def _layout_program(self, n):
+        """ Returns the Graphviz program laying out n diagram nodes """
+
+        if self.program != "auto":
+            return self.program
+
+        program = select_program(n, 0, in_process=False)
+        logger.info("Chose %s for %d diagram node(s)" % (program, n))
+        return program
+
+
     def unmap_model(self, old):
         """ Removes listeners from a domain model """
 
@@ -296,29 +312,43 @@ class Mapping(HasTraits):
         """ Handles mapping elements to diagram components """
 
         canvas = self.diagram.diagram_canvas
-        parser = XDotParser()
 
+        # Lay out the nodes of all added elements with one Graphviz call.
+        mapped = []
         for element in event.added:
             logger.debug("Mapping new element [%s] to diagram node" % element)
             for node_mapping in self.nodes:
                 ct = name[:-6] #strip '_items'
                 if node_mapping.containment_trait == ct:
+                    graph_node = GodotNode(str(id(element)))
                     dot_attrs = node_mapping.dot_node
-                    dot = Dot()
-                    graph_node = Node(str(id(element)))
-                    self._style_node(graph_node, dot_attrs)
-                    dot.add_node(graph_node)
-                    xdot = graph_from_dot_data(dot.create(self.program,"xdot"))
-                    diagram_nodes = parser.parse_nodes(xdot)#.get_node_list())
-                    for dn in diagram_nodes:
-                        if dn is not None:
-                            dn.element = element
-                            # Tools
-                            for tool in node_mapping.tools:
-                                dn.tools.append(tool(dn))
-
-                            canvas.add(dn)
-                            canvas.request_redraw()
+                    if dot_attrs is not None:
+                        graph_node.copy_traits(dot_attrs,
+                            dot_attrs.traits(graphviz=True).keys())
+                    mapped.append((element, node_mapping, graph_node))
+
+        arrange_elements([n for e, m, n in mapped],
+                         self._layout_program(len(mapped)))
+
+        parser = XdotAttrParser()
+        for element, node_mapping, graph_node in mapped:
+            components = list(parser.parse_xdot_data(graph_node._draw_)) + \
+                list(parser.parse_xdot_data(graph_node._ldraw_))
+            if not components:
+                continue
+            move_to_origin(components)
+
+            dn = Container(auto_size=True, bgcolor="transparent")
+            dn.add(*components)
+            dn.element = element
+            # Tools
+            for tool in node_mapping.tools:
+                dn.tools.append(tool(dn))
+
+            canvas.add(dn)
+
+        if mapped:
+            canvas.request_redraw()
 
         for element in event.removed:
             logger.debug("Unmapping element [%s] from diagram" % element)
@@ -31,7 +31,7 @@ import uuid
 
 from enthought.traits.api import \
     HasTraits, Color, Str, Enum, Float, Font, Any, Bool, Int, File, Trait, \
-    List, Tuple, ListStr, Range, Instance, Button, on_trait_change
+    List, Tuple, ListStr, Range, Instance, Button, Event, on_trait_change
 
 from enthought.traits.ui.api import View, Item, Group, Tabbed, VGroup
 
@@ -68,8 +68,8 @@ node_shapes = ["rect", "rectangle", "box", "ellipse", "circle", "invtriangle",
     "invtrapezium", "point", "egg", "triangle", "plaintext", "diamond",
     "trapezium", "parallelogram", "house", "pentagon", "hexagon", "septagon",
     "octagon", "doublecircle", "doubleoctagon", "tripleoctagon", "invhouse",
-    "none", "note", "tab", "box3d", "component"] + ["Msquare", "Mdiamond",
-                                                    "Mcircle"]
+    "none", "note", "tab", "box3d", "component", "polygon"] + ["Msquare",
+                                                    "Mdiamond", "Mcircle"]
 
 shape_trait = Enum(node_shapes, desc="node shape", label="Node shape",
     graphviz=True)
@@ -117,6 +117,12 @@ class Node(HasTraits):
     # Use Graphviz to arrange all graph components.
     arrange = Button("Arrange All")
 
+    # Fired with the (dx, dy) displacement when the node is dragged.
+    moved = Event
+
+    # Is the component being moved to follow the position?
+    _placing = Bool(False)
+
     #--------------------------------------------------------------------------
     #  Graphviz dot language trait definitions:
     #--------------------------------------------------------------------------
@@ -570,9 +576,15 @@ class Node(HasTraits):
         """ Trait initialiser.
         """
         component = Container(fit_window=False, auto_size=True,
-            bgcolor="green")#, position=list(self.pos) )
+            bgcolor="green")
+        # Centre the component on any position set before it was created.
+        w, h = component.bounds
+        component.position = [ self.pos[0] - (w/2), self.pos[1] - (h/2) ]
         component.tools.append( MoveTool(component) )
 #        component.tools.append( TraitsTool(component) )
+        # Listen here rather than with a decorator, which would create the
+        # component as soon as the node is.
+        component.on_trait_change(self._on_position_change, "position")
         return component
 
 
@@ -594,39 +606,9 @@ class Node(HasTraits):
         """ Arrange the components of the node using Graphviz.
         """
         # FIXME: Circular reference avoidance.
-        import godot.dot_data_parser
-        import godot.graph
-
-        graph = godot.graph.Graph(ID="g")
-        graph.add_node(self)
-
-        print "GRAPH DOT:\n", str(graph)
+        from godot.batch import arrange_elements
 
-        xdot_data = graph.create( format = "xdot" )
-
-        print "XDOT DATA:\n", xdot_data
-        parser = godot.dot_data_parser.GodotDataParser()
-
-#        parser.parse_dot_data(xdot_data)
-
-        flat_data = xdot_data.replace('\\\n','')
-        tokens = parser.dotparser.parseString(flat_data)[0]
-
-        for element in tokens[3]:
-            print "TOK:", element
-            cmd = element[0]
-            if cmd == 'add_node':
-                cmd, nodename, opts = element
-                assert nodename == self.ID
-                print "OPTIONS:", opts
-                self.set( **opts )
-
-#        xdot_graph = parser.parse_dot_data( xdot_data )
-#
-#        if xdot_graph.nodes:
-#            for attr in ["_draw_", "_ldraw_", "pos", "width", "height"]:
-#                value = getattr( xdot_graph.nodes[0], attr )
-#                setattr( self, attr, value )
+        arrange_elements( [self] )
 
 
 #    @on_trait_change("_draw_")
@@ -705,22 +687,39 @@ class Node(HasTraits):
         self.component.request_redraw()
 
 
-    @on_trait_change("component.position")
     def _on_position_change(self, new):
         """ Handles the poition of the component changing.
         """
+        # Ignore the component following the node, so only drags move it.
+        if self._placing:
+            return
+
         w, h = self.component.bounds
+        x, y = self.pos
         self.pos = tuple([ new[0] + (w/2), new[1] + (h/2) ])
+        dx, dy = self.pos[0] - x, self.pos[1] - y
+        if dx or dy:
+            self.moved = ( dx, dy )
 #        self.pos = tuple( new )
 
 
     def _pos_changed(self, new):
-        """ Handles the Graphviz position attribute changing.
+        """ Handles the Graphviz position attribute changing.  The component
+            is only moved if it exists, so that nodes used without a display
+            never create one.
         """
-        w, h = self.component.bounds
-        self.component.position = [ new[0] - (w/2), new[1] - (h/2) ]
-#        self.component.position = list( new )
-        self.component.request_redraw()
+        component = self.__dict__.get("component")
+        if component is None:
+            return
+
+        w, h = component.bounds
+        self._placing = True
+        try:
+            component.position = [ new[0] - (w/2), new[1] - (h/2) ]
+        finally:
+            self._placing = False
+#        component.position = list( new )
+        component.request_redraw()
 
 #------------------------------------------------------------------------------
 #  Stand-alone call:
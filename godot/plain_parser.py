@@ -0,0 +1,165 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines fast readers for the Graphviz plain and json0 output formats.
+
+These formats carry only the layout (node positions and sizes, edge
+splines and the bounding box), so they are much cheaper to produce and read
+than xdot when the drawing operations are not needed.  Each reader returns
+a tuple (bb, nodes, edges) where bb is (llx, lly, urx, ury) in points, nodes
+maps node names to (x, y, width, height) with the position in points and the
+size in inches, and edges is a list of (tail, head, points) in the order the
+edges were written.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import re
+
+try:
+    import json
+except ImportError:
+    import simplejson as json
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+POINTS_PER_INCH = 72.0
+
+# A double-quoted string (with escapes) or a run of non-space characters.
+TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+#------------------------------------------------------------------------------
+#  Split a line of plain output:
+#------------------------------------------------------------------------------
+
+def split_plain_line(line):
+    """ Returns the fields of a line of plain output, unquoting any quoted
+        strings.
+    """
+    fields = []
+    for match in TOKEN.finditer(line):
+        quoted = match.group(1)
+        if quoted is not None:
+            fields.append(quoted.replace('\\"', '"'))
+        else:
+            fields.append(match.group(2))
+    return fields
+
+#------------------------------------------------------------------------------
+#  Parse a spline:
+#------------------------------------------------------------------------------
+
+def parse_spline(value):
+    """ Returns the control points, start point and end point of a spline
+        of the form "e,x,y s,x,y x,y x,y ...".  The start and end points are
+        None if not given.  Multiple splines separated by semicolons are
+        concatenated.
+    """
+    points, startp, endp = [], None, None
+    for spline in value.split(";"):
+        for field in spline.split():
+            parts = field.split(",")
+            if len(parts) == 3:
+                point = (float(parts[1]), float(parts[2]))
+                if parts[0] == "e":
+                    endp = point
+                else:
+                    startp = point
+            else:
+                points.append((float(parts[0]), float(parts[1])))
+    return points, startp, endp
+
+#------------------------------------------------------------------------------
+#  Read plain output:
+#------------------------------------------------------------------------------
+
+def parse_plain(data):
+    """ Reads the output of "-Tplain" (or "-Tplain-ext", whose port suffixes
+        are removed from edge end names).
+    """
+    bb, nodes, edges = (0.0, 0.0, 0.0, 0.0), {}, []
+
+    for line in data.splitlines():
+        if line.startswith("node "):
+            fields = split_plain_line(line)
+            x, y, width, height = [float(f) for f in fields[2:6]]
+            nodes[fields[1]] = (x * POINTS_PER_INCH, y * POINTS_PER_INCH,
+                width, height)
+
+        elif line.startswith("edge "):
+            fields = split_plain_line(line)
+            n = int(fields[3])
+            coords = [float(f) * POINTS_PER_INCH for f in fields[4:4 + 2*n]]
+            points = zip(coords[0::2], coords[1::2])
+            tail, head = fields[1], fields[2]
+            if tail not in nodes:
+                tail = tail.split(":")[0]
+            if head not in nodes:
+                head = head.split(":")[0]
+            edges.append((tail, head, points))
+
+        elif line.startswith("graph "):
+            fields = line.split()
+            bb = (0.0, 0.0, float(fields[2]) * POINTS_PER_INCH,
+                float(fields[3]) * POINTS_PER_INCH)
+
+        elif line.startswith("stop"):
+            break
+
+    return bb, nodes, edges
+
+#------------------------------------------------------------------------------
+#  Read json0 output:
+#------------------------------------------------------------------------------
+
+def parse_json0(data):
+    """ Reads the output of "-Tjson0".
+    """
+    graph = json.loads(data)
+
+    bb = (0.0, 0.0, 0.0, 0.0)
+    if "bb" in graph:
+        bb = tuple([float(c) for c in graph["bb"].split(",")])
+
+    # Objects are subgraphs followed by nodes, indexed by "_gvid".
+    names, nodes = {}, {}
+    for obj in graph.get("objects", []):
+        if ("nodes" in obj) or ("subgraphs" in obj) or ("pos" not in obj):
+            continue
+        names[obj["_gvid"]] = obj["name"]
+        x, y = [float(c) for c in obj["pos"].split(",")]
+        nodes[obj["name"]] = (x, y,
+            float(obj.get("width", 0.0)), float(obj.get("height", 0.0)))
+
+    edges = []
+    for obj in graph.get("edges", []):
+        points = parse_spline(obj.get("pos", ""))[0]
+        edges.append((names.get(obj["tail"]), names.get(obj["head"]), points))
+
+    return bb, nodes, edges
+
+# EOF -------------------------------------------------------------------------
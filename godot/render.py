@@ -0,0 +1,148 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines a headless renderer that paints parsed xdot components onto an
+in-memory image.
+
+Kiva's image backend is used, so no GUI toolkit or display is needed.  The
+components are flattened into a single display list before painting, which
+keeps the cost per image low enough for bulk thumbnail generation.
+
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+from math import ceil
+
+from enthought.kiva.backend_image import GraphicsContext
+
+from godot.component.display_list import DisplayList
+from godot.component.lod import LODPolicy, LABEL_ROLE
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Default background colour (opaque white).
+WHITE = (1.0, 1.0, 1.0, 1.0)
+
+#------------------------------------------------------------------------------
+#  Render (element, components, role) tuples onto an image graphics context:
+#------------------------------------------------------------------------------
+
+def render(items, scale=1.0, max_size=None, margin=4.0, bgcolor=WHITE):
+    """ Paints the components of each (element, components, role) tuple
+        onto a new image graphics context, which is returned.
+
+    The image encloses all of the components plus a margin (in pixels).  If
+    max_size (in pixels) is given, the scale is reduced so that neither side
+    of the image exceeds it, simplifying the drawing as a zoomed out canvas
+    would.
+    """
+    display_list = DisplayList(items)
+    x, y = display_list.position
+    w, h = display_list.bounds
+
+    if max_size is not None:
+        available = max(max_size - 2 * margin, 1.0)
+        scale = min(scale, available / max(w, h, 1.0))
+
+    width = int(ceil(w * scale + 2 * margin))
+    height = int(ceil(h * scale + 2 * margin))
+
+    display_list.lod_level = LODPolicy().level(scale)
+
+    gc = GraphicsContext((width, height), pix_format="rgba32")
+    gc.clear(bgcolor)
+    gc.translate_ctm(margin, margin)
+    gc.scale_ctm(scale, scale)
+    gc.translate_ctm(-x, -y)
+    display_list.draw(gc)
+
+    return gc
+
+#------------------------------------------------------------------------------
+#  Returns the (element, components, role) tuples of a graph:
+#------------------------------------------------------------------------------
+
+def graph_items(graph, parse=True):
+    """ Returns the (element, components, role) tuples drawn for a graph,
+        laying it out first if none of its nodes have drawing operations.
+        If 'parse' is False, drawing operations are left unparsed for a
+        display list to read.
+    """
+    if graph.nodes and not [n for n in graph.nodes if n._draw_]:
+        graph.arrange_all()
+    return graph_drawing_items(graph, parse) + graph.xdot_components(parse)
+
+
+def graph_drawing_items(graph, parse=True):
+    """ Returns the (element, components, role) tuples of the drawing
+        operations of the graph and its clusters, such as cluster boxes and
+        graph labels, which are drawn beneath the nodes and edges.
+    """
+    from godot.xdot_parser import XdotAttrParser
+
+    xdot_parser = XdotAttrParser() if parse else None
+
+    items = []
+    graphs = [graph]
+    while graphs:
+        subgraph = graphs.pop(0)
+        for attr, role in [("_draw_", None), ("_ldraw_", LABEL_ROLE)]:
+            components = getattr(subgraph, attr)
+            if not components:
+                continue
+            if xdot_parser is not None:
+                components = xdot_parser.parse_xdot_data(components)
+            items.append((subgraph, components, role))
+        graphs.extend(subgraph.subgraphs + subgraph.clusters)
+    return items
+
+#------------------------------------------------------------------------------
+#  Render a graph to an array:
+#------------------------------------------------------------------------------
+
+def render_to_array(graph, scale=1.0, max_size=None, margin=4.0,
+        bgcolor=WHITE):
+    """ Returns an image of the graph as a (height, width, 4) array of RGBA
+        bytes.  The graph is laid out first if it has not been.
+    """
+    gc = render(graph_items(graph, False), scale, max_size, margin, bgcolor)
+    return gc.bmp_array.copy()
+
+#------------------------------------------------------------------------------
+#  Render a graph to a file:
+#------------------------------------------------------------------------------
+
+def render_to_file(graph, filename, format=None, scale=1.0, max_size=None,
+        margin=4.0, bgcolor=WHITE):
+    """ Writes an image of the graph to the given file name in the given
+        format (by default that implied by the file name, e.g. PNG).  The
+        graph is laid out first if it has not been.
+    """
+    gc = render(graph_items(graph, False), scale, max_size, margin, bgcolor)
+    gc.save(filename, file_format=format)
+
+# EOF -------------------------------------------------------------------------
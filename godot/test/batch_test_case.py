@@ -0,0 +1,139 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for arranging many standalone elements in one run.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from godot.graph import Graph
+from godot.node import Node
+from godot.edge import Edge
+from godot.batch import split_graphs, arrange_elements
+
+#------------------------------------------------------------------------------
+#  Constants:
+#------------------------------------------------------------------------------
+
+# Output of a layout program for a batch of one node and one edge.
+BATCH_OUTPUT = """digraph godot_batch_0 {
+	graph [bb="0,0,54,36"];
+	a [pos="27,18", width="0.75", height="0.5",
+		_draw_="c 7 -#000000 e 27 18 27 18 "];
+}
+strict digraph "godot_batch_1" {
+	graph [bb="0,0,54,108"];
+	b [pos="27,90", width="0.75", height="0.5"];
+	c [pos="27,18", width="0.75", height="0.5"];
+	b -> c [pos="e,27,36.1 27,71.7 27,63.9 27,54.7 27,46.1",
+		_draw_="c 7 -#000000 B 4 27 72 27 64 27 55 27 46 "];
+}
+"""
+
+#------------------------------------------------------------------------------
+#  "BatchTestCase" class:
+#------------------------------------------------------------------------------
+
+class BatchTestCase(unittest.TestCase):
+    """ Defines a test case for arranging elements with one run of a
+        layout program.
+    """
+
+    def setUp(self):
+        """ Stands in for running the layout program.
+        """
+        self.inputs = []
+        self._create = Graph.create
+
+        def create(graph, prog=None, format=None, dot_data=None, args=()):
+            self.inputs.append(dot_data)
+            return BATCH_OUTPUT
+
+        Graph.create = create
+
+
+    def tearDown(self):
+        """ Restores running the layout program.
+        """
+        Graph.create = self._create
+
+
+    def test_split_graphs(self):
+        """ Test splitting output at the headers of quoted, strict and
+            directed graphs, but not at subgraphs.
+        """
+        data = 'graph godot_batch_0 {\n\tsubgraph godot_batch_7 {a;}\n}\n' \
+            'strict digraph "godot_batch_1" {\n\tb;\n}\n' \
+            'digraph godot_batch_12 {\n\tc;\n}\n'
+        chunks = split_graphs(data)
+        self.assertEqual(sorted(chunks.keys()), [0, 1, 12])
+        self.assertTrue(chunks[0].startswith("graph godot_batch_0"))
+        self.assertTrue("subgraph godot_batch_7" in chunks[0])
+        self.assertTrue(chunks[1].startswith('strict digraph "godot_batch_1"'))
+        self.assertTrue("b;" in chunks[1])
+        self.assertFalse("c;" in chunks[1])
+        self.assertTrue("c;" in chunks[12])
+
+
+    def test_split_empty(self):
+        """ Test that output without batch graphs gives no chunks.
+        """
+        self.assertEqual(split_graphs(""), {})
+        self.assertEqual(split_graphs("digraph G {\n\ta;\n}\n"), {})
+
+
+    def test_arrange_elements(self):
+        """ Test that a node and an edge are laid out by one run and that
+            the results are set on each.
+        """
+        node = Node("a")
+        edge = Edge("b", "c")
+        arrange_elements([node, edge])
+
+        self.assertEqual(len(self.inputs), 1)
+        self.assertTrue("godot_batch_0" in self.inputs[0])
+        self.assertTrue("godot_batch_1" in self.inputs[0])
+
+        self.assertEqual(node.pos, (27.0, 18.0))
+        self.assertEqual(node.width, 0.75)
+        self.assertTrue(node._draw_.startswith("c 7 -#000000 e"))
+
+        self.assertEqual(len(edge.pos), 4)
+        self.assertEqual(edge.endp, (27.0, 36.1))
+        self.assertTrue(edge._draw_.startswith("c 7 -#000000 B"))
+
+
+    def test_arrange_nothing(self):
+        """ Test that the layout program is not run without elements.
+        """
+        arrange_elements([])
+        self.assertEqual(self.inputs, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
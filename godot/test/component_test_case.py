@@ -0,0 +1,385 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for the diagram components.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from numpy import array, allclose
+
+from enthought.enable.api import Component
+from enthought.kiva.backend_image import GraphicsContext
+
+from godot.component.bspline import \
+    BSpline, flatten_bezier, bezier_steps, polyline_distance
+
+from godot.component.shapes import \
+    shape_template, polygon_template, arrowhead, font_face
+
+from godot.component.pen import Pen
+from godot.component.text import Text
+from godot.component.font_cache import get_font, get_text_width
+from godot.component.lod import \
+    LODPolicy, FULL, NO_TEXT, REDUCED, MINIMAL, NODE_ROLE, EDGE_ROLE, \
+    LABEL_ROLE
+from godot.component.display_list import \
+    DisplayList, read_xdot, LINES, POLYGON, CURVE
+from godot.component.polygon import Polygon
+from godot.component.tile_cache import TileCache
+from godot.component.diagram_canvas import DiagramCanvas
+
+#------------------------------------------------------------------------------
+#  "BSplineTestCase" class:
+#------------------------------------------------------------------------------
+
+class BSplineTestCase(unittest.TestCase):
+    """ Defines a test case for B-spline flattening and hit-testing.
+    """
+
+    def setUp(self):
+        """ Creates a two segment curve.
+        """
+        self.points = array([(0.0, 0.0), (0.0, 100.0), (100.0, 100.0),
+            (100.0, 0.0), (100.0, -100.0), (200.0, -100.0), (200.0, 0.0)])
+
+
+    def test_flatten(self):
+        """ Test that flattening passes through the segment end points.
+        """
+        polyline = flatten_bezier(self.points, 4)
+        self.assertEqual(polyline.shape, (9, 2))
+        self.assertTrue(allclose(polyline[0], (0.0, 0.0)))
+        self.assertTrue(allclose(polyline[2], (50.0, 75.0)))
+        self.assertTrue(allclose(polyline[4], (100.0, 0.0)))
+        self.assertTrue(allclose(polyline[8], (200.0, 0.0)))
+
+
+    def test_steps(self):
+        """ Test that more steps are used at higher scales.
+        """
+        self.assertTrue(bezier_steps(self.points, 4.0) >
+                        bezier_steps(self.points, 1.0))
+
+
+    def test_distance(self):
+        """ Test the distance from a point to a polyline.
+        """
+        polyline = array([(0.0, 0.0), (10.0, 0.0), (10.0, 10.0)])
+        self.assertAlmostEqual(polyline_distance(polyline, 5.0, 2.0), 2.0)
+        self.assertAlmostEqual(polyline_distance(polyline, 13.0, 14.0), 5.0)
+
+
+    def test_is_in(self):
+        """ Test picking a point near the curve rather than its bounds.
+        """
+        bspline = BSpline(points=self.points)
+        self.assertTrue(bspline.is_in(50.0, 76.0))
+        self.assertFalse(bspline.is_in(50.0, 20.0))
+
+
+#------------------------------------------------------------------------------
+#  "ShapesTestCase" class:
+#------------------------------------------------------------------------------
+
+class ShapesTestCase(unittest.TestCase):
+    """ Defines a test case for the node shape templates.
+    """
+
+    def test_box(self):
+        """ Test that a box fills the unit square.
+        """
+        template = shape_template("box")
+        self.assertEqual(template.shape, (4, 2))
+        self.assertTrue(allclose(abs(template), 0.5))
+
+
+    def test_diamond(self):
+        """ Test that a diamond has a vertex at the middle of each side.
+        """
+        template = shape_template("diamond")
+        self.assertTrue(allclose(abs(template).sum(axis=1), 0.5))
+
+
+    def test_cached(self):
+        """ Test that templates are computed once per set of parameters.
+        """
+        self.assertTrue(polygon_template(6) is shape_template("hexagon"))
+        self.assertEqual(len(shape_template("polygon", sides=7)), 7)
+        self.assertTrue(shape_template("ellipse") is None)
+
+
+    def test_arrowhead(self):
+        """ Test that an arrowhead spans from the spline end to its tip.
+        """
+        points = arrowhead((0.0, 10.0), (0.0, 0.0))
+        self.assertTrue(allclose(points[1], (0.0, 0.0)))
+        self.assertTrue(allclose(points[[0, 2], 1], 10.0))
+        self.assertAlmostEqual(abs(points[0, 0] - points[2, 0]), 7.0)
+
+
+    def test_font_face(self):
+        """ Test taking the face name from strings and font objects.
+        """
+        class QtFont(object):
+            def family(self):
+                return "Courier"
+
+        self.assertEqual(font_face("Helvetica"), "Helvetica")
+        self.assertEqual(font_face(get_font("Arial 12")), "Arial")
+        self.assertEqual(font_face(QtFont()), "Courier")
+        self.assertEqual(font_face(None), "Times-Roman")
+        self.assertEqual(font_face(""), "Times-Roman")
+
+#------------------------------------------------------------------------------
+#  "TextTestCase" class:
+#------------------------------------------------------------------------------
+
+class TextTestCase(unittest.TestCase):
+    """ Defines a test case for text components.
+    """
+
+    def test_bounds(self):
+        """ Test that text is bounded by the width given by the layout
+            program, or by its measured width if none was given.
+        """
+        text = Text(pen=Pen(), text="blapp", text_x=50, text_y=50, text_w=30)
+        self.assertEqual(text.bounds[0], 30)
+        self.assertEqual(text.position[0], 35)
+
+        text = Text(pen=Pen(), text="blapp", text_x=50, text_y=50)
+        width = get_text_width(text.pen.font, "blapp")
+        self.assertTrue(width > 0)
+        self.assertAlmostEqual(text.bounds[0], max(width, 1))
+        self.assertAlmostEqual(text.position[0], 50 - width / 2)
+
+
+#------------------------------------------------------------------------------
+#  "DisplayListTestCase" class:
+#------------------------------------------------------------------------------
+
+class DisplayListTestCase(unittest.TestCase):
+    """ Defines a test case for display lists read from xdot operations.
+    """
+
+    def setUp(self):
+        """ Creates a display list of a node, an edge and a label.
+        """
+        self.display_list = DisplayList([
+            ("a", "c 7 -#000000 C 7 -#ff0000 P 3 0 0 10 0 5 10", NODE_ROLE),
+            ("b", "c 7 -#000000 B 4 20 0 25 5 30 5 35 0", EDGE_ROLE),
+            ("c", "F 14 11 -Times-Roman c 7 -#0000ff T 50 3 0 20 1 -c",
+             LABEL_ROLE)])
+
+
+    def test_read_xdot(self):
+        """ Test reading shapes, pens and text from xdot operations.
+        """
+        texts = []
+        primitives = read_xdot('"c 7 -#ff0000 S 15 -setlinewidth(2) '
+            'L 2 0 0 10 10 F 12 9 -Helvetica T 5 5 0 0 3 -a b"', texts, "e")
+        self.assertEqual(len(primitives), 1)
+        op, points, stroke, fill, width = primitives[0]
+        self.assertEqual(op, LINES)
+        self.assertEqual(points.tolist(), [[0.0, 0.0], [10.0, 10.0]])
+        self.assertEqual(stroke, (1.0, 0.0, 0.0, 1.0))
+        self.assertEqual(fill, None)
+        self.assertEqual(width, 2.0)
+        self.assertEqual(texts[0][0], "a b")
+        self.assertEqual(texts[0][4], "Helvetica 12")
+        self.assertEqual(texts[0][-1], "e")
+
+
+    def test_build(self):
+        """ Test that primitives are grouped by pen with their roles.
+        """
+        display_list = self.display_list
+        self.assertEqual(display_list.ops.tolist(), [POLYGON, CURVE])
+        self.assertEqual(len(display_list.styles), 2)
+        self.assertEqual(display_list.elements, ["a", "b"])
+        self.assertEqual(display_list._nodes.tolist(), [True, False])
+        self.assertEqual(len(display_list.texts), 1)
+
+
+    def test_bounds(self):
+        """ Test that the bounds enclose the shapes and the text height.
+        """
+        size = get_font("Times-Roman 14").size
+        x, y = self.display_list.position
+        w, h = self.display_list.bounds
+        self.assertEqual((x, y), (0.0, min(0.0, 3 - size / 2.0)))
+        self.assertEqual(x + w, 60.0)
+        self.assertEqual(y + h, max(10.0, 3 + size / 2.0))
+
+
+    def test_element_at(self):
+        """ Test hitting shapes inside, curves near their path and text
+            within its box.
+        """
+        display_list = self.display_list
+        self.assertEqual(display_list.element_at(5.0, 3.0), "a")
+        self.assertEqual(display_list.element_at(27.5, 3.75), "b")
+        # Inside the curve's bounding box, but away from the curve.
+        self.assertEqual(display_list.element_at(27.5, 0.0), None)
+        self.assertEqual(display_list.element_at(50.0, 3.0), "c")
+        self.assertEqual(display_list.element_at(100.0, 100.0), None)
+
+#------------------------------------------------------------------------------
+#  "TileCacheTestCase" class:
+#------------------------------------------------------------------------------
+
+class TileCacheTestCase(unittest.TestCase):
+    """ Defines a test case for the raster tile cache.
+    """
+
+    def setUp(self):
+        """ Creates a cache holding three tiles of the first zoom bucket.
+        """
+        self.cache = TileCache(tile_size=256)
+        for key in [(0, 0, 0), (0, 1, 0), (0, 5, 5)]:
+            self.cache._tiles.set(key, object())
+
+
+    def test_span(self):
+        """ Test that tiles span less of the diagram at higher zoom buckets.
+        """
+        self.assertEqual(self.cache._span(0), 128.0)
+        self.assertEqual(self.cache._span(1), 64.0)
+
+
+    def test_invalidate_rect(self):
+        """ Test that only the tiles intersecting a rectangle are discarded.
+        """
+        self.cache.invalidate_rect(10, 10, 20, 20)
+        self.assertEqual(sorted(self.cache._tiles.keys()),
+                         [(0, 1, 0), (0, 5, 5)])
+
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache._tiles), 0)
+
+
+    def test_max_tiles(self):
+        """ Test that the number of tiles held is bounded.
+        """
+        self.cache.max_tiles = 4
+        for i in range(10):
+            self.cache._tiles.set((1, i, i), object())
+        self.assertTrue(len(self.cache._tiles) <= 4)
+
+
+    def test_restyle(self):
+        """ Test that changing the pen of a component discards its tiles
+            and no others.
+        """
+        canvas = DiagramCanvas(tile_cache=self.cache)
+        polygon = Polygon(pen=Pen(),
+            points=[(10.0, 10.0), (20.0, 10.0), (20.0, 20.0)])
+        canvas.add(polygon)
+        self.cache._tiles.set((0, 0, 0), object())
+
+        polygon.pen.color = "red"
+        self.assertEqual(sorted(self.cache._tiles.keys()),
+                         [(0, 1, 0), (0, 5, 5)])
+
+        # Removed components no longer discard tiles.
+        canvas.remove(polygon)
+        self.cache._tiles.set((0, 0, 0), object())
+        polygon.pen.color = "blue"
+        self.assertEqual(len(self.cache._tiles), 3)
+
+#------------------------------------------------------------------------------
+#  "LODTestCase" class:
+#------------------------------------------------------------------------------
+
+class _Recorder(Component):
+    """ Component that records being drawn.
+    """
+
+    def draw(self, gc, view_bounds=None, mode="default"):
+        self.log.append(self)
+
+
+class LODTestCase(unittest.TestCase):
+    """ Defines a test case for level-of-detail drawing and culling.
+    """
+
+    def setUp(self):
+        """ Creates a canvas with a recording component between two nodes.
+        """
+        self.log = []
+        self.canvas = canvas = DiagramCanvas()
+        canvas._draw_simplified = \
+            lambda gc, level, boxes, chords: self.log.append(len(boxes))
+
+        self.nodes = [Polygon(pen=Pen(), points=[(x, 0.0), (x + 10.0, 0.0),
+            (x + 10.0, 10.0)]) for x in (0.0, 20.0)]
+        self.recorder = _Recorder(position=[10.0, 0.0], bounds=[10.0, 10.0])
+        self.recorder.log = self.log
+
+        canvas.add_element("a", self.nodes[:1], NODE_ROLE)
+        canvas.add_element("b", [self.recorder], NODE_ROLE)
+        canvas.add_element("c", self.nodes[1:], NODE_ROLE)
+
+
+    def test_level(self):
+        """ Test the levels of detail chosen for decreasing scales.
+        """
+        lod = LODPolicy()
+        self.assertEqual(lod.level(1.0), FULL)
+        self.assertEqual(lod.level(0.4), NO_TEXT)
+        self.assertEqual(lod.level(0.2), REDUCED)
+        self.assertEqual(lod.level(0.05), MINIMAL)
+
+        lod.enabled = False
+        self.assertEqual(lod.level(0.05), FULL)
+
+
+    def test_culling(self):
+        """ Test that only components within the view bounds are drawn.
+        """
+        gc = GraphicsContext((10, 10))
+        self.canvas._draw_components(gc, (10.0, 0.0, 5.0, 5.0))
+        self.assertEqual(self.log, [self.recorder])
+
+        del self.log[:]
+        self.canvas._draw_components(gc, (100.0, 100.0, 5.0, 5.0))
+        self.assertEqual(self.log, [])
+
+
+    def test_stacking_order(self):
+        """ Test that simplified nodes are drawn in stacking order with
+            the components drawn in full.
+        """
+        gc = GraphicsContext((10, 10))
+        gc.scale_ctm(0.2, 0.2)
+        self.canvas._draw_components(gc)
+        self.assertEqual(self.log, [1, self.recorder, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,104 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for exporting graphs to SVG.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from StringIO import StringIO
+
+from godot.graph import Graph
+from godot.cluster import Cluster
+from godot.component.api import Pen, Polygon, Text
+from godot.export import SVGWriter, export_svg, svg_color
+
+#------------------------------------------------------------------------------
+#  "SVGWriterTestCase" class:
+#------------------------------------------------------------------------------
+
+class SVGWriterTestCase(unittest.TestCase):
+    """ Defines a test case for writing components as SVG.
+    """
+
+    def test_svg_color(self):
+        """ Test converting colours with and without opacity.
+        """
+        self.assertEqual(svg_color((1.0, 0.0, 0.0)), ("#ff0000", 1.0))
+        color, opacity = svg_color((0, 0, 255, 51))
+        self.assertEqual(color, "#0000ff")
+        self.assertAlmostEqual(opacity, 0.2)
+
+
+    def test_style(self):
+        """ Test that fractional pen widths and fill colours are kept.
+        """
+        pen = Pen(color="red", fill_color="blue", line_width=0.5)
+        style = SVGWriter()._style(pen, filled=True)
+        self.assertTrue('stroke="#ff0000"' in style)
+        self.assertTrue('stroke-width="0.5"' in style)
+        self.assertTrue('fill="#0000ff"' in style)
+        self.assertTrue('fill="none"' in SVGWriter()._style(pen))
+
+
+    def test_write(self):
+        """ Test the extent, flipped coordinates and escaped text.
+        """
+        polygon = Polygon(pen=Pen(), points=[(0, 0), (100, 0), (50, 50)])
+        text = Text(pen=Pen(color="blue"), text="a<b", text_x=50, text_y=20,
+                    text_w=30)
+        flo = StringIO()
+        SVGWriter(margin=4.0).write([polygon, text], flo)
+        svg = flo.getvalue()
+
+        self.assertTrue('width="108.00" height="58.00"' in svg)
+        self.assertTrue('points="4.00,54.00 104.00,54.00 54.00,4.00"' in svg)
+        self.assertTrue('fill="#0000ff"' in svg)
+        self.assertTrue(">a&lt;b</text>" in svg)
+
+
+    def test_export_clusters(self):
+        """ Test that the drawing operations of clusters are exported
+            beneath those of the nodes.
+        """
+        graph = Graph(ID="G", headless=True)
+        node = graph.add_node("a")
+        node._draw_ = "c 7 -#000000 e 27 18 27 18"
+        cluster = Cluster(ID="cluster_x")
+        cluster._draw_ = "c 7 -#ff0000 p 4 0 0 60 0 60 40 0 40"
+        graph.clusters.append(cluster)
+
+        flo = StringIO()
+        export_svg(graph, flo)
+        svg = flo.getvalue()
+        self.assertTrue('<polygon' in svg)
+        self.assertTrue(svg.index("<polygon") < svg.index("<ellipse"))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
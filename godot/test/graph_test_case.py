@@ -47,6 +47,38 @@ class NodeTestCase(unittest.TestCase):
         self.failUnless(node.name == "test_node")
         self.assertEqual(node.shape, "circle")
 
+
+    def test_lazy_component(self):
+        """ Test that a node's component is created only when used, centred
+            on a position set before it was.
+        """
+        node = Node(ID="a")
+        node.pos = (100.0, 50.0)
+        self.assertFalse("component" in node.__dict__)
+
+        x, y = node.component.position
+        w, h = node.component.bounds
+        self.assertEqual((x + w / 2, y + h / 2), (100.0, 50.0))
+
+        # Moving the node moves its component without being taken for a drag.
+        moves = []
+        node.on_trait_change(lambda new: moves.append(new), "moved")
+        node.pos = (120.0, 50.0)
+        self.assertEqual(node.component.position[0] + w / 2, 120.0)
+        self.assertEqual(moves, [])
+
+
+    def test_headless(self):
+        """ Test that nodes of a headless graph never create components.
+        """
+        graph = Graph(ID="G", headless=True)
+        graph.add_edge("a", "b")
+        node = graph.get_node("a")
+        node.pos = (10.0, 20.0)
+        graph.redraw_canvas()
+        self.assertFalse("component" in node.__dict__)
+        self.assertFalse("vp" in node.__dict__)
+
 #------------------------------------------------------------------------------
 #  "EdgeTestCase" class:
 #------------------------------------------------------------------------------
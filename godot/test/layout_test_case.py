@@ -0,0 +1,469 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for the layout of graph components.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from numpy import \
+    sqrt, median, inf, fill_diagonal, maximum, array, ones, hstack
+from numpy.random import RandomState
+
+from godot.graph import Graph
+from godot.cluster import Cluster
+from godot.layout.api import \
+    connected_components, pack_boxes, translate_xdot, structure_key, \
+    batch_components, component_dot, layered_layout, bezier_points, \
+    spline_midpoint, set_edge_spline, \
+    force_layout, repulsive_forces, csr_adjacency, bfs_distances, \
+    stress_layout, spectral_layout, multilevel_layout, coarsen, \
+    route_polyline, relayout_node, remove_overlaps, overlapping_pairs, \
+    select_program, tuned_parameters, choose_program
+
+#------------------------------------------------------------------------------
+#  "LayoutTestCase" class:
+#------------------------------------------------------------------------------
+
+class LayoutTestCase(unittest.TestCase):
+    """ Defines a test case for the layout of graph components.
+    """
+
+    def test_connected_components(self):
+        """ Test splitting a graph into weakly connected components.
+        """
+        graph = Graph(ID="G", directed=True)
+        graph.add_edge("a", "b")
+        graph.add_edge("c", "b")
+        graph.add_edge("d", "e")
+        graph.add_node("f")
+
+        components = connected_components(graph)
+        self.assertEqual(len(components), 3)
+        nodes, edges = components[0]
+        self.assertEqual([n.ID for n in nodes], ["a", "b", "c"])
+        self.assertEqual(len(edges), 2)
+        self.assertEqual([n.ID for n in components[2][0]], ["f"])
+
+
+    def test_batch_components(self):
+        """ Test dividing components into batches of similar size and
+            writing each as a separately named graph.
+        """
+        graph = Graph(ID="G", directed=True, bb=(0.0, 0.0, 10.0, 10.0))
+        graph.add_edge("a", "b")
+        graph.add_edge("b", "c")
+        for i in range(6):
+            graph.add_node("n%d" % i)
+
+        components = connected_components(graph)
+        batches = batch_components(components, 3)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(sorted(sum(batches, [])), range(len(components)))
+        # The largest component is given a batch of its own.
+        self.assertEqual(batches[0], [0])
+        self.assertEqual([len(batch) for batch in batches], [1, 3, 3])
+
+        nodes, edges = components[0]
+        dot = component_dot(graph, nodes, edges, "godot_batch_0")
+        self.assertTrue(dot.startswith("digraph godot_batch_0 {"))
+        self.assertTrue("bb=" not in dot)
+        self.assertTrue("n0" not in dot)
+        self.assertEqual(dot.count("->"), 2)
+
+
+    def test_pack_boxes(self):
+        """ Test packing boxes in rows without overlap.
+        """
+        sizes = [(100.0, 50.0), (20.0, 20.0), (30.0, 40.0), (10.0, 10.0)]
+        corners, (width, height) = pack_boxes(sizes, margin=8.0)
+        self.assertEqual(corners[0], (0.0, 48.0))
+        self.assertEqual(corners[2], (0.0, 0.0))
+        self.assertEqual((width, height), (100.0, 98.0))
+
+
+    def test_translate_xdot(self):
+        """ Test moving xdot operations, leaving text operands alone.
+        """
+        data = "c 7 -#000000 P 2 1 2 3 4 T 27 18 0 7.5 3 -1 2 E 5 5 27 18"
+        self.assertEqual(translate_xdot(data, 10, -1.5), "c 7 -#000000 "
+            "P 2 11 0.5 13 2.5 T 37 16.5 0 7.5 3 -1 2 E 15 3.5 27 18")
+
+
+    def test_structure_key(self):
+        """ Test that a cluster's key ignores layout output only.
+        """
+        graph = Graph(ID="G")
+        cluster = Cluster(ID="cluster_a")
+        cluster.add_edge("a", "b")
+        graph.add_cluster(cluster)
+
+        key = structure_key(graph, cluster)
+        cluster.nodes[0].pos = (10.0, 20.0)
+        self.assertEqual(structure_key(graph, cluster), key)
+
+        cluster.add_node("c")
+        self.assertNotEqual(structure_key(graph, cluster), key)
+
+
+    def test_layered_layout(self):
+        """ Test that edges point down and layers are separated.
+        """
+        edges = [(0, 1), (0, 2), (1, 3), (2, 3), (3, 0), (0, 3)]
+        positions, polylines = layered_layout(edges, [(54.0, 36.0)] * 4,
+            nodesep=18.0, ranksep=36.0)
+
+        y = positions[:, 1]
+        self.assertTrue(y[0] > y[1] == y[2] > y[3])
+        self.assertTrue(abs(positions[1, 0] - positions[2, 0]) >= 72.0)
+        # The reversed edge is routed back up through a dummy vertex.
+        self.assertEqual(len(polylines[4]), 3)
+        self.assertEqual(tuple(polylines[4][0]), tuple(positions[3]))
+
+
+    def test_in_process_keeps_draw_source(self):
+        """ Test that an in-process layout leaves the graph's drawing source
+            alone and blanks the stale drawing operations instead.
+        """
+        graph = Graph(ID="G", headless=True, program="layered")
+        graph.add_edge("a", "b", _draw_="c 5 -black B 4 0 0 1 1 2 2 3 3 ")
+        graph.get_node("a")._draw_ = "e 0 0 27 18 "
+        graph.arrange_all()
+
+        self.assertEqual(graph.draw_source, "xdot")
+        self.assertEqual(graph.get_node("a")._draw_, "")
+        self.assertEqual(graph.edges[0]._draw_, "")
+        self.assertNotEqual(graph.get_node("a").pos, (0.0, 0.0))
+
+
+    def test_bezier_points(self):
+        """ Test a spline through points has a Bezier segment each.
+        """
+        points = bezier_points([(0.0, 0.0), (10.0, 0.0), (20.0, 10.0)])
+        self.assertEqual(len(points), 7)
+        self.assertEqual(tuple(points[3]), (10.0, 0.0))
+        self.assertEqual(tuple(points[-1]), (20.0, 10.0))
+
+
+    def test_spline_midpoint(self):
+        """ Test that the midpoint of a spline lies on the curve.
+        """
+        arch = [(0.0, 0.0), (0.0, 10.0), (10.0, 10.0), (10.0, 0.0)]
+        self.assertEqual(spline_midpoint(arch), (5.0, 7.5))
+        line = [(0.0, float(y)) for y in range(7)]
+        self.assertEqual(spline_midpoint(line), (0.0, 3.0))
+
+
+    def test_set_edge_spline(self):
+        """ Test that setting a spline places the label on the curve and
+            discards the drawing operations.
+        """
+        graph = Graph(ID="G", directed=True)
+        graph.add_edge("a", "b", label="x")
+        edge = graph.edges[0]
+        edge._draw_ = "c 7 -#000000 B 4 0 0 0 10 10 10 10 0"
+        edge.startp = (0.0, 0.0)
+
+        set_edge_spline(edge, [(0, 0), (0, 10), (10, 10), (10, 0)],
+                        (10.0, -10.0))
+        self.assertEqual(edge.pos[1], (0.0, 10.0))
+        self.assertEqual(edge.endp, (10.0, -10.0))
+        self.assertEqual(edge.startp, None)
+        self.assertEqual(edge.lp, (5.0, 7.5))
+        self.assertEqual(edge._draw_, "")
+
+
+    def test_repulsive_forces(self):
+        """ Test the Barnes-Hut forces against the exact sums.
+        """
+        positions = RandomState(0).uniform(0.0, 1000.0, (500, 2))
+        forces = repulsive_forces(positions, 1.0)
+
+        d = positions[:, None, :] - positions[None, :, :]
+        dist2 = maximum((d * d).sum(axis=2), 1e-2)
+        fill_diagonal(dist2, inf)
+        exact = (d / dist2[:, :, None]).sum(axis=1)
+
+        error = sqrt(((forces - exact) ** 2).sum(axis=1) /
+                     (exact ** 2).sum(axis=1))
+        self.assertTrue(median(error) < 0.01)
+
+
+    def test_force_layout(self):
+        """ Test that joined nodes come to rest about k apart.
+        """
+        positions = force_layout([(0, 1)], 2, k=50.0, maxiter=500)
+        d = positions[0] - positions[1]
+        self.assertAlmostEqual(sqrt((d * d).sum()), 50.0, 0)
+
+
+    def test_bfs_distances(self):
+        """ Test breadth first search over compressed sparse rows.
+        """
+        indptr, indices = csr_adjacency(5, [(0, 1), (1, 2), (2, 0), (2, 3)])
+        self.assertEqual(list(bfs_distances(indptr, indices, 0)),
+                         [0, 1, 1, 2, -1])
+
+
+    def test_stress_layout(self):
+        """ Test that a path is laid out straight with edges of the ideal
+            length.
+        """
+        positions = stress_layout([(0, 1), (1, 2), (2, 3)], 4, length=72.0)
+        d = positions[0] - positions[3]
+        self.assertAlmostEqual(sqrt((d * d).sum()), 216.0, 0)
+
+
+    def test_stress_cold_start(self):
+        """ Test that the pivot multidimensional scaling start of a grid has
+            edges of the ideal mean length, and stays near it.
+        """
+        n = 10
+        edges = array([(i * n + j, i * n + j + 1)
+                       for i in range(n) for j in range(n - 1)] +
+                      [(i * n + j, (i + 1) * n + j)
+                       for i in range(n - 1) for j in range(n)])
+
+        def mean_length(positions):
+            d = positions[edges[:, 0]] - positions[edges[:, 1]]
+            return sqrt((d * d).sum(axis=1)).mean()
+
+        start = stress_layout(edges, n * n, length=72.0, maxiter=0)
+        self.assertAlmostEqual(mean_length(start), 72.0, 0)
+
+        positions = stress_layout(edges, n * n, length=72.0, maxiter=20)
+        self.assertTrue(0.8 * 72.0 < mean_length(positions) < 1.25 * 72.0)
+
+        positions = stress_layout(edges, n * n, length=72.0, maxiter=0,
+                                  mds=False)
+        self.assertEqual(positions.shape, (n * n, 2))
+
+
+    def test_spectral_layout(self):
+        """ Test that a grid is opened out with edges of the given mean
+            length.
+        """
+        n = 8
+        edges = [(i * n + j, i * n + j + 1)
+                 for i in range(n) for j in range(n - 1)] + \
+                [(i * n + j, (i + 1) * n + j)
+                 for i in range(n - 1) for j in range(n)]
+        positions = spectral_layout(edges, n * n, length=72.0)
+
+        def distance(i, j):
+            d = positions[i] - positions[j]
+            return sqrt((d * d).sum())
+
+        self.assertAlmostEqual(sum([distance(i, j) for i, j in edges]) /
+                               len(edges), 72.0)
+        # Both pairs of opposite corners are far apart.
+        self.assertTrue(distance(0, n * n - 1) > 5 * 72.0)
+        self.assertTrue(distance(n - 1, n * n - n) > 5 * 72.0)
+
+
+    def test_coarsen(self):
+        """ Test that coarsening a grid collapses pairs of adjacent nodes,
+            keeping the total mass.
+        """
+        n = 8
+        edges = array([(i * n + j, i * n + j + 1)
+                       for i in range(n) for j in range(n - 1)] +
+                      [(i * n + j, (i + 1) * n + j)
+                       for i in range(n - 1) for j in range(n)])
+        parent, m, coarse_edges, mass = coarsen(n * n, edges, ones(n * n),
+                                                RandomState(0))
+        self.assertTrue(n * n / 2 <= m < 0.9 * n * n)
+        self.assertEqual(mass.sum(), n * n)
+        self.assertTrue(mass.max() <= 2)
+        self.assertTrue((coarse_edges[:, 0] < coarse_edges[:, 1]).all())
+
+
+    def test_multilevel_layout(self):
+        """ Test that a grid too large to lay out directly is opened out by
+            both refiners.
+        """
+        n = 12
+        edges = [(i * n + j, i * n + j + 1)
+                 for i in range(n) for j in range(n - 1)] + \
+                [(i * n + j, (i + 1) * n + j)
+                 for i in range(n - 1) for j in range(n)]
+        for refiner in ("force", "stress"):
+            positions = multilevel_layout(edges, n * n, length=72.0,
+                                          refiner=refiner)
+            d = positions[0] - positions[n * n - 1]
+            self.assertTrue(sqrt((d * d).sum()) > 8 * 72.0)
+
+
+    def test_route_polyline(self):
+        """ Test that a path bends around a box in its way, on the side
+            nearer the path, and is straight otherwise.
+        """
+        self.assertEqual(len(route_polyline((0, 0), (100, 0), [])), 2)
+        points = route_polyline((0, 0), (100, 0), [(40, -10, 60, 5)],
+                                margin=4.0)
+        self.assertEqual(points[1], (50.0, 9.0))
+
+
+    def test_relayout_node(self):
+        """ Test that a node moved onto another pushes it aside and that
+            the edges of both are re-routed.
+        """
+        graph = Graph(ID="G", headless=True)
+        graph.add_edge("a", "b")
+        graph.add_edge("c", "d", pos=[(0, 0), (1, 1), (2, 2), (3, 3)])
+        for ID, pos in [("a", (0, 0)), ("b", (200, 0)), ("c", (400, 0)),
+                        ("d", (400, 200))]:
+            graph.get_node(ID).set(pos=pos, width=1.0, height=0.5)
+
+        graph.get_node("a").pos = (395, 0)
+        relayout_node(graph, graph.get_node("a"), 0.0, 0.0)
+        self.assertEqual(graph.edges[0].pos, [])
+
+        relayout_node(graph, graph.get_node("a"), 395.0, 0.0)
+
+        c = graph.get_node("c")
+        self.assertEqual(c.pos, (400, 36 + graph.sep * 2))
+        edge_ab, edge_cd = graph.edges
+        self.assertAlmostEqual(edge_ab.pos[-1][0], 236.0)
+        self.assertAlmostEqual(edge_cd.pos[0][1], c.pos[1] + 18.0)
+
+
+    def test_remove_overlaps(self):
+        """ Test that overlapping boxes are separated by the margin and that
+            boxes already apart are not moved.
+        """
+        rs = RandomState(0)
+        positions = rs.uniform(0, 400, (50, 2))
+        positions[-1] = (1000, 1000)
+        sizes = rs.uniform(20, 60, (50, 2))
+        result = remove_overlaps(positions, sizes, sep=4.0)
+
+        i, j = overlapping_pairs(hstack([result - sizes / 2.0 - 4.0,
+                                         result + sizes / 2.0 + 4.0]))
+        overlap = (sizes[i] + sizes[j]) / 2.0 + 8.0 - \
+            abs(result[j] - result[i])
+        self.assertTrue((overlap.min(axis=1) < 1e-6).all())
+        self.assertEqual(tuple(result[-1]), (1000, 1000))
+
+
+    def test_remove_node_overlaps(self):
+        """ Test that the nodes of a graph are moved apart by 'sep' points.
+        """
+        graph = Graph(ID="G", headless=True, sep=10)
+        graph.add_edge("a", "b")
+        graph.get_node("a").set(pos=(0, 0), width=1.0, height=0.5)
+        graph.get_node("b").set(pos=(30, 0), width=1.0, height=0.5)
+
+        graph.remove_overlaps()
+        (x1, y1), (x2, y2) = graph.get_node("a").pos, graph.get_node("b").pos
+        # The nodes overlap less in y, so they are separated in y.
+        self.assertEqual((x1, x2), (0, 30))
+        self.assertAlmostEqual(y2 - y1, 36.0 + 20.0)
+        self.assertEqual(len(graph.edges[0].pos), 4)
+
+
+    def test_fixed_nodes(self):
+        """ Test that pinned nodes keep their positions in the force-directed
+            and stress layouts.
+        """
+        positions = array([(0.0, 0.0), (500.0, 0.0), (0.0, 0.0)])
+        fixed = array([True, True, False])
+        for layout in (force_layout, stress_layout):
+            result = layout([(0, 2), (1, 2)], 3, 72.0, positions,
+                            fixed=fixed)
+            self.assertEqual(result[:2].tolist(), positions[:2].tolist())
+
+
+    def test_arrange_stable(self):
+        """ Test that a stable arrangement keeps untouched nodes where they
+            are and restores the iteration limit.
+        """
+        graph = Graph(ID="G", headless=True, program="stress", stable=True,
+                      pin_untouched=True)
+        graph.add_edge("a", "b")
+        graph.add_edge("b", "c")
+        graph.arrange_all()
+        graph.add_edge("c", "d")
+        self.assertEqual(graph._touched, set(["c", "d"]))
+
+        a, b = graph.get_node("a"), graph.get_node("b")
+        graph.get_node("b").pos = (b.pos[0] + 100.0, b.pos[1])
+        before = array(b.pos) - array(a.pos)
+        x, y = a.pos
+        maxiter = graph.maxiter
+        graph.arrange_all()
+
+        after = array(b.pos) - array(a.pos)
+        self.assertTrue(abs(after - before).max() < 1e-6)
+        self.assertAlmostEqual(a.pos[0], x)
+        self.assertAlmostEqual(a.pos[1], y)
+        self.assertEqual(graph.maxiter, maxiter)
+        self.assertFalse(a.pin)
+        self.assertEqual(graph._touched, set())
+
+
+    def test_select_program(self):
+        """ Test that faster programs are chosen for larger graphs and that
+            in-process engines stand in for missing Graphviz programs.
+        """
+        graphviz = ["dot", "neato", "fdp", "sfdp"]
+        self.assertEqual(select_program(100, 200, directed=True,
+                                        available=graphviz), "dot")
+        self.assertEqual(select_program(100, 200, clustered=True,
+                                        available=graphviz), "fdp")
+        self.assertEqual(select_program(5000, 20000, directed=True,
+                                        available=graphviz), "sfdp")
+        self.assertEqual(select_program(5000, 20000, available=[]),
+                         "multilevel")
+        self.assertEqual(select_program(10 ** 6, 10 ** 6,
+                                        available=graphviz), "sfdp")
+        self.assertEqual(select_program(10 ** 6, 10 ** 6, available=[]),
+                         "spectral")
+
+        self.assertEqual(tuned_parameters(100), (200, 1e-4))
+        maxiter, epsilon = tuned_parameters(100000)
+        self.assertTrue(maxiter < 200)
+
+
+    def test_choose_program_cluster(self):
+        """ Test choosing a program for a cluster, which does not list its
+            subgraphs as a top level graph does.
+        """
+        cluster = Cluster(ID="cluster_1")
+        cluster.add_edge("a", "b")
+        inner = Cluster(ID="cluster_2")
+        inner.add_edge("c", "d")
+        cluster.clusters.append(inner)
+
+        program, maxiter, epsilon = choose_program(cluster, in_process=True)
+        self.assertTrue(program in ["fdp", "stress"])
+        self.assertEqual((maxiter, epsilon), tuned_parameters(4))
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
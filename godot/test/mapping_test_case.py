@@ -27,6 +27,8 @@ from enthought.traits.api import HasTraits, ListInstance, Str, Instance, List
 from enthought.traits.ui.api import View, Item, Group, ModelView
 from enthought.enable.tools.api import MoveTool
 
+import godot.mapping
+
 from godot.mapping import Mapping, CanvasMapping, NodeMapping
 from godot.tool.api import ElementTool
 from godot.ui.api import GraphEditor, GraphNode
@@ -153,4 +155,79 @@ class MappingTestCase(TestCase):
                 # Check that the node style attributes have been set
                 self.assertEqual(dot_node.get_shape(), NODE_SHAPE)
 
+#------------------------------------------------------------------------------
+#  "MapElementTestCase" class:
+#------------------------------------------------------------------------------
+
+class MapElementTestCase(TestCase):
+    """ Tests for mapping elements added to a domain model """
+
+    #--------------------------------------------------------------------------
+    #  "TestCase" interface
+    #--------------------------------------------------------------------------
+
+    def setUp(self):
+        """ Stands in for running the layout program and listens to a
+            domain model.
+        """
+        self.arranged = []
+        self._arrange_elements = godot.mapping.arrange_elements
+
+        def arrange_elements(elements, prog="dot", format="xdot"):
+            self.arranged.append(list(elements))
+            for node in elements:
+                node._draw_ = "c 7 -#000000 e 27 18 27 18"
+
+        godot.mapping.arrange_elements = arrange_elements
+
+        self.mapping = Mapping(
+            nodes=[
+                NodeMapping(
+                    containment_trait="nodes", element=DomainNode,
+                    tools=[MoveTool]
+                )
+            ]
+        )
+        self.model = DomainModel()
+        self.model.on_trait_change(self.mapping.map_element, "nodes_items")
+
+
+    def tearDown(self):
+        """ Restores running the layout program. """
+
+        godot.mapping.arrange_elements = self._arrange_elements
+
+    #--------------------------------------------------------------------------
+    #  Tests
+    #--------------------------------------------------------------------------
+
+    def test_map_added(self):
+        """ Mapping elements added together with one layout run """
+
+        nodes = [DomainNode(name="node1"), DomainNode(name="node2")]
+        self.model.nodes.extend(nodes)
+
+        # One run lays out a Graphviz node for each element
+        self.assertEqual(len(self.arranged), 1)
+        self.assertEqual([n.ID for n in self.arranged[0]],
+                         [str(id(n)) for n in nodes])
+
+        # A diagram node with the mapped tools is added for each element
+        components = self.mapping.diagram.diagram_canvas.components
+        self.assertEqual([c.element for c in components], nodes)
+        for component in components:
+            self.assertTrue(len(component.components) > 0)
+            self.assertTrue(isinstance(component.tools[0], MoveTool))
+
+
+    def test_unmap_removed(self):
+        """ Removing the diagram nodes of removed elements """
+
+        nodes = [DomainNode(name="node1"), DomainNode(name="node2")]
+        self.model.nodes.extend(nodes)
+        self.model.nodes.remove(nodes[0])
+
+        components = self.mapping.diagram.diagram_canvas.components
+        self.assertEqual([c.element for c in components], nodes[1:])
+
 # EOF -------------------------------------------------------------------------
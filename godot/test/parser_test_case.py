@@ -57,6 +57,27 @@ class ParserTestCase(unittest.TestCase):
 #        print graph.clusters[0]
 
 
+    def test_edge_end_points(self):
+        """ Test parsing the start and end points of xdot edge splines.
+        """
+        parser = GodotDataParser()
+        graph = parser.parse_dot_data('digraph G {\n'
+            '\ta -> b [pos="s,27,89.9 e,27,36.1 27,71.7 27,63.9 27,54.7 '
+            '27,46.1"];\n'
+            '\tb -> c [pos="27,71.7 27,63.9 27,54.7 27,46.1"];\n}\n')
+
+        edge = graph.edges[0]
+        self.assertEqual(edge.startp, (27.0, 89.9))
+        self.assertEqual(edge.endp, (27.0, 36.1))
+        self.assertEqual(edge.pos, [(27.0, 71.7), (27.0, 63.9),
+                                    (27.0, 54.7), (27.0, 46.1)])
+
+        edge = graph.edges[1]
+        self.assertEqual(edge.startp, None)
+        self.assertEqual(edge.endp, None)
+        self.assertEqual(len(edge.pos), 4)
+
+
 #    def test_parse_colors(self):
 #        """ Test parsing of a graph with colors.
 #        """
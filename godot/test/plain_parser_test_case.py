@@ -0,0 +1,119 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for the plain and json0 layout readers.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from godot.graph import Graph
+from godot.plain_parser import parse_plain, parse_json0, parse_spline
+
+PLAIN = """graph 1 2.5 3.5
+node a 1.25 3 0.75 0.5 a solid ellipse black lightgrey
+node "b c" 1.25 0.5 0.75 0.5 "b c" solid ellipse black lightgrey
+edge a "b c" 4 1.25 2.75 1.25 2.5 1.25 1 1.25 0.75 solid black
+stop
+"""
+
+JSON0 = """{"name": "G", "bb": "0,0,54,108",
+ "objects": [
+  {"_gvid": 0, "name": "a", "pos": "27,90", "width": "0.75", "height": "0.5"},
+  {"_gvid": 1, "name": "b", "pos": "27,18", "width": "0.75", "height": "0.5"}
+ ],
+ "edges": [
+  {"_gvid": 0, "tail": 0, "head": 1,
+   "pos": "e,27,36.1 27,71.7 27,63.9 27,54.7 27,46.1"}
+ ]
+}"""
+
+#------------------------------------------------------------------------------
+#  "PlainParserTestCase" class:
+#------------------------------------------------------------------------------
+
+class PlainParserTestCase(unittest.TestCase):
+    """ Defines a test case for the plain and json0 layout readers.
+    """
+
+    def test_parse_plain(self):
+        """ Test reading plain output, converting inches to points.
+        """
+        bb, nodes, edges = parse_plain(PLAIN)
+        self.assertEqual(bb, (0.0, 0.0, 180.0, 252.0))
+        self.assertEqual(nodes["a"], (90.0, 216.0, 0.75, 0.5))
+        self.assertEqual(nodes["b c"], (90.0, 36.0, 0.75, 0.5))
+        self.assertEqual(len(edges), 1)
+        tail, head, points = edges[0]
+        self.assertEqual((tail, head), ("a", "b c"))
+        self.assertEqual(points[0], (90.0, 198.0))
+        self.assertEqual(len(points), 4)
+
+
+    def test_parse_json0(self):
+        """ Test reading json0 output.
+        """
+        bb, nodes, edges = parse_json0(JSON0)
+        self.assertEqual(bb, (0.0, 0.0, 54.0, 108.0))
+        self.assertEqual(nodes["b"], (27.0, 18.0, 0.75, 0.5))
+        tail, head, points = edges[0]
+        self.assertEqual((tail, head), ("a", "b"))
+        self.assertEqual(points[-1], (27.0, 46.1))
+
+
+    def test_parse_spline(self):
+        """ Test separating the end points of a spline.
+        """
+        points, startp, endp = parse_spline("e,39,61 s,39,110 39,97 39,89 "
+            "39,80 39,71")
+        self.assertEqual(len(points), 4)
+        self.assertEqual(startp, (39.0, 110.0))
+        self.assertEqual(endp, (39.0, 61.0))
+
+
+
+    def test_arrange_positions(self):
+        """ Test that arranging from plain output replaces the drawing
+            operations of an earlier arrangement.
+        """
+        graph = Graph(ID="G", headless=True)
+        graph.add_edge("a", "b c")
+        a = graph.get_node("a")
+        a._draw_ = "c 7 -#000000 e 27 90 27 18"
+        graph.edges[0]._hdraw_ = "C 7 -#000000 P 3 30 39 27 29 24 39"
+        # Stand in for running the layout program.
+        graph.create = lambda format=None: PLAIN
+
+        graph.arrange_positions()
+        self.assertEqual(a.pos, (90.0, 216.0))
+        self.assertEqual(a._draw_, "")
+        self.assertEqual(graph.edges[0]._hdraw_, "")
+        self.assertEqual(len(graph.edges[0].pos), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,100 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for rendering graphs without a display.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from godot.graph import Graph
+from godot.render import render_to_array, render_to_file
+
+#------------------------------------------------------------------------------
+#  "RenderTestCase" class:
+#------------------------------------------------------------------------------
+
+class RenderTestCase(unittest.TestCase):
+    """ Defines a test case for the headless renderer.
+    """
+
+    def setUp(self):
+        """ Creates a graph with one filled node that has already been laid
+            out, so that Graphviz is not required.
+        """
+        self.graph = graph = Graph(ID="G", headless=True)
+        node = graph.add_node("a")
+        node._draw_ = "c 7 -#000000 C 7 -#000000 E 27 18 27 18"
+        self.tmpdir = tempfile.mkdtemp()
+
+
+    def tearDown(self):
+        """ Removes the written images.
+        """
+        shutil.rmtree(self.tmpdir)
+
+
+    def test_render_to_array(self):
+        """ Test that the image encloses the node plus the margin and that
+            the node is painted on the background.
+        """
+        image = render_to_array(self.graph, margin=4.0)
+        self.assertEqual(image.shape, (44, 62, 4))
+        # Background in the corner and the node at the centre.
+        self.assertEqual(image[0, 0, :3].tolist(), [255, 255, 255])
+        self.assertEqual(image[22, 31, :3].tolist(), [0, 0, 0])
+
+
+    def test_max_size(self):
+        """ Test that the image is scaled down to fit the maximum size.
+        """
+        image = render_to_array(self.graph, max_size=32)
+        self.assertTrue(max(image.shape[:2]) <= 32)
+        self.assertTrue((image[:, :, :3] < 255).any())
+
+
+    def test_render_to_file(self):
+        """ Test writing the image to a PNG file.
+        """
+        filename = os.path.join(self.tmpdir, "graph.png")
+        render_to_file(self.graph, filename)
+        self.assertEqual(open(filename, "rb").read(4), "\x89PNG")
+
+
+    def test_save_image(self):
+        """ Test writing the image through the graph.
+        """
+        filename = os.path.join(self.tmpdir, "graph.png")
+        self.graph.save_image(filename, scale=2.0)
+        self.assertTrue(os.path.getsize(filename) > 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
@@ -0,0 +1,93 @@
+#------------------------------------------------------------------------------
+#  Copyright (c) 2009 Richard W. Lincoln
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to
+#  deal in the Software without restriction, including without limitation the
+#  rights to use, copy, modify, merge, publish, distribute, sublicense, and/or
+#  sell copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+#  IN THE SOFTWARE.
+#------------------------------------------------------------------------------
+
+""" Defines tests for the spatial index of component bounding boxes.
+"""
+
+#------------------------------------------------------------------------------
+#  Imports:
+#------------------------------------------------------------------------------
+
+import unittest
+
+from numpy import random, column_stack, nonzero
+
+from godot.component.spatial_index import SpatialIndex
+
+#------------------------------------------------------------------------------
+#  "SpatialIndexTestCase" class:
+#------------------------------------------------------------------------------
+
+class SpatialIndexTestCase(unittest.TestCase):
+    """ Defines a test case for the spatial index.
+    """
+
+    def setUp(self):
+        """ Indexes a set of random boxes.
+        """
+        prng = random.RandomState(0)
+        xy = prng.rand(2000, 2) * 1000.0
+        wh = prng.rand(2000, 2) * 25.0
+        self.boxes = column_stack((xy, xy + wh))
+        self.index = SpatialIndex(self.boxes)
+
+
+    def test_empty(self):
+        """ Test querying an empty index.
+        """
+        index = SpatialIndex()
+        self.assertEqual(len(index), 0)
+        self.assertEqual(len(index.query_point(0.0, 0.0)), 0)
+
+
+    def test_query_point(self):
+        """ Test that point queries match a linear scan, topmost first.
+        """
+        b = self.boxes
+        for x, y in [(10.0, 10.0), (500.0, 500.0), (999.0, 3.0)]:
+            expected = nonzero((b[:, 0] <= x) & (b[:, 2] >= x) &
+                               (b[:, 1] <= y) & (b[:, 3] >= y))[0][::-1]
+            self.assertEqual(list(self.index.query_point(x, y)),
+                             list(expected))
+
+
+    def test_query_rect_contained(self):
+        """ Test selecting the boxes within a rubber-band rectangle.
+        """
+        b = self.boxes
+        expected = nonzero((b[:, 0] >= 100) & (b[:, 2] <= 300) &
+                           (b[:, 1] >= 200) & (b[:, 3] <= 400))[0][::-1]
+        result = self.index.query_rect(300, 400, 100, 200, contained=True)
+        self.assertEqual(list(result), list(expected))
+
+
+    def test_topmost(self):
+        """ Test that later boxes are reported first.
+        """
+        index = SpatialIndex([(0, 0, 10, 10), (5, 5, 15, 15)])
+        self.assertEqual(list(index.query_point(7, 7)), [1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+# EOF -------------------------------------------------------------------------
@@ -38,6 +38,30 @@ from parser_test_case \
 from xdot_parser_test_case \
     import XdotAttrParserTestCase
 
+from spatial_index_test_case \
+    import SpatialIndexTestCase
+
+from component_test_case import BSplineTestCase, ShapesTestCase, \
+    TextTestCase, DisplayListTestCase, TileCacheTestCase, LODTestCase
+
+from plain_parser_test_case \
+    import PlainParserTestCase
+
+from layout_test_case \
+    import LayoutTestCase
+
+from export_test_case \
+    import SVGWriterTestCase
+
+from render_test_case \
+    import RenderTestCase
+
+from batch_test_case \
+    import BatchTestCase
+
+from mapping_test_case \
+    import MapElementTestCase
+
 #------------------------------------------------------------------------------
 #  "suite" function:
 #------------------------------------------------------------------------------
@@ -55,6 +79,19 @@ def suite():
 
     suite.addTest(unittest.makeSuite(ParserTestCase))
     suite.addTest(unittest.makeSuite(XdotAttrParserTestCase))
+    suite.addTest(unittest.makeSuite(SpatialIndexTestCase))
+    suite.addTest(unittest.makeSuite(BSplineTestCase))
+    suite.addTest(unittest.makeSuite(ShapesTestCase))
+    suite.addTest(unittest.makeSuite(TextTestCase))
+    suite.addTest(unittest.makeSuite(DisplayListTestCase))
+    suite.addTest(unittest.makeSuite(TileCacheTestCase))
+    suite.addTest(unittest.makeSuite(LODTestCase))
+    suite.addTest(unittest.makeSuite(PlainParserTestCase))
+    suite.addTest(unittest.makeSuite(LayoutTestCase))
+    suite.addTest(unittest.makeSuite(SVGWriterTestCase))
+    suite.addTest(unittest.makeSuite(RenderTestCase))
+    suite.addTest(unittest.makeSuite(BatchTestCase))
+    suite.addTest(unittest.makeSuite(MapElementTestCase))
 
     return suite
 
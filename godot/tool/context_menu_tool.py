@@ -28,23 +28,12 @@ class ContextMenuTool(BaseTool):
         x = event.x
         y = event.y
 
-        # First determine what component or components we are going to hittest
-        # on.  If our component is a container, then we add its non-container
-        # components to the list of candidates.
-#        candidates = []
+        # Canvases that index their components only handle the event if a
+        # component lies under the pointer.
         component = self.component
-#        if isinstance(component, Container):
-#            candidates = get_nested_components(self.component)
-#        else:
-#            # We don't support clicking on unrecognized components
-#            return
-#
-#        # Hittest against all the candidate and take the first one
-#        item = None
-#        for candidate, offset in candidates:
-#            if candidate.is_in(x-offset[0], y-offset[1]):
-#                item = candidate
-#                break
+        if hasattr(component, "hit_test"):
+            if component.hit_test(x, y) is None:
+                return
 
         for tool in component.tools:
             component.active_tool = self
@@ -28,31 +28,20 @@ class ElementTool(BaseTool):
         x = event.x
         y = event.y
 
-        # First determine what component or components we are going to hittest
-        # on.  If our component is a container, then we add its non-container
-        # components to the list of candidates.
-#        candidates = []
+        # Canvases that index their components resolve the element under the
+        # pointer directly; other components may reference an element.
         component = self.component
-#        if isinstance(component, Container):
-#            candidates = get_nested_components(self.component)
-#        else:
-#            # We don't support clicking on unrecognized components
-#            return
-#
-#        # Hittest against all the candidate and take the first one
-#        item = None
-#        for candidate, offset in candidates:
-#            if candidate.is_in(x-offset[0], y-offset[1]):
-#                item = candidate
-#                break
-
-        if hasattr(component, "element"):
-            if component.element is not None:
-                component.active_tool = self
-                component.element.edit_traits(kind="livemodal")
-                event.handled = True
-                component.active_tool = None
-                component.request_redraw()
+        if hasattr(component, "element_at"):
+            element = component.element_at(x, y)
+        else:
+            element = getattr(component, "element", None)
+
+        if element is not None:
+            component.active_tool = self
+            element.edit_traits(kind="livemodal")
+            event.handled = True
+            component.active_tool = None
+            component.request_redraw()
         return
 
 # EOF -------------------------------------------------------------------------
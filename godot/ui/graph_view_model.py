@@ -30,10 +30,11 @@ import sys
 from os.path import join, dirname, expanduser, isfile
 import logging
 import pickle
+from threading import Thread
 
 from enthought.traits.api import \
     HasTraits, Instance, File, Bool, Str, List, on_trait_change, \
-    Float, Tuple, Property, Delegate, Code, Button
+    Float, Tuple, Property, Delegate, Code, Button, Int
 
 from enthought.traits.ui.api import \
     View, Handler, UIInfo, Group, Item, TableEditor, InstanceEditor, \
@@ -41,7 +42,7 @@ from enthought.traits.ui.api import \
     spring, TextEditor
 
 from enthought.traits.ui.menu import NoButtons, OKCancelButtons, Separator
-from enthought.pyface.api import error, confirm, YES, FileDialog, OK
+from enthought.pyface.api import error, confirm, YES, FileDialog, OK, GUI
 from enthought.pyface.image_resource import ImageResource
 from enthought.naming.unique_name import make_unique_name
 from enthought.logger.api import add_log_queue_handler
@@ -57,6 +58,9 @@ from godot.api import Graph, Cluster, Node, Edge, GodotDataParser, Subgraph
 from godot.ui.graph_menu import menubar, toolbar
 from godot.ui.graph_view import nodes_view, edges_view, attr_view, about_view
 from godot.ui.graph_tree import graph_tree_editor
+from godot.layout.engine import \
+    ENGINES, arrange_in_process, run_engine, apply_layout
+from godot.layout.auto import choose_program
 
 #------------------------------------------------------------------------------
 #  Constants:
@@ -101,6 +105,15 @@ class GraphViewModel(ModelView):
     parse_dot_code = Button("Parse", desc="dot code parsing action that "
         "replaces the existing model.")
 
+    # Opened graphs with more edges than this are first shown with a quick
+    # spectral layout.
+    preview_edges = Int(10000, desc="number of edges above which a spectral "
+        "preview is shown first")
+
+    # Refine previews in the background with the graph's layout program.
+    refine_preview = Bool(True, desc="that previews are refined in the "
+        "background")
+
     #--------------------------------------------------------------------------
     #  Views:
     #--------------------------------------------------------------------------
@@ -227,6 +240,7 @@ class GraphViewModel(ModelView):
             model = parser.parse_dot_file(dlg.path)
             if model is not None:
                 self.model = model
+                self.preview_layout( model )
             else:
                 print "error parsing: %s" % dlg.path
 
@@ -248,6 +262,54 @@ class GraphViewModel(ModelView):
 #                    fd.close()
 
 
+    def preview_layout(self, graph):
+        """ Shows a spectral layout of a large graph that has not been
+            arranged and refines it in a worker thread.
+        """
+        edges = [e for g in graph.all_graphs for e in g.edges]
+        if len(edges) <= self.preview_edges:
+            return
+        if [n for n in graph.nodes if n._draw_]:
+            return
+
+        arrange_in_process( graph, "spectral" )
+
+        if self.refine_preview:
+            worker = Thread( target=self._refine_layout, args=(graph,) )
+            worker.setDaemon( True )
+            worker.start()
+
+
+    def _refine_layout(self, graph):
+        """ Arranges the graph with its layout program in a worker thread
+            and applies the result in the GUI thread.
+        """
+        prog = graph.program
+        if prog == "auto":
+            prog = choose_program( graph )[0]
+
+        if prog in ENGINES:
+            GUI.invoke_later( self._refined, graph,
+                              result=run_engine(graph, prog) )
+        else:
+            xdot_data = graph.create( prog, "xdot" )
+            if xdot_data:
+                GUI.invoke_later( self._refined, graph,
+                                  xdot_data=xdot_data )
+
+
+    def _refined(self, graph, xdot_data=None, result=None):
+        """ Replaces a previewed layout with the refined one, unless another
+            graph has been opened since.
+        """
+        if graph is not self.model:
+            return
+        if result is not None:
+            apply_layout( graph, *result )
+        else:
+            graph.arrange_xdot( xdot_data )
+
+
     def save(self, info):
         """ Handles saving the current model to the last file.
         """
@@ -33,8 +33,6 @@ import os
 
 from enthought.traits.api import HasTraits, Enum
 
-from enthought.kiva.fonttools.font import str_to_font
-
 from godot.component.api import Ellipse, Text, Polygon, BSpline
 
 #------------------------------------------------------------------------------
@@ -147,15 +145,10 @@ def move_to_origin(components):
             component.y_origin = component.e_height
 
         elif isinstance(component, (Polygon, BSpline)):
-            min_x = min( [t[0] for t in component.points] )
-            min_y = min( [t[1] for t in component.points] )
-
-            component.points = [
-                ( p[0]-min_x, p[1]-min_y ) for p in component.points
-            ]
+            component.points = component.points - \
+                component.points.min(axis=0)
 
         elif isinstance(component, Text):
-            font = str_to_font( str(component.pen.font) )
             component.text_x = 0#-( component.text_w / 2 )
             component.text_y = 0#-( font.size / 2 )
 
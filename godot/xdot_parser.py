@@ -31,6 +31,8 @@ References:
 #  Imports:
 #------------------------------------------------------------------------------
 
+from numpy import array
+
 from enthought.enable.api import Component
 
 from pyparsing import __version__ as pyparsing_version
@@ -323,6 +325,15 @@ class XdotAttrParser:
 
         return component
 
+    #--------------------------------------------------------------------------
+    #  Points:
+    #--------------------------------------------------------------------------
+
+    def _proc_points(self, points):
+        """ Returns an N x 2 array of the given point tokens. """
+
+        return array([(p["x"], p["y"]) for p in points], dtype=float)
+
     #--------------------------------------------------------------------------
     #  Polygon:
     #--------------------------------------------------------------------------
@@ -342,7 +353,7 @@ class XdotAttrParser:
     def _proc_polygon(self, tokens, filled):
         """ Returns the components of a polygon. """
 
-        pts = [(p["x"], p["y"]) for p in tokens["points"]]
+        pts = self._proc_points(tokens["points"])
         component = Polygon(pen=self.pen, points=pts, filled=filled)
 
         return component
@@ -354,7 +365,7 @@ class XdotAttrParser:
     def proc_polyline(self, tokens):
         """ Returns the components of a polyline. """
 
-        pts = [(p["x"], p["y"]) for p in tokens["points"]]
+        pts = self._proc_points(tokens["points"])
         component = Polyline(pen=self.pen, points=pts)
 
         return component
@@ -378,7 +389,7 @@ class XdotAttrParser:
     def _proc_bspline(self, tokens, filled):
         """ Returns the components of a B-spline (Bezier curve). """
 
-        pts = [(p["x"], p["y"]) for p in tokens["points"]]
+        pts = self._proc_points(tokens["points"])
         component = BSpline(pen=self.pen, points=pts, filled=filled)
 
         return component